@@ -0,0 +1,243 @@
+"""
+Suite de rendimiento sobre datos sintéticos, sin red: los archivos se sirven desde un servidor
+HTTP local que imita GitHub.
+
+Uso:
+    python -m benchmarks.run [--years 5] [--rows 20000] [--codes 200] [--save-baseline]
+
+Cada prueba mide el mejor tiempo de varias repeticiones y el pico de memoria (tracemalloc) de
+una ejecución adicional. Si existe una línea base con los mismos parámetros, se marcan como
+regresión las pruebas que la superan por encima de la tolerancia y el comando termina con
+código 1.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import code_names, generate_tree
+from src import data_visualization
+from src.trend_store import TrendStatsStore
+from support.agents import make_headless_agent
+from support.fake_github import FakeGitHub
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+# Diferencias absolutas por debajo de estas no cuentan como regresión (ruido de medida)
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1024 * 1024
+
+
+class Benchmark:
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: ())
+
+
+def measure(benchmark, repeats):
+    times = []
+    for _ in range(repeats):
+        args = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = benchmark.setup()
+    tracemalloc.start()
+    try:
+        benchmark.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(times), 'median_seconds': statistics.median(times), 'peak_bytes': peak}
+
+
+class Workspace:
+    """
+    Repositorio sintético servido localmente más un directorio temporal para cachés e
+    instantáneas. Cada agente nuevo puede empezar en frío (sin caché) o reutilizar la caché común.
+    """
+
+    def __init__(self, years, rows, n_codes, seed=0):
+        self.years = [str(year) for year in years]
+        self.codes = list(code_names(n_codes))
+        self.tree = generate_tree(self.years, rows, n_codes, seed)
+        self._tmp = tempfile.TemporaryDirectory()
+        self._server = FakeGitHub("bench/produksjon", self.tree)
+        self._agents = 0
+
+    def __enter__(self):
+        self._server.__enter__()
+        agent = self.agent()
+        self.files = agent.list_csv_and_readme_files()
+        self.all_data, self.animal_codes = agent.load_all(self.files)
+        self.latest = self.files[-1]
+        return self
+
+    def __exit__(self, *exc):
+        self._server.__exit__(*exc)
+        self._tmp.cleanup()
+
+    def agent(self, cold=False):
+        self._agents += 1
+        root = os.path.join(self._tmp.name, f"agent-{self._agents}" if cold else "shared")
+        agent = make_headless_agent(self._server, root, repo=self._server.repo_name, token=None)
+        agent.trend_store = TrendStatsStore(os.path.join(self._tmp.name, f"trends-{self._agents}.json"))
+        return agent
+
+
+def _plot(function, *args):
+    def setup():
+        data_visualization.clear_caches()
+        return args
+    return Benchmark(f"plot.{function.__name__}", function, setup)
+
+
+def _analyze(visualizer, data, question):
+    import matplotlib.pyplot as plt
+
+    visualizer.analyze_and_visualize(data, question)
+    plt.close('all')
+
+
+def build_benchmarks(workspace):
+    from src.data_analyst_visualizer import DataAnalystVisualizer
+
+    latest = workspace.latest
+    data = workspace.all_data[latest['year']]
+    codes = [code for code in workspace.codes if code in data.columns]
+    first, second = codes[0], codes[1]
+    trend_data = workspace.agent().calculate_animal_trends(workspace.all_data)
+    trend_data = {code: trend_data[code] for code in codes[:10] if code in trend_data}
+    animal_codes = workspace.animal_codes
+
+    return [
+        Benchmark("load_csv.cold", lambda agent: agent.load_csv(latest['dataset'], latest['dataset_sha']),
+                  lambda: (workspace.agent(cold=True),)),
+        Benchmark("load_csv.warm", lambda agent: agent.load_csv(latest['dataset'], latest['dataset_sha']),
+                  lambda: (workspace.agent(),)),
+        Benchmark("find_significant_trends", lambda agent: agent.find_significant_trends(workspace.all_data),
+                  lambda: (workspace.agent(),)),
+        Benchmark("calculate_animal_trends", lambda agent: agent.calculate_animal_trends(workspace.all_data),
+                  lambda: (workspace.agent(),)),
+        Benchmark("group_trends.kommunenr", lambda agent: agent.group_trends(workspace.all_data, 'kommunenr'),
+                  lambda: (workspace.agent(),)),
+        _plot(data_visualization.plot_bar_chart, data, first),
+        _plot(data_visualization.plot_box_chart, data, first),
+        _plot(data_visualization.plot_violin_chart, data, first),
+        _plot(data_visualization.plot_distribution_chart, data, first),
+        _plot(data_visualization.plot_scatter_chart, data, first, second),
+        _plot(data_visualization.plot_stacked_bar_chart, data, codes[:5]),
+        _plot(data_visualization.plot_radar_chart, data, codes[:8]),
+        _plot(data_visualization.plot_animal_trends, trend_data, animal_codes),
+        _plot(data_visualization.plot_animal_distribution, data, codes, animal_codes),
+        _plot(data_visualization.plot_animal_heatmap, data, codes, animal_codes),
+        Benchmark("analyze_and_visualize", _analyze,
+                  lambda: (DataAnalystVisualizer(), data, f"¿Cuál es el promedio de {first}?")),
+    ]
+
+
+def run_suite(years=5, rows=20000, codes=200, repeats=3, seed=0, only=None, first_year=2017):
+    params = {'years': years, 'rows': rows, 'codes': codes, 'seed': seed}
+    results = {}
+    with Workspace(range(first_year, first_year + years), rows, codes, seed) as workspace:
+        for benchmark in build_benchmarks(workspace):
+            if only and not any(pattern in benchmark.name for pattern in only):
+                continue
+            results[benchmark.name] = measure(benchmark, repeats)
+    return {'params': params, 'results': results}
+
+
+def compare(current, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """
+    Regresiones de `current` frente a `baseline`, como lista de (prueba, métrica, base, actual).
+    Solo se comparan ejecuciones con los mismos parámetros.
+    """
+    if baseline is None or baseline.get('params') != current['params']:
+        return []
+    regressions = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        if result['seconds'] > reference['seconds'] * (1 + time_tolerance) and \
+                result['seconds'] - reference['seconds'] > MIN_TIME_DELTA:
+            regressions.append((name, 'seconds', reference['seconds'], result['seconds']))
+        if result['peak_bytes'] > reference['peak_bytes'] * (1 + memory_tolerance) and \
+                result['peak_bytes'] - reference['peak_bytes'] > MIN_MEMORY_DELTA:
+            regressions.append((name, 'peak_bytes', reference['peak_bytes'], result['peak_bytes']))
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(current, path=BASELINE_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+
+
+def format_report(current, baseline, regressions):
+    flagged = {(name, metric) for name, metric, _, _ in regressions}
+    comparable = baseline is not None and baseline.get('params') == current['params']
+    lines = [f"{'prueba':<40} {'tiempo (ms)':>12} {'base (ms)':>10} {'pico (MiB)':>11} {'base (MiB)':>11}"]
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name) if comparable else None
+        base_time = f"{reference['seconds'] * 1000:.1f}" if reference else "-"
+        base_peak = f"{reference['peak_bytes'] / 2 ** 20:.1f}" if reference else "-"
+        marks = "".join(" !" + metric for metric in ('seconds', 'peak_bytes') if (name, metric) in flagged)
+        lines.append(f"{name:<40} {result['seconds'] * 1000:>12.1f} {base_time:>10} "
+                     f"{result['peak_bytes'] / 2 ** 20:>11.1f} {base_peak:>11}{marks}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mide la ingesta, las tendencias y los gráficos con datos sintéticos.")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--codes", type=int, default=200, help="Columnas numéricas por código")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", action="append", help="Solo las pruebas cuyo nombre contiene este texto")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar esta ejecución como línea base")
+    parser.add_argument("--output", help="Guardar los resultados en JSON")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = run_suite(args.years, args.rows, args.codes, args.repeats, args.seed, args.filter)
+    baseline = load_baseline(args.baseline)
+    regressions = compare(current, baseline, args.time_tolerance, args.memory_tolerance)
+    print(format_report(current, baseline, regressions))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        save_baseline(current, args.baseline)
+        print(f"Línea base guardada en {args.baseline}")
+    elif baseline is not None and baseline.get('params') != current['params']:
+        print("La línea base se tomó con otros parámetros; no se compara")
+
+    for name, metric, reference, value in regressions:
+        print(f"REGRESIÓN en {name} ({metric}): {reference:.6g} -> {value:.6g}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
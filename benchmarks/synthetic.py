@@ -0,0 +1,71 @@
+"""
+Generador de datos sintéticos con la forma de produksjon-og-avlosertilskudd: CSV separados por
+punto y coma, con coma decimal, columnas de identificación y cientos de columnas numéricas
+por código, más un README por año con la tabla de códigos.
+"""
+import numpy as np
+import pandas as pd
+
+DIRECTORY = "datasets/produksjon-og-avlosertilskudd"
+FIRST_CODE = 100
+ANIMALS = ["Melkekyr", "Ammekyr", "Sauer", "Geiter", "Griser", "Verpehøner", "Hester", "Slaktekyllinger"]
+MUNICIPALITIES = ["Oslo", "Bergen", "Trondheim", "Stavanger", "Tromsø", "Bodø", "Ålesund", "Hamar"]
+
+
+def code_names(n_codes):
+    """
+    Códigos y descripciones de la tabla del README.
+    """
+    return {str(FIRST_CODE + i): f"{ANIMALS[i % len(ANIMALS)]} {i // len(ANIMALS) + 1}" for i in range(n_codes)}
+
+
+def generate_readme(year, codes):
+    lines = [f"# Produksjons- og avløsertilskudd {year}", "", "Koder:", ""]
+    lines += [f"{code} = {name}" for code, name in codes.items()]
+    return "\n".join(lines) + "\n"
+
+
+def generate_frame(year, rows, n_codes, seed=0, missing_ratio=0.05):
+    """
+    DataFrame de un año: identificadores de empresa, municipio y condado, y una columna por
+    código con recuentos (la mayoría ceros) o importes con decimales, con algunos valores nulos.
+    La media de cada código crece ligeramente con el año para que haya tendencias.
+    """
+    rng = np.random.default_rng([seed, int(year)])
+    kommunenr = rng.integers(301, 5500, rows)
+    data = {
+        'søknadsår': np.full(rows, int(year)),
+        'orgnr': rng.integers(800000000, 999999999, rows),
+        'kommunenr': kommunenr,
+        'kommunenavn': np.array(MUNICIPALITIES)[kommunenr % len(MUNICIPALITIES)],
+        'fylkesnr': kommunenr // 100,
+    }
+    trend = 1 + 0.02 * (int(year) % 100)
+    for i, code in enumerate(code_names(n_codes)):
+        if i % 4 == 3:
+            values = np.round(rng.gamma(2.0, 500.0 * trend, rows), 2)
+        else:
+            values = rng.poisson(3.0 * trend, rows) * (rng.random(rows) < 0.3)
+            values = values.astype(float)
+        values[rng.random(rows) < missing_ratio] = np.nan
+        data[code] = values
+    return pd.DataFrame(data)
+
+
+def generate_csv(year, rows, n_codes, seed=0):
+    frame = generate_frame(year, rows, n_codes, seed)
+    return frame.to_csv(sep=';', decimal=',', index=False, float_format='%.10g').encode('utf-8')
+
+
+def generate_tree(years, rows, n_codes, seed=0):
+    """
+    Archivos de todos los años, como ruta del repositorio -> contenido, listos para servirse con
+    el servidor HTTP local de las pruebas.
+    """
+    codes = code_names(n_codes)
+    tree = {}
+    for year in years:
+        year = str(year)
+        tree[f"{DIRECTORY}/{year}/dataset.csv"] = generate_csv(year, rows, n_codes, seed)
+        tree[f"{DIRECTORY}/{year}/README.md"] = generate_readme(year, codes).encode('utf-8')
+    return tree
@@ -6,11 +6,21 @@ DATA_DIR = "data/"
 # Parámetros de preprocesamiento
 MAX_MISSING_RATIO = 0.5
 CATEGORICAL_THRESHOLD = 10
+SPARSE_COLUMNS = "flag"  # "flag" solo marca las columnas dispersas en el esquema, "drop" las elimina (cada año por separado)
 
 # Parámetros de visualización
 MAX_CATEGORIES_PIE = 5
 CORRELATION_THRESHOLD = 0.7
+MAX_PLOT_POINTS = 2000
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 # Parámetros de ML
 N_CLUSTERS = 3
+CLUSTER_FEATURES = ["co2", "nox"]
+CLUSTER_LABEL_COLUMN = "merke"
+CLUSTER_MINIBATCH_ROWS = 100_000  # por encima, MiniBatchKMeans en lugar de KMeans
+CLUSTER_BATCH_SIZE = 4096
 
+# Parámetros de diagnóstico
+DIAGNOSTICS_MAX_SPANS = 2000
+DIAGNOSTICS_MAX_LOG_LINES = 500
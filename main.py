@@ -1,12 +1,18 @@
 import streamlit as st
 import logging
 import pandas as pd
-from googletrans import Translator
 from src.data_agent import DataAgent
+from src.column_stats import ColumnStatsIndex
+from src.lazy_years import LazyYearData
+from src.pipeline import load_artifacts
+from src.preprocessing import sparse_columns
+from src.instrumentation import RingBufferHandler, recorder
+from src.translation_catalog import TranslationCatalog, find_ui_strings
+from src.figure_cache import FigureCache
 from src.data_visualization import (plot_bar_chart, plot_box_chart, plot_scatter_chart, 
                                     plot_stacked_bar_chart, plot_radar_chart, plot_animal_trends,
-                                    plot_animal_distribution, plot_animal_heatmap)
-import io
+                                    plot_animal_distribution, plot_animal_heatmap,
+                                    plot_violin_chart, plot_distribution_chart, numeric_columns)
 
 print("Iniciando la aplicación...")
 
@@ -15,11 +21,16 @@ st.set_page_config(page_title="Análisis de Datos de Producción y Subsidios Agr
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-log_stream = io.StringIO()
-logging.getLogger().addHandler(logging.StreamHandler(log_stream))
 
-# Inicializar el traductor
-translator = Translator()
+@st.cache_resource
+def get_log_buffer():
+    # Se añade una sola vez por proceso y solo conserva las últimas líneas
+    handler = RingBufferHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logging.getLogger().addHandler(handler)
+    return handler
+
+log_buffer = get_log_buffer()
 
 # Traducciones pre-definidas
 TRANSLATIONS = {
@@ -31,6 +42,8 @@ TRANSLATIONS = {
     "Gráfico de dispersión": "Gráfico de dispersión",
     "Gráfico de barras apiladas": "Gráfico de barras apiladas",
     "Gráfico de radar": "Gráfico de radar",
+    "Gráfico de violín": "Gráfico de violín",
+    "Histograma": "Histograma",
     "Seleccione una variable": "Seleccione una variable",
     "Seleccione una variable para el eje X": "Seleccione una variable para el eje X",
     "Seleccione una variable para el eje Y": "Seleccione una variable para el eje Y",
@@ -46,38 +59,74 @@ TRANSLATIONS = {
     "Análisis de Tendencias": "Análisis de Tendencias",
 }
 
+@st.cache_resource
+def get_translation_catalog():
+    # Catálogo compartido por todas las sesiones; se pre-traducen en segundo plano
+    # todos los textos de la interfaz que pasan por translate_text
+    catalog = TranslationCatalog(predefined=TRANSLATIONS)
+    catalog.request(find_ui_strings([__file__]))
+    return catalog
+
 def translate_text(text):
-    if text in TRANSLATIONS:
-        return TRANSLATIONS[text]
-    try:
-        return translator.translate(text, dest='es').text
-    except:
-        return text
-
-@st.cache_data
+    return get_translation_catalog().translate(text)
+
+@st.cache_resource
+def get_figure_cache():
+    # Compartida entre sesiones: volver a un gráfico ya dibujado no lo recalcula
+    return FigureCache()
+
+def cached_plot(plot_function, *args):
+    return get_figure_cache().figure(plot_function, *args)
+
+@st.cache_resource
+def get_agent():
+    # Un único agente para todas las sesiones (y sus estadísticos de tendencias en memoria)
+    return DataAgent()
+
+@st.cache_resource
 def load_data():
+    # cache_resource en lugar de cache_data: todas las sesiones reciben los mismos objetos de
+    # solo lectura, mapeados sobre las instantáneas, en vez de una copia deserializada cada una
+    agent = get_agent()
+    # Si el precálculo por lotes (python -m src.pipeline) ya publicó artefactos, basta con leerlos
+    artifacts = load_artifacts(snapshots=agent.snapshots)
+    if artifacts is not None:
+        precomputed = {'trends': artifacts.trends, 'animal_trends': artifacts.animal_trends}
+        return artifacts.all_data, artifacts.animal_codes, artifacts.stats_index, precomputed
+
+    # Sin artefactos solo se lista el catálogo: cada año se carga al pedirlo y el resto se
+    # precarga en segundo plano, del más reciente al más antiguo. El índice de resúmenes se
+    # completa a medida que llegan los años.
     with st.spinner('Cargando datos...'):
-        agent = DataAgent()
         files = agent.list_csv_and_readme_files()
-        all_data = {}
-        animal_codes = {}
-        progress_bar = st.progress(0)
-        for i, file_info in enumerate(files):
-            year = file_info['year']
-            data = agent.load_csv(file_info['dataset'])
-            readme_content = agent.load_readme(file_info['readme'])
-            if data is not None:
-                all_data[year] = data
-            if readme_content is not None:
-                animal_codes.update(agent.extract_animal_codes(readme_content))
-            progress_bar.progress((i + 1) / len(files))
-    return all_data, animal_codes
+        stats_index = ColumnStatsIndex()
+        all_data = LazyYearData(files, on_load=stats_index.add)
+        animal_codes = all_data.animal_codes()
+        all_data.prefetch()
+    return all_data, animal_codes, stats_index, None
+
+def year_schemas(all_data):
+    # Con datos perezosos se leen los esquemas sin cargar los años que aún no están
+    if isinstance(all_data, LazyYearData):
+        return list(all_data.schemas().values())
+    return [df.attrs.get('schema') for df in all_data.values()]
+
+def show_diagnostics():
+    with st.sidebar.expander("Diagnóstico"):
+        summary = recorder.summary()
+        if summary:
+            st.dataframe(pd.DataFrame(summary).T)
+        else:
+            st.write("Aún no hay tramos registrados.")
+        st.download_button("Exportar JSON", recorder.export_json(), file_name="diagnostico.json",
+                           mime="application/json")
+        st.text("\n".join(log_buffer.lines()[-50:]))
 
 def main():
     print("Entrando en la función main()")
     st.title(translate_text("Análisis de Datos de Producción y Subsidios Agrícolas de Noruega"))
 
-    all_data, animal_codes = load_data()
+    all_data, animal_codes, stats_index, precomputed = load_data()
 
     if not all_data:
         st.error("No se pudieron cargar los datos. Por favor, verifica la conexión y los permisos.")
@@ -87,57 +136,93 @@ def main():
 
     with tab1:
         st.header(translate_text("Visualizaciones"))
-        years = list(all_data.keys())
-        selected_year = st.selectbox(translate_text("Seleccione un año"), years)
-        data = all_data[selected_year]
-
-        chart_type = st.selectbox(translate_text("Seleccione un tipo de gráfico"), 
-                                  ["Gráfico de barras", "Gráfico de caja", "Gráfico de dispersión", 
-                                   "Gráfico de barras apiladas", "Gráfico de radar", 
-                                   "Distribución de animales", "Mapa de calor de correlaciones"])
-
-        if chart_type == "Gráfico de barras":
-            variable = st.selectbox(translate_text("Seleccione una variable"), data.columns)
-            fig = plot_bar_chart(data, variable)
-            st.plotly_chart(fig)
+        # Los años que ya fallaron al cargarse no se ofrecen (ni se reintentan) hasta que se pida
+        if isinstance(all_data, LazyYearData):
+            failed = all_data.failed_years()
+            if failed and st.button(translate_text("Reintentar años no disponibles") + f" ({', '.join(failed)})"):
+                all_data.retry_failed()
+            years = all_data.available_years()
+        else:
+            years = list(all_data.keys())
+        # Por defecto el año más reciente, que es el primero que se precarga
+        selected_year = st.selectbox(translate_text("Seleccione un año"), years, index=max(len(years) - 1, 0))
+        try:
+            with st.spinner(f'Cargando {selected_year}...'):
+                data = all_data[selected_year]
+        except KeyError:
+            data = None
+            st.error(f"No se pudieron cargar los datos de {selected_year}. Seleccione otro año.")
 
-        elif chart_type == "Gráfico de caja":
-            variable = st.selectbox(translate_text("Seleccione una variable"), data.columns)
-            fig = plot_box_chart(data, variable)
-            st.plotly_chart(fig)
+        if data is not None:
+            # Las columnas dispersas en todos los años no se ofrecen en ningún gráfico. Salvo el de
+            # barras (que muestra frecuencias para texto), los gráficos son numéricos
+            sparse = sparse_columns(year_schemas(all_data))
+            columns = [column for column in data.columns if column not in sparse]
+            numeric = [column for column in numeric_columns(data) if column not in sparse]
+            chart_type = st.selectbox(translate_text("Seleccione un tipo de gráfico"), 
+                                      ["Gráfico de barras", "Gráfico de caja", "Gráfico de violín", "Histograma",
+                                       "Gráfico de dispersión", "Gráfico de barras apiladas", "Gráfico de radar", 
+                                       "Distribución de animales", "Mapa de calor de correlaciones"])
 
-        elif chart_type == "Gráfico de dispersión":
-            x_variable = st.selectbox(translate_text("Seleccione una variable para el eje X"), data.columns)
-            y_variable = st.selectbox(translate_text("Seleccione una variable para el eje Y"), data.columns)
-            fig = plot_scatter_chart(data, x_variable, y_variable)
-            st.plotly_chart(fig)
+            if chart_type == "Gráfico de barras":
+                variable = st.selectbox(translate_text("Seleccione una variable"), columns)
+                fig = cached_plot(plot_bar_chart, data, variable)
+                st.plotly_chart(fig)
 
-        elif chart_type == "Gráfico de barras apiladas":
-            variables = st.multiselect(translate_text("Seleccione variables"), data.columns)
-            if variables:
-                fig = plot_stacked_bar_chart(data, variables)
+            elif chart_type == "Gráfico de caja":
+                variable = st.selectbox(translate_text("Seleccione una variable"), numeric)
+                fig = cached_plot(plot_box_chart, data, variable)
                 st.plotly_chart(fig)
 
-        elif chart_type == "Gráfico de radar":
-            variables = st.multiselect(translate_text("Seleccione variables"), data.columns)
-            if variables:
-                fig = plot_radar_chart(data, variables)
+            elif chart_type == "Gráfico de violín":
+                variable = st.selectbox(translate_text("Seleccione una variable"), numeric)
+                fig = cached_plot(plot_violin_chart, data, variable)
                 st.plotly_chart(fig)
 
-        elif chart_type == "Distribución de animales":
-            animal_columns = [col for col in data.columns if col in animal_codes]
-            fig = plot_animal_distribution(data, animal_columns, animal_codes)
-            st.plotly_chart(fig)
+            elif chart_type == "Histograma":
+                variable = st.selectbox(translate_text("Seleccione una variable"), numeric)
+                fig = cached_plot(plot_distribution_chart, data, variable)
+                st.plotly_chart(fig)
 
-        elif chart_type == "Mapa de calor de correlaciones":
-            animal_columns = [col for col in data.columns if col in animal_codes]
-            fig = plot_animal_heatmap(data, animal_columns, animal_codes)
-            st.plotly_chart(fig)
+            elif chart_type == "Gráfico de dispersión":
+                x_variable = st.selectbox(translate_text("Seleccione una variable para el eje X"), numeric)
+                y_variable = st.selectbox(translate_text("Seleccione una variable para el eje Y"), numeric)
+                fig = cached_plot(plot_scatter_chart, data, x_variable, y_variable)
+                st.plotly_chart(fig)
+
+            elif chart_type == "Gráfico de barras apiladas":
+                variables = st.multiselect(translate_text("Seleccione variables"), numeric)
+                if variables:
+                    fig = cached_plot(plot_stacked_bar_chart, data, variables)
+                    st.plotly_chart(fig)
+
+            elif chart_type == "Gráfico de radar":
+                variables = st.multiselect(translate_text("Seleccione variables"), numeric)
+                if variables:
+                    fig = cached_plot(plot_radar_chart, data, variables)
+                    st.plotly_chart(fig)
+
+            elif chart_type == "Distribución de animales":
+                animal_columns = [col for col in columns if col in animal_codes]
+                fig = cached_plot(plot_animal_distribution, data, animal_columns, animal_codes)
+                st.plotly_chart(fig)
+
+            elif chart_type == "Mapa de calor de correlaciones":
+                animal_columns = [col for col in columns if col in animal_codes]
+                fig = cached_plot(plot_animal_heatmap, data, animal_columns, animal_codes)
+                st.plotly_chart(fig)
 
     with tab2:
         st.header(translate_text("Análisis de Tendencias"))
-        agent = DataAgent()
-        trends = agent.find_significant_trends(all_data)
+        agent = get_agent()
+        if precomputed is not None:
+            trends = precomputed['trends']
+            animal_trends = precomputed['animal_trends']
+        else:
+            # Las tendencias solo necesitan las columnas numéricas de cada año
+            trend_frames = all_data.numeric_frames() if isinstance(all_data, LazyYearData) else all_data
+            trends = agent.find_significant_trends(trend_frames)
+            animal_trends = agent.calculate_animal_trends(trend_frames)
         if trends:
             for animal_code, trend_info in trends.items():
                 animal_name = animal_codes.get(animal_code, animal_code)
@@ -152,22 +237,30 @@ def main():
             st.write(translate_text("No se encontraron tendencias significativas."))
         
         st.subheader(translate_text("Tendencias de animales"))
-        animal_trends = agent.calculate_animal_trends(all_data)
         selected_animals = st.multiselect(translate_text("Seleccione animales para ver tendencias"), 
                                           options=[(code, animal_codes.get(code, code)) for code in animal_trends.keys()],
                                           format_func=lambda x: f"{x[1]} ({x[0]})")
         if selected_animals:
             trend_data = {animal[0]: trends for animal, trends in animal_trends.items() if animal in selected_animals}
-            fig = plot_animal_trends(trend_data, animal_codes)
+            fig = cached_plot(plot_animal_trends, trend_data, animal_codes)
             st.plotly_chart(fig)
 
     with tab3:
         st.header(translate_text("Preguntas sobre los datos"))
         user_question = st.text_input(translate_text("Haga una pregunta sobre los datos"))
         if user_question:
-            answer = agent.answer_question(data, user_question)
+            # El índice se completa a medida que llegan los años: las preguntas sobre varios
+            # años deben responderse con todos los que se pueden cargar
+            if isinstance(all_data, LazyYearData):
+                with st.spinner('Cargando todos los años...'):
+                    all_data.wait()
+            answer = agent.answer_question(data, user_question, year=selected_year,
+                                           index=stats_index, animal_codes=animal_codes)
             st.write(translate_text("Respuesta:"), answer)
 
+    # Al final, para incluir los tramos de esta misma ejecución
+    show_diagnostics()
+
 if __name__ == "__main__":
     print("Llamando a main()")
     main()
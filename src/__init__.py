@@ -1,4 +1,12 @@
-# Este archivo puede estar vacío o contener solo las importaciones necesarias
-from . import data_agent
-from . import repo_analysis
+# Los submódulos se importan al usarse (p. ej. `src.data_agent`), para que importar el paquete
+# no cargue sus dependencias
+import importlib
+
+__all__ = ['data_agent', 'repo_analysis']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
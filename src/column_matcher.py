@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+
+class ColumnMatcher:
+    """
+    Autómata de Aho-Corasick sobre los nombres de las columnas (y sus nombres descriptivos
+    del README). Encuentra todas las columnas mencionadas en un texto en una sola pasada,
+    prefiriendo la coincidencia más larga y respetando los límites de palabra.
+    """
+
+    def __init__(self, columns, display_names=None):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for column in columns:
+            self._add(str(column).lower(), column)
+        for column, name in (display_names or {}).items():
+            if name:
+                self._add(str(name).lower(), column)
+        self._build_failure_links()
+
+    def _add(self, pattern, column):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        self.outputs[node].append((len(pattern), pattern, column))
+
+    def _build_failure_links(self):
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def _matches(self, text):
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, pattern, column in self.outputs[node]:
+                start = end - length
+                if _at_boundary(text, start, end, pattern):
+                    yield start, end, column
+
+    def find_all(self, text):
+        """
+        Columnas mencionadas en `text`, en orden de aparición. Entre coincidencias solapadas
+        gana la más larga.
+        """
+        matches = sorted(self._matches(text.lower()), key=lambda m: (m[0], -(m[1] - m[0])))
+        found = []
+        position = 0
+        for start, end, column in matches:
+            if start >= position:
+                position = end
+                if column not in found:
+                    found.append(column)
+        return found
+
+    def find(self, text):
+        """
+        La columna de la coincidencia más larga en `text`, o None.
+        """
+        best = max(self._matches(text.lower()), key=lambda m: (m[1] - m[0], -m[0]), default=None)
+        return best[2] if best else None
+
+
+def _at_boundary(text, start, end, pattern):
+    if start > 0 and pattern[0].isalnum() and text[start - 1].isalnum():
+        return False
+    if end < len(text) and pattern[-1].isalnum() and text[end].isalnum():
+        return False
+    return True
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(columns, display_names):
+    return ColumnMatcher(columns, dict(display_names))
+
+
+def get_matcher(columns, display_names=None):
+    """
+    Matcher compartido para un esquema de columnas: se construye una sola vez por combinación
+    de columnas y nombres descriptivos.
+    """
+    columns = tuple(columns)
+    names = ()
+    if display_names:
+        available = set(columns)
+        names = tuple(sorted((column, name) for column, name in display_names.items() if column in available))
+    return _cached_matcher(columns, names)
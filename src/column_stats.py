@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+STATISTICS = ('count', 'sum', 'min', 'max', 'mean', 'nulls')
+PERCENTILES = np.linspace(0, 100, 101)
+QUANTILE_SAMPLE_SIZE = 20000
+
+
+class ColumnStatsIndex:
+    """
+    Índice de resúmenes por año y columna: count, sum, min, max, mean, nulos y percentiles
+    aproximados (calculados sobre una muestra). Se construye una sola vez al cargar los datos
+    y después cada consulta es una búsqueda, sin volver a recorrer las columnas.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.percentiles = {}
+        self.rows = {}
+        self.columns = {}
+
+    @classmethod
+    def build(cls, all_data, sample_size=QUANTILE_SAMPLE_SIZE, seed=0):
+        index = cls()
+        for year, df in all_data.items():
+            index.add(year, df, sample_size, seed)
+        return index
+
+    def add(self, year, df, sample_size=QUANTILE_SAMPLE_SIZE, seed=0):
+        numeric = df.select_dtypes(include=['number', 'bool'])
+        count = numeric.count()
+        total = numeric.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+        stats = pd.DataFrame({
+            'count': count,
+            'sum': total,
+            'min': numeric.min(),
+            'max': numeric.max(),
+            'mean': mean,
+            'nulls': len(numeric) - count,
+        }).astype(float)
+
+        sample = numeric
+        if len(numeric) > sample_size:
+            positions = np.random.default_rng(seed).choice(len(numeric), sample_size, replace=False)
+            sample = numeric.iloc[np.sort(positions)]
+        values = sample.to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(all='ignore'):
+            if values.size:
+                percentiles = np.nanpercentile(values, PERCENTILES, axis=0).T
+            else:
+                percentiles = np.full((values.shape[1], len(PERCENTILES)), np.nan)
+        # `stats` se asigna al final: así un año que se está añadiendo desde otro hilo
+        # no aparece en `has` hasta que todos sus resúmenes están listos
+        self.percentiles[year] = pd.DataFrame(percentiles, index=numeric.columns)
+        self.rows[year] = len(df)
+        self.columns[year] = list(df.columns)
+        self.stats[year] = stats
+
+    def to_dict(self):
+        """
+        Representación serializable en JSON (para guardar el índice como artefacto).
+        """
+        return {
+            str(year): {
+                'stats': self.stats[year].to_dict(orient='split'),
+                'percentiles': self.percentiles[year].to_numpy().tolist(),
+                'rows': self.rows[year],
+                'columns': [str(column) for column in self.columns[year]],
+            }
+            for year in self.stats
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        for year, entry in data.items():
+            stats = pd.DataFrame(**entry['stats'])
+            index.stats[year] = stats
+            percentiles = np.array(entry['percentiles'], dtype=float).reshape(len(stats), len(PERCENTILES))
+            index.percentiles[year] = pd.DataFrame(percentiles, index=stats.index)
+            index.rows[year] = entry['rows']
+            index.columns[year] = entry['columns']
+        return index
+
+    def years(self):
+        return list(self.stats)
+
+    def has(self, year, column):
+        return year in self.stats and column in self.stats[year].index
+
+    def lookup(self, year, column, statistic):
+        return self.stats[year].at[column, statistic]
+
+    def quantile(self, year, column, q):
+        """
+        Cuantil aproximado `q` (entre 0 y 1) de una columna en un año.
+        """
+        return float(np.interp(q * 100, PERCENTILES, self.percentiles[year].loc[column].to_numpy()))
+
+    def combined(self, years, column, statistic):
+        """
+        Estadístico de una columna sobre varios años, combinando los resúmenes de cada año.
+        """
+        stats = [self.stats[year].loc[column] for year in years if self.has(year, column)]
+        if not stats:
+            return np.nan
+        count = sum(s['count'] for s in stats)
+        if statistic in ('count', 'sum', 'nulls'):
+            return sum(s[statistic] for s in stats)
+        if statistic == 'min':
+            return min(s['min'] for s in stats)
+        if statistic == 'max':
+            return max(s['max'] for s in stats)
+        if statistic == 'mean':
+            return sum(s['sum'] for s in stats) / count if count else np.nan
+        raise ValueError(f"Estadístico desconocido: {statistic}")
+
+    def combined_quantile(self, years, column, q):
+        """
+        Cuantil aproximado sobre varios años: los percentiles de cada año se tratan como
+        muestras ponderadas por el número de valores de ese año.
+        """
+        points = []
+        weights = []
+        for year in years:
+            if not self.has(year, column):
+                continue
+            count = self.stats[year].at[column, 'count']
+            row = self.percentiles[year].loc[column].to_numpy()
+            if count and not np.isnan(row).all():
+                points.append(row)
+                weights.append(np.full(len(row), count / len(row)))
+        if not points:
+            return np.nan
+        points = np.concatenate(points)
+        weights = np.concatenate(weights)
+        order = np.argsort(points)
+        cumulative = np.cumsum(weights[order])
+        return float(np.interp(q * cumulative[-1], cumulative, points[order]))
@@ -0,0 +1,61 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def _downcast_float(series):
+    values = series.to_numpy()
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+        # Sin nulos y con valores enteros: el entero más pequeño que los contenga
+        return pd.to_numeric(series, downcast='integer')
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+        return series.astype(np.float32)
+    return series
+
+
+def compact_frame(df, categorical_threshold=config.CATEGORICAL_THRESHOLD):
+    """
+    Reduce la memoria de un DataFrame sin perder información:
+    - enteros al tipo entero más pequeño que los contenga,
+    - flotantes a entero o float32 cuando la conversión es exacta,
+    - columnas de texto con pocos valores distintos (<= `categorical_threshold`) a `category`.
+      Si el DataFrame ya pasó por el preprocesamiento, se usan las columnas que su esquema
+      clasificó como categóricas, sin volver a contar valores distintos.
+
+    Devuelve el DataFrame compactado y un informe con los bytes antes, después y ahorrados.
+    """
+    bytes_before = int(df.memory_usage(index=True, deep=True).sum())
+    schema = df.attrs.get('schema')
+    categorical = None if schema is None else {entry['name'] for entry in schema['columns']
+                                               if entry['kind'] == 'categorical'}
+    compacted = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            compacted[column] = series
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            compacted[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype):
+            compacted[column] = _downcast_float(series)
+        elif series.dtype == object and (str(column) in categorical if categorical is not None
+                                         else series.nunique(dropna=True) <= categorical_threshold):
+            compacted[column] = series.astype('category')
+        else:
+            compacted[column] = series
+
+    result = pd.DataFrame(compacted, index=df.index)
+    result.attrs.update(df.attrs)
+    bytes_after = int(result.memory_usage(index=True, deep=True).sum())
+    report = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+    }
+    return result, report
@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.fingerprint import dataset_fingerprint
+
+
+def _numeric_matrix(data):
+    numeric = data.select_dtypes(include=['number', 'bool'])
+    return numeric.columns, numeric.to_numpy(dtype=float, na_value=np.nan)
+
+
+def correlation_matrix(values, pairwise=False):
+    """
+    Matriz de correlación de Pearson de las columnas de `values` (filas × columnas) a partir
+    de productos cruzados centrados, en una sola multiplicación de matrices.
+
+    - `pairwise=False`: cada columna se centra en su media y los valores nulos cuentan como la
+      media (no aportan a los productos). Es la opción rápida.
+    - `pairwise=True`: para cada par solo se usan las filas donde ambas columnas tienen valor,
+      igual que `DataFrame.corr()`.
+    """
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+        if not pairwise:
+            cross = centered.T @ centered
+            scale = np.sqrt(np.diag(cross))
+            corr = cross / np.outer(scale, scale)
+        else:
+            mask = valid.astype(float)
+            n = mask.T @ mask
+            sums = centered.T @ mask
+            squares = (centered ** 2).T @ mask
+            cov = centered.T @ centered - sums * sums.T / n
+            var = squares - sums ** 2 / n
+            corr = cov / np.sqrt(var * var.T)
+            corr[n < 2] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    diagonal = np.diag(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return corr
+
+
+class CorrelationService:
+    """
+    Calcula una vez la matriz de correlación completa de las columnas numéricas de cada
+    dataset y responde cualquier subconjunto de columnas recortándola.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def full_matrix(self, data, pairwise=False):
+        key = (dataset_fingerprint(data), pairwise)
+        with self._lock:
+            if key in self._matrices:
+                self._matrices.move_to_end(key)
+                return self._matrices[key]
+        columns, values = _numeric_matrix(data)
+        matrix = pd.DataFrame(correlation_matrix(values, pairwise), index=columns, columns=columns)
+        with self._lock:
+            self._matrices[key] = matrix
+            while len(self._matrices) > self.max_entries:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def clear(self):
+        with self._lock:
+            self._matrices.clear()
+
+    def matrix(self, data, columns=None, pairwise=False):
+        full = self.full_matrix(data, pairwise)
+        if columns is None:
+            return full
+        columns = list(columns)
+        return full.reindex(index=columns, columns=columns)
+
+    def top_pairs(self, data, k=10, threshold=config.CORRELATION_THRESHOLD, columns=None, pairwise=False):
+        """
+        Los `k` pares de columnas con mayor |r|, entre los que superan `threshold`.
+        Devuelve una lista de (columna_a, columna_b, r).
+        """
+        matrix = self.matrix(data, columns, pairwise)
+        values = matrix.to_numpy()
+        rows, cols = np.triu_indices(len(values), k=1)
+        r = values[rows, cols]
+        with np.errstate(invalid='ignore'):
+            keep = np.flatnonzero(np.abs(r) >= threshold)
+        order = keep[np.argsort(-np.abs(r[keep]), kind='stable')][:k]
+        labels = matrix.index
+        return [(labels[rows[i]], labels[cols[i]], float(r[i])) for i in order]
+
+
+correlation_service = CorrelationService()
@@ -1,74 +1,193 @@
-import streamlit as st
-from github import Github
 import pandas as pd
 import numpy as np
-from scipy import stats
-import requests
-import io
 import logging
 import traceback
 import re
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import config
+from src.dataset_cache import DatasetCache
+from src.repo_catalog import RepoCatalog
+from src.snapshot_store import SnapshotStore
+from src.compaction import compact_frame
+from src.preprocessing import preprocess_frame
+from src.process_pool import process_pool
+from src.trend_store import TrendStatsStore
+from src.trend_engine import compute_trends
+from src.fingerprint import snapshot_sha
+from src.column_stats import ColumnStatsIndex
+from src.question_engine import QuestionEngine
+from src.instrumentation import recorder, span
+from src.lazy_years import YearHandle
+from src.long_table import LongTable
+
+MAX_DOWNLOAD_WORKERS = 8
+
+
+def _coerce_numeric_text(series):
+    """
+    Convierte a número una columna de texto solo si todos sus valores no nulos son numéricos
+    (p. ej. separadores de miles o mezcla de coma y punto decimal). Si no, devuelve None.
+    """
+    text = series.astype(str).str.replace(r'\s', '', regex=True).str.replace(',', '.', regex=False)
+    converted = pd.to_numeric(text, errors='coerce')
+    if converted.notna().sum() == series.notna().sum():
+        return converted
+    return None
+
+
+def parse_csv_file(path):
+    """
+    Parsea un CSV del repositorio (separador ';' y coma decimal) desde un archivo local.
+    El parser lee el archivo por bloques y ya interpreta la coma decimal, así que solo se
+    revisan las columnas que quedan como texto. Es una función de módulo para poder
+    ejecutarse en un pool de procesos.
+    """
+    df = pd.read_csv(path, sep=';', decimal=',', encoding='utf-8', memory_map=True)
+
+    for col in df.columns[df.dtypes == object]:
+        converted = _coerce_numeric_text(df[col])
+        if converted is not None:
+            df[col] = converted
+    return df
+
+
+def prepare_csv_file(path, compact=True, preprocess=True):
+    """
+    Parsea un CSV; si `preprocess` es verdadero, elimina las columnas dispersas y clasifica las
+    demás (el esquema queda en `attrs['schema']`), y si `compact` es verdadero, lo compacta
+    (tipos más pequeños y categorías).
+    Devuelve el DataFrame, el informe de compactación (o None) y la duración de cada etapa
+    (se mide aquí porque esta función suele ejecutarse en otro proceso).
+    """
+    start = time.perf_counter()
+    df = parse_csv_file(path)
+    timings = {'parse': time.perf_counter() - start}
+    if preprocess:
+        start = time.perf_counter()
+        df, _ = preprocess_frame(df)
+        timings['preprocess'] = time.perf_counter() - start
+    report = None
+    if compact:
+        start = time.perf_counter()
+        df, report = compact_frame(df)
+        timings['compaction'] = time.perf_counter() - start
+    return df, report, timings
+
+
+def convert_csv_file(path, snapshots, sha, year=None, compact=True, preprocess=True):
+    """
+    Conversión única de un CSV a instantánea columnar; se ejecuta en el pool de procesos
+    y solo devuelve el informe de compactación y las duraciones, sin enviar el DataFrame de vuelta.
+    El esquema del preprocesamiento se guarda con la instantánea.
+    """
+    df, report, timings = prepare_csv_file(path, compact, preprocess)
+    snapshots.write(sha, df, year, metadata=_snapshot_metadata(df, report))
+    return report, timings
+
+
+def _snapshot_metadata(df, report):
+    metadata = {'compaction': report}
+    if 'schema' in df.attrs:
+        metadata['schema'] = df.attrs['schema']
+    return metadata
+
+
+def _streamlit_secret(name):
+    try:
+        import streamlit as st
+        return st.secrets["github"][name]
+    except Exception:
+        return None
+
 
 class DataAgent:
-    def __init__(self):
-        self.github_token = st.secrets["github"]["token"]
-        self.repo_name = st.secrets["github"]["repo"]
-        self.base_url = f"https://raw.githubusercontent.com/{self.repo_name}/main/"
-        self.data_directory = "datasets/produksjon-og-avlosertilskudd"
+    def __init__(self, token=None, repo=None, api_url=None, branch="main", raw_base_url=None,
+                 data_directory="datasets/produksjon-og-avlosertilskudd", data_root=None):
+        # Las credenciales se toman de los argumentos, luego de las variables de entorno y por
+        # último de st.secrets, para poder usar el agente también fuera de Streamlit
+        self.github_token = token or os.environ.get("GITHUB_TOKEN") or _streamlit_secret("token")
+        self.repo_name = repo or os.environ.get("GITHUB_REPO") or _streamlit_secret("repo")
+        if not self.repo_name:
+            raise ValueError("No se indicó el repositorio (argumento, GITHUB_REPO o st.secrets)")
+        self.branch = branch
+        self.api_url = api_url or os.environ.get("GITHUB_API_URL") or "https://api.github.com"
+        self.base_url = raw_base_url or f"https://raw.githubusercontent.com/{self.repo_name}/{self.branch}/"
+        self.data_directory = data_directory
+        # Todo lo que el agente guarda en disco (caché, instantáneas, estadísticos y catálogo)
+        # cuelga de `data_root`, por defecto `config.DATA_DIR`
+        self.data_root = data_root or config.DATA_DIR
+        self.cache = DatasetCache(self.data_root)
+        self.snapshots = SnapshotStore(self.data_root)
+        self.compact = True
+        self.preprocess = True
+        self.compaction_report = {}
+        self.trend_store = TrendStatsStore(os.path.join(self.data_root, "trend_stats.json"))
+        self._trend_cache = None
+        self._long_table = None
+        self._question_index = None
+        # Una misma instancia puede compartirse entre sesiones: los estadísticos de tendencias
+        # se actualizan bajo este cerrojo
+        self._trend_lock = threading.RLock()
+        self.catalog_path = os.path.join(self.data_root, "catalog.json")
+        self.catalog_diff = None
         logging.info(f"DataAgent inicializado con repo: {self.repo_name}")
 
     def list_csv_and_readme_files(self):
         logging.info("Iniciando listado de archivos CSV y README")
-        g = Github(self.github_token)
-        repo = g.get_repo(self.repo_name)
-        contents = repo.get_contents(self.data_directory)
-        
-        files = []
-        for content in contents:
-            if content.type == "dir":
-                year = content.name
-                year_contents = repo.get_contents(content.path)
-                csv_file = next((f for f in year_contents if f.name.endswith('.csv')), None)
-                readme_file = next((f for f in year_contents if f.name.lower() == 'readme.md'), None)
-                
-                if csv_file and readme_file:
-                    files.append({
-                        'year': year,
-                        'dataset': csv_file.download_url,
-                        'readme': readme_file.download_url
-                    })
-                    logging.info(f"Archivos encontrados para el año {year}")
-                else:
-                    logging.warning(f"No se encontraron archivos CSV o README para el año {year}")
-        
+        with span("listing", repo=self.repo_name) as attributes:
+            from github import Github
+            g = Github(self.github_token, base_url=self.api_url)
+            repo = g.get_repo(self.repo_name, lazy=True)
+            catalog = RepoCatalog.fetch(repo, self.branch, self.data_directory)
+            attributes['entries'] = len(catalog.entries)
+
+        # Guardar el catálogo para poder comparar entre ejecuciones
+        self.catalog_diff = catalog.diff(RepoCatalog.load(self.catalog_path))
+        catalog.save(self.catalog_path)
+        if any(self.catalog_diff.values()):
+            logging.info(f"Cambios en el catálogo: {len(self.catalog_diff['added'])} añadidos, "
+                         f"{len(self.catalog_diff['removed'])} eliminados, "
+                         f"{len(self.catalog_diff['changed'])} modificados")
+
+        # Cada año es un manejador perezoso: sus datos se cargan con `.load()` al pedirlos
+        files = [YearHandle(self, file_info) for file_info in catalog.year_files(self.data_directory, self.base_url)]
         logging.info(f"Total de años procesados: {len(files)}")
         return files
 
-    def load_readme(self, url):
+    def load_readme(self, url, sha=None):
         logging.info(f"Intentando cargar README desde: {url}")
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            content = response.text
+            path = self.cache.fetch(url, sha)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
             logging.info(f"README cargado exitosamente, longitud: {len(content)}")
             return content
         except Exception as e:
             logging.error(f"Error al cargar el README: {str(e)}")
             return None
 
-    def load_csv(self, url):
+    def load_csv(self, url, sha=None, columns=None):
+        """
+        Carga un CSV (desde su instantánea si ya existe). `columns` limita las columnas devueltas;
+        con instantánea, las demás ni siquiera se abren.
+        """
         logging.info(f"Intentando cargar CSV desde: {url}")
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            content = response.content.decode('utf-8')
-            df = pd.read_csv(io.StringIO(content), sep=';', decimal=',')
-            
-            # Convertir columnas numéricas a float, manejando valores vacíos
-            numeric_columns = df.select_dtypes(include=['object']).columns
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col].str.replace(',', '.'), errors='coerce')
-            
+            if sha and self.snapshots.exists(sha):
+                df = self.snapshots.load(sha, columns)
+                logging.info(f"CSV cargado desde la instantánea, shape: {df.shape}")
+                return df
+            path = self.cache.fetch(url, sha)
+            df, report, timings = prepare_csv_file(path, self.compact, self.preprocess)
+            self._record_compaction(url, report, timings)
+            if sha:
+                self.snapshots.write(sha, df, metadata=_snapshot_metadata(df, report))
+                df = self.snapshots.load(sha, columns)
+            elif columns is not None:
+                df = df[[column for column in df.columns if column in set(columns)]]
             logging.info(f"CSV cargado exitosamente, shape: {df.shape}")
             return df
         except Exception as e:
@@ -76,6 +195,99 @@ class DataAgent:
             logging.error(traceback.format_exc())
             return None
 
+    def _download_year(self, file_info):
+        # Si ya existe la instantánea del CSV no hace falta descargarlo
+        sha = file_info.get('dataset_sha')
+        csv_path = None if sha and self.snapshots.exists(sha) else self.cache.fetch(file_info['dataset'], sha)
+        readme_content = self.load_readme(file_info['readme'], file_info.get('readme_sha'))
+        return csv_path, readme_content
+
+    def load_all(self, files, progress_callback=None, max_workers=None, parse_workers=None):
+        """
+        Carga todos los años de `files` de forma concurrente.
+
+        Las descargas se ejecutan en un pool de hilos acotado y el parseo de cada CSV en un
+        pool de procesos, de modo que la red y la CPU se solapan. Cada CSV con SHA conocido se
+        convierte una sola vez a instantánea columnar y se abre mapeado en memoria. `progress_callback(hechos, total)`
+        se invoca desde el hilo que llama cada vez que un año termina.
+        Devuelve `(all_data, animal_codes)` en el mismo orden que `files`.
+        """
+        total = len(files)
+        if not total:
+            return {}, {}
+        max_workers = max_workers or min(MAX_DOWNLOAD_WORKERS, total)
+        parse_workers = parse_workers or min(os.cpu_count() or 1, total)
+
+        shas = {file_info['year']: file_info.get('dataset_sha') for file_info in files}
+        frames = {}
+        readmes = {}
+        completed = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as io_pool, \
+                process_pool(parse_workers) as cpu_pool:
+            downloads = {io_pool.submit(self._download_year, file_info): file_info['year'] for file_info in files}
+            parses = {}
+            pending = set(downloads)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in downloads:
+                        year = downloads[future]
+                        try:
+                            csv_path, readmes[year] = future.result()
+                        except Exception as e:
+                            logging.error(f"Error al descargar los datos del año {year}: {str(e)}")
+                        else:
+                            if csv_path is not None:
+                                if shas[year]:
+                                    parse_future = cpu_pool.submit(convert_csv_file, csv_path, self.snapshots,
+                                                                   shas[year], year, self.compact, self.preprocess)
+                                else:
+                                    parse_future = cpu_pool.submit(prepare_csv_file, csv_path, self.compact,
+                                                                   self.preprocess)
+                                parses[parse_future] = year
+                                pending.add(parse_future)
+                                continue
+                            try:
+                                frames[year] = self.snapshots.load(shas[year])
+                                metadata = self.snapshots.schema(shas[year]).get('metadata', {})
+                                self._record_compaction(year, metadata.get('compaction'))
+                            except Exception as e:
+                                logging.error(f"Error al abrir la instantánea del año {year}: {str(e)}")
+                    else:
+                        year = parses[future]
+                        try:
+                            if shas[year]:
+                                report, timings = future.result()
+                                frames[year] = self.snapshots.load(shas[year])
+                            else:
+                                frames[year], report, timings = future.result()
+                            self._record_compaction(year, report, timings)
+                            logging.info(f"CSV del año {year} cargado exitosamente, shape: {frames[year].shape}")
+                        except Exception as e:
+                            logging.error(f"Error al parsear el CSV del año {year}: {str(e)}")
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total)
+
+        all_data = {}
+        animal_codes = {}
+        for file_info in files:
+            year = file_info['year']
+            if year in frames:
+                all_data[year] = frames[year]
+            if readmes.get(year) is not None:
+                animal_codes.update(self.extract_animal_codes(readmes[year]))
+        return all_data, animal_codes
+
+    def _record_compaction(self, key, report, timings=None):
+        for stage, duration in (timings or {}).items():
+            recorder.record(stage, duration, source=str(key))
+        if report is None:
+            return
+        self.compaction_report[key] = report
+        logging.info(f"Compactación de {key}: {report['bytes_before']} -> {report['bytes_after']} bytes "
+                     f"({report['bytes_saved']} bytes ahorrados)")
+
     def extract_animal_codes(self, readme_content):
         animal_codes = {}
         pattern = r'(\d+)\s*=\s*(.+)'
@@ -84,32 +296,93 @@ class DataAgent:
             animal_codes[code] = name.strip()
         return animal_codes
 
+    def trend_result(self, all_data):
+        """
+        Resultado del motor de tendencias vectorizado para `all_data`, calculado una sola vez
+        y compartido por `find_significant_trends` y `calculate_animal_trends`.
+        Los años cuya instantánea ya está en los estadísticos persistidos no se vuelven a leer.
+        """
+        key = tuple((year, id(df)) for year, df in sorted(all_data.items()))
+        with self._trend_lock:
+            if self._trend_cache is None or self._trend_cache[0] != key:
+                with span("trends", years=len(key)):
+                    self._trend_cache = (key, self._compute_trend_result(all_data))
+            return self._trend_cache[1]
+
+    def _compute_trend_result(self, all_data):
+        # Solo los DataFrames tal como salen de su instantánea se persisten bajo su SHA. Los
+        # derivados (p. ej. un subconjunto de filas) heredan `attrs['snapshot']` pero su
+        # contenido es otro: se calculan sin tocar los estadísticos persistidos
+        shas = {year: snapshot_sha(df) for year, df in all_data.items()}
+        if not all(shas.values()):
+            return compute_trends(all_data)
+        changed = self.trend_store.retain(set(all_data))
+        for year, df in all_data.items():
+            changed |= self.trend_store.add_year(year, df, shas[year])
+        if changed:
+            self.trend_store.save()
+        return self.trend_store.result()
+
+    def long_table(self, all_data):
+        """
+        Tabla larga con todos los años de `all_data`, construida una sola vez mientras los
+        DataFrames de cada año no cambien.
+        """
+        key = tuple((year, id(df)) for year, df in sorted(all_data.items()))
+        with self._trend_lock:
+            if self._long_table is None or self._long_table[0] != key:
+                with span("long_table", years=len(key)):
+                    self._long_table = (key, LongTable.from_years(all_data))
+            return self._long_table[1]
+
+    def group_trends(self, all_data, key='kommunenr', columns=None, agg='sum'):
+        """
+        Tendencia de cada columna para cada grupo de `key` (por defecto, cada kommune).
+        """
+        table = self.long_table(all_data)
+        with span("group_trends", key=key, groups=0) as attributes:
+            trends = table.group_trends(key, columns, agg)
+            attributes['groups'] = len(trends.index.levels[0])
+        return trends
+
+    def update_trend_statistics(self, files):
+        """
+        Incorpora a los estadísticos de tendencias solo los años de `files` que aún no están
+        (o cuyo CSV cambió), sin cargar los demás. Devuelve la lista de años incorporados.
+        """
+        added = []
+        with self._trend_lock:
+            for file_info in files:
+                year, sha = file_info['year'], file_info.get('dataset_sha')
+                if sha and self.trend_store.has_year(year, sha):
+                    continue
+                data = self.load_csv(file_info['dataset'], sha)
+                if data is not None and self.trend_store.add_year(year, data, sha):
+                    added.append(year)
+            if self.trend_store.retain({file_info['year'] for file_info in files}) or added:
+                self.trend_store.save()
+                self._trend_cache = None
+        self._question_index = None
+        return added
+
     def find_significant_trends(self, all_data):
         trends = {}
-        years = sorted(all_data.keys())
-        
-        # Encontrar columnas comunes en todos los años
-        common_columns = set(all_data[years[0]].columns)
-        for year in years[1:]:
-            common_columns = common_columns.intersection(set(all_data[year].columns))
-        
-        for column in common_columns:
-            try:
-                values = [all_data[year][column].mean() for year in years]
-                slope, intercept, r_value, p_value, std_err = stats.linregress(range(len(years)), values)
-                if p_value < 0.05:  # Consideramos tendencias significativas si p < 0.05
-                    direction = "creciente" if slope > 0 else "decreciente"
-                    trends[column] = {
-                        "direction": direction,
-                        "p_value": p_value,
-                        "r_squared": r_value**2,
-                        "slope": slope,
-                        "intercept": intercept,
-                        "description": self.describe_trend(slope, r_value**2)
-                    }
-            except Exception as e:
-                logging.warning(f"No se pudo calcular la tendencia para la columna {column}: {str(e)}")
+        if not all_data:
+            return trends
+        result = self.trend_result(all_data)
 
+        # Consideramos tendencias significativas si p < 0.05
+        for i in np.flatnonzero(result.p_value < 0.05):
+            slope = float(result.slope[i])
+            r_squared = float(result.r_squared[i])
+            trends[result.columns[i]] = {
+                "direction": "creciente" if slope > 0 else "decreciente",
+                "p_value": float(result.p_value[i]),
+                "r_squared": r_squared,
+                "slope": slope,
+                "intercept": float(result.intercept[i]),
+                "description": self.describe_trend(slope, r_squared)
+            }
         return trends
 
     def describe_trend(self, slope, r_squared):
@@ -118,29 +391,25 @@ class DataAgent:
         return f"Tendencia {strength} y {speed}"
 
     def calculate_animal_trends(self, all_data):
-        animal_trends = {}
-        years = sorted(all_data.keys())
-        
-        # Encontrar columnas comunes en todos los años
-        common_columns = set(all_data[years[0]].columns)
-        for year in years[1:]:
-            common_columns = common_columns.intersection(set(all_data[year].columns))
-    
-        for column in common_columns:
-            try:
-                values = [all_data[year][column].mean() for year in years]
-                animal_trends[column] = {
-                    "years": years,
-                    "values": values
-                }
-            except Exception as e:
-                logging.warning(f"No se pudo calcular la tendencia para la columna {column}: {str(e)}")
-    
-        return animal_trends
-
-    def answer_question(self, data, question):
+        if not all_data:
+            return {}
+        result = self.trend_result(all_data)
+        return {
+            column: {"years": result.years, "values": result.means[:, i].tolist()}
+            for i, column in enumerate(result.columns)
+        }
+
+    def answer_question(self, data, question, year=None, index=None, animal_codes=None):
+        """
+        Responde una pregunta con el índice de resúmenes por columna. Si no se pasa `index`,
+        se construye una vez para `data` y se reutiliza en las preguntas siguientes.
+        """
         logging.info(f"Recibida pregunta: {question}")
-        # Implementa esta función para responder preguntas sobre los datos
-        # Por ahora, retornamos una respuesta genérica
-        logging.info("Respuesta genérica enviada")
-        return "Lo siento, aún no puedo responder a preguntas específicas sobre los datos."
\ No newline at end of file
+        if index is None:
+            year = year or data.attrs.get('year', 'datos')
+            if self._question_index is None or self._question_index[0] is not data:
+                self._question_index = (data, ColumnStatsIndex.build({year: data}))
+            index = self._question_index[1]
+        answer = QuestionEngine(index, animal_codes).answer(question, year)
+        logging.info("Respuesta enviada")
+        return answer
@@ -1,13 +1,17 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
 import base64
-import streamlit as st
+from src.lazy_imports import lazy_import
+from src.column_stats import ColumnStatsIndex
+from src.question_engine import QuestionEngine
+from src.column_matcher import get_matcher
+
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 class DataAnalystVisualizer:
     def __init__(self):
-        pass
+        self._index = None
 
     def analyze_and_visualize(self, df, question):
         # Generar una respuesta basada en la pregunta
@@ -41,33 +45,11 @@ class DataAnalystVisualizer:
             return response, None
 
     def generate_response(self, df, question):
-        question = question.lower()
-        if "promedio" in question or "media" in question:
-            column = self._extract_column(question, df.columns)
-            if column:
-                return f"El promedio de {column} es {df[column].mean():.2f}"
-        elif "máximo" in question:
-            column = self._extract_column(question, df.columns)
-            if column:
-                return f"El valor máximo de {column} es {df[column].max():.2f}"
-        elif "mínimo" in question:
-            column = self._extract_column(question, df.columns)
-            if column:
-                return f"El valor mínimo de {column} es {df[column].min():.2f}"
-        elif "total" in question or "suma" in question:
-            column = self._extract_column(question, df.columns)
-            if column:
-                return f"La suma total de {column} es {df[column].sum():.2f}"
-        elif "cuántos" in question or "cantidad" in question:
-            return f"El dataset contiene {len(df)} registros"
-        elif "columnas" in question:
-            return f"Las columnas del dataset son: {', '.join(df.columns)}"
-        else:
-            return "Lo siento, no puedo responder a esa pregunta en este momento."
+        # Los resúmenes por columna se calculan una vez por DataFrame y se reutilizan
+        if self._index is None or self._index[0] is not df:
+            self._index = (df, ColumnStatsIndex.build({'datos': df}))
+        return QuestionEngine(self._index[1]).answer(question, 'datos')
 
     def _extract_column(self, text, columns):
-        for col in columns:
-            if col.lower() in text.lower():
-                return col
-        return None
+        return get_matcher(columns).find(text)
 
@@ -1,24 +1,235 @@
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+from collections import OrderedDict
+import config
+from src.lazy_imports import lazy_import
+from src.fingerprint import dataset_fingerprint
+from src.correlation import correlation_service
 
-def plot_bar_chart(data, variable):
-    fig = px.bar(data, x=data.index, y=variable, title=f'Gráfico de barras de {variable}')
+# Plotly se importa al dibujar el primer gráfico, no al arrancar la aplicación
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
+MAX_OUTLIERS = 200
+HISTOGRAM_BINS = 50
+KDE_GRID_SIZE = 128
+_STATS_CACHE_SIZE = 512
+_stats_cache = OrderedDict()
+
+def lttb_indices(values, n_out):
+    """
+    Largest-Triangle-Three-Buckets: elige `n_out` posiciones de una serie ordenada que
+    conservan su forma visual (picos y valles). Devuelve las posiciones seleccionadas.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = values[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (values[start:end] - values[a])
+                      - (x[a] - x[start:end]) * (avg_y - values[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def bin_frame(data, n_bins):
+    """
+    Agrupa filas consecutivas en `n_bins` intervalos y devuelve el promedio de cada uno,
+    etiquetado con el índice de la primera fila del intervalo. Solo se promedian las columnas
+    numéricas.
+    """
+    n = len(data)
+    if n <= n_bins:
+        return data
+    bins = np.arange(n) * n_bins // n
+    binned = data.groupby(bins).mean(numeric_only=True)
+    binned.index = data.index[np.searchsorted(bins, binned.index)]
+    return binned
+
+def _sample_title(title, shown, total):
+    return title if shown >= total else f"{title} ({shown} de {total} filas)"
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+
+def numeric_columns(data):
+    return [column for column in data.columns if _is_numeric(data[column])]
+
+def plot_bar_chart(data, variable, max_points=config.MAX_PLOT_POINTS):
+    if not _is_numeric(data[variable]):
+        # Texto o categorías: frecuencia de los `max_points` valores más frecuentes; el resto se
+        # agrupa en una sola barra para que el tamaño de la figura siga acotado
+        counts = data[variable].value_counts()
+        if len(counts) > max_points:
+            top = counts.iloc[:max_points - 1]
+            counts = pd.Series(np.append(top.to_numpy(), counts.iloc[max_points - 1:].sum()),
+                               index=top.index.astype(str).append(pd.Index(['otros'])))
+        return px.bar(x=counts.index.astype(str), y=counts.to_numpy(), title=f'Frecuencia de {variable}',
+                      labels={'x': variable, 'y': 'frecuencia'})
+    series = data[variable].dropna()
+    if len(series) > max_points:
+        series = series.iloc[lttb_indices(series.to_numpy(dtype=float), max_points)]
+    title = _sample_title(f'Gráfico de barras de {variable}', len(series), data[variable].count())
+    fig = px.bar(x=series.index, y=series.to_numpy(), title=title, labels={'x': 'index', 'y': variable})
     return fig
 
+def _memoized(key, compute):
+    if key in _stats_cache:
+        _stats_cache.move_to_end(key)
+        return _stats_cache[key]
+    value = compute()
+    _stats_cache[key] = value
+    if len(_stats_cache) > _STATS_CACHE_SIZE:
+        _stats_cache.popitem(last=False)
+    return value
+
+def clear_caches():
+    # Vacía las estadísticas y matrices de correlación memorizadas (p. ej. para medir en frío)
+    _stats_cache.clear()
+    correlation_service.clear()
+
+def _finite_values(data, variable):
+    if not pd.api.types.is_numeric_dtype(data[variable]):
+        return np.empty(0)
+    values = data[variable].to_numpy(dtype=float, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+def compute_box_statistics(values, max_outliers=MAX_OUTLIERS):
+    """
+    Cuartiles, bigotes (1,5 × IQR, como Plotly) y una muestra acotada de valores atípicos
+    que incluye siempre los extremos.
+    """
+    values = np.sort(np.asarray(values, dtype=float))
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > max_outliers:
+        outliers = outliers[np.unique(np.linspace(0, len(outliers) - 1, max_outliers).astype(int))]
+    return {
+        'count': len(values), 'mean': float(values.mean()), 'std': float(values.std()),
+        'q1': float(q1), 'median': float(median), 'q3': float(q3),
+        'lowerfence': float(inside[0]), 'upperfence': float(inside[-1]),
+        'min': float(values[0]), 'max': float(values[-1]), 'outliers': outliers.tolist(),
+    }
+
+def compute_histogram(values, bins=HISTOGRAM_BINS):
+    counts, edges = np.histogram(values, bins=bins)
+    return {'counts': counts.tolist(), 'edges': edges.tolist()}
+
+def compute_density(values, grid_size=KDE_GRID_SIZE):
+    """
+    Densidad aproximada (KDE gaussiano con la regla de Scott) evaluada en una rejilla:
+    histograma fino suavizado por convolución, sin evaluar el núcleo en cada punto.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2 or values.min() == values.max():
+        return None
+    counts, edges = np.histogram(values, bins=grid_size)
+    step = edges[1] - edges[0]
+    bandwidth = max(values.std() * len(values) ** (-1 / 5), step)
+    half_width = int(np.ceil(3 * bandwidth / step))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    # Con pocos valores el núcleo puede ser más largo que la rejilla y `mode='same'` devolvería
+    # tantos puntos como el núcleo: se hace la convolución completa y se recorta a la rejilla
+    smoothed = np.convolve(counts, kernel / kernel.sum(), mode='full')[half_width:half_width + grid_size]
+    density = smoothed / (len(values) * step)
+    return {'grid': ((edges[:-1] + edges[1:]) / 2).tolist(), 'density': density.tolist()}
+
+def column_statistics(data, variable, kind):
+    """
+    Estadísticos de una columna ('box', 'histogram' o 'density'), calculados una vez por
+    (dataset, columna) y memorizados.
+    """
+    compute = {'box': compute_box_statistics, 'histogram': compute_histogram, 'density': compute_density}[kind]
+    key = (dataset_fingerprint(data), variable, kind)
+    return _memoized(key, lambda: compute(_finite_values(data, variable)))
+
+def _box_trace(stats, variable, x=None):
+    return go.Box(x=[x if x is not None else variable], q1=[stats['q1']], median=[stats['median']],
+                  q3=[stats['q3']], lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+                  mean=[stats['mean']], name=variable, boxpoints=False)
+
 def plot_box_chart(data, variable):
-    fig = px.box(data, y=variable, title=f'Gráfico de caja de {variable}')
+    stats = column_statistics(data, variable, 'box')
+    fig = go.Figure()
+    if stats is not None:
+        fig.add_trace(_box_trace(stats, variable))
+        if stats['outliers']:
+            fig.add_trace(go.Scatter(x=[variable] * len(stats['outliers']), y=stats['outliers'],
+                                     mode='markers', name='Valores atípicos', showlegend=False))
+    fig.update_layout(title=f'Gráfico de caja de {variable}', yaxis_title=variable)
     return fig
 
-def plot_scatter_chart(data, x_variable, y_variable):
-    fig = px.scatter(data, x=x_variable, y=y_variable, title=f'Gráfico de dispersión de {x_variable} vs {y_variable}')
+def plot_violin_chart(data, variable):
+    stats = column_statistics(data, variable, 'box')
+    density = column_statistics(data, variable, 'density')
+    fig = go.Figure()
+    if density is not None:
+        width = np.asarray(density['density'])
+        width = 0.4 * width / width.max()
+        fig.add_trace(go.Scatter(x=np.concatenate([-width, width[::-1]]),
+                                 y=density['grid'] + density['grid'][::-1],
+                                 fill='toself', mode='lines', name=variable))
+    if stats is not None:
+        box = _box_trace(stats, variable, x=0)
+        box.update(width=0.08, showlegend=False)
+        fig.add_trace(box)
+    fig.update_layout(title=f'Gráfico de violín de {variable}', yaxis_title=variable,
+                      xaxis=dict(showticklabels=False))
+    return fig
+
+def plot_distribution_chart(data, variable):
+    histogram = column_statistics(data, variable, 'histogram')
+    edges = np.asarray(histogram['edges'])
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=histogram['counts'],
+                           width=np.diff(edges), name=variable))
+    fig.update_layout(title=f'Distribución de {variable}', xaxis_title=variable,
+                      yaxis_title='Frecuencia', bargap=0)
+    return fig
+
+def plot_scatter_chart(data, x_variable, y_variable, max_points=config.MAX_PLOT_POINTS):
+    title = f'Gráfico de dispersión de {x_variable} vs {y_variable}'
+    if len(data) <= max_points:
+        return px.scatter(data, x=x_variable, y=y_variable, title=title)
+
+    # Muchas filas: muestra acotada y renderizado WebGL
+    points = data[[x_variable, y_variable]].dropna()
+    if len(points) > max_points:
+        positions = np.random.default_rng(0).choice(len(points), max_points, replace=False)
+        points = points.iloc[np.sort(positions)]
+    fig = go.Figure(go.Scattergl(x=points[x_variable], y=points[y_variable], mode='markers'))
+    fig.update_layout(title=_sample_title(title, len(points), len(data)),
+                      xaxis_title=x_variable, yaxis_title=y_variable)
     return fig
 
-def plot_stacked_bar_chart(data, variables):
+def plot_stacked_bar_chart(data, variables, max_points=config.MAX_PLOT_POINTS):
+    # Las barras apiladas comparten el eje X, así que se agregan por intervalos de filas.
+    # Solo tienen sentido para columnas numéricas; las demás se ignoran
+    variables = [variable for variable in variables if _is_numeric(data[variable])]
+    binned = bin_frame(data[variables], max_points)
+    title = 'Gráfico de barras apiladas'
+    if len(binned) < len(data):
+        title = f'{title} (promedio por intervalos de {int(np.ceil(len(data) / len(binned)))} filas)'
     fig = go.Figure()
     for variable in variables:
-        fig.add_trace(go.Bar(x=data.index, y=data[variable], name=variable))
-    fig.update_layout(barmode='stack', title='Gráfico de barras apiladas')
+        fig.add_trace(go.Bar(x=binned.index, y=binned[variable], name=variable))
+    fig.update_layout(barmode='stack', title=title)
     return fig
 
 def plot_radar_chart(data, variables):
@@ -57,7 +268,7 @@ def plot_animal_distribution(data, animal_columns, animal_codes):
     return fig
 
 def plot_animal_heatmap(data, animal_columns, animal_codes):
-    corr_matrix = data[animal_columns].corr()
+    corr_matrix = correlation_service.matrix(data, animal_columns, pairwise=True)
     animal_names = [f"{animal_codes.get(col, col)} ({col})" for col in corr_matrix.index]
     fig = px.imshow(corr_matrix, 
                     x=animal_names, 
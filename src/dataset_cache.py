@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import config
+from src.http_transport import default_transport
+from src.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def git_blob_sha(path):
+    """
+    Calcula el SHA de blob de git de un archivo local (el mismo que reporta la API de GitHub).
+    """
+    sha = hashlib.sha1()
+    sha.update(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DatasetCache:
+    """
+    Caché en disco, direccionada por contenido, para los archivos descargados del repositorio.
+
+    Los archivos se guardan bajo `config.DATA_DIR` con el SHA de blob de git como nombre.
+    Si se conoce el SHA y el blob ya existe, se sirve sin ninguna petición de red; si no,
+    se revalida con una petición condicional (ETag / Last-Modified). Todo lo descargado se
+    comprueba contra su SHA real antes de guardarlo: un CDN que aún sirve la versión anterior
+    no puede dejar un archivo viejo bajo el SHA nuevo.
+    """
+
+    def __init__(self, root=None, transport=None):
+        self.transport = transport or default_transport()
+        self.root = os.path.join(root or config.DATA_DIR, "cache")
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        # Los directorios se crean con la primera escritura, no al construir la caché
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def blob_path(self, sha):
+        return os.path.join(self.blob_dir, sha[:2], sha)
+
+    def lookup(self, url, sha=None):
+        """
+        Devuelve la ruta local del archivo si está en caché y sigue vigente para `sha`, o None.
+        """
+        if sha:
+            path = self.blob_path(sha)
+            return path if os.path.exists(path) else None
+        entry = self.index.get(url)
+        if entry and os.path.exists(self.blob_path(entry['sha'])):
+            return self.blob_path(entry['sha'])
+        return None
+
+    def fetch(self, url, sha=None):
+        """
+        Devuelve la ruta local del archivo de `url`, descargándolo solo si hace falta.
+        """
+        # Con el SHA del blob conocido, un acierto no necesita ninguna petición de red
+        path = self.lookup(url, sha) if sha else None
+        if path:
+            logger.info(f"Acierto de caché para {url} ({sha})")
+            self._remember(url, sha)
+            return path
+
+        headers = {}
+        entry = self.index.get(url)
+        # Un 304 solo confirma el blob ya guardado: si se pide otro SHA no sirve
+        if entry and (sha is None or entry['sha'] == sha) and os.path.exists(self.blob_path(entry['sha'])):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        # El transporte escribe por bloques (el cuerpo nunca está entero en memoria) y reanuda
+        # la descarga si se corta
+        os.makedirs(self.blob_dir, exist_ok=True)
+        tmp_path = os.path.join(self.blob_dir, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with span("download", url=url) as attributes:
+            try:
+                response, attributes['bytes'] = self.transport.download(url, tmp_path, headers)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            attributes['status'] = response.status_code
+            attributes['latency'] = response.elapsed.total_seconds()
+        if response.status_code == 304:
+            logger.info(f"Caché revalidada (304) para {url}")
+            return self.blob_path(entry['sha'])
+        return self._store(url, tmp_path, sha, response)
+
+    def _store(self, url, tmp_path, sha, response):
+        # El SHA de blob lleva delante la longitud final, que no se conoce mientras se reciben
+        # bloques (comprimidos o reanudados); se calcula con una lectura del archivo ya escrito
+        actual = git_blob_sha(tmp_path)
+        if sha and actual != sha:
+            os.remove(tmp_path)
+            raise ValueError(f"El contenido descargado de {url} no coincide con su SHA: "
+                             f"se esperaba {sha} y se recibió {actual}")
+        sha = actual
+        path = self.blob_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        self._remember(url, sha, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        logger.info(f"Archivo guardado en caché: {url} -> {sha}")
+        return path
+
+    def _remember(self, url, sha, etag=None, last_modified=None):
+        with self._lock:
+            entry = self.index.get(url, {})
+            if entry.get('sha') == sha and etag is None and last_modified is None:
+                return
+            if entry.get('sha') != sha:
+                entry = {}
+            entry['sha'] = sha
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            self.index[url] = entry
+            self._save_index()
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import config
+from src.fingerprint import dataset_fingerprint
+from src.instrumentation import span
+from src.lazy_imports import lazy_import
+
+pio = lazy_import('plotly.io')
+
+
+class FigureCache:
+    """
+    Caché LRU de figuras de Plotly serializadas en JSON, acotada por tamaño en bytes.
+
+    La clave combina la huella del dataset con la función de gráfico y sus parámetros, así que
+    una misma combinación dibujada por cualquier sesión se reutiliza sin volver a calcularla.
+    """
+
+    def __init__(self, max_bytes=config.FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, plot_function, *args, **kwargs):
+        parts = [f"{plot_function.__module__}.{plot_function.__name__}"]
+        # Los argumentos por nombre se resumen igual que los posicionales, precedidos del nombre
+        named = [(f"{name}=", value) for name, value in sorted(kwargs.items())]
+        for prefix, value in [('', value) for value in args] + named:
+            if isinstance(value, pd.DataFrame):
+                parts.append(prefix + dataset_fingerprint(value))
+            else:
+                parts.append(prefix + repr(value))
+        return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload):
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (payload, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def figure(self, plot_function, *args, **kwargs):
+        """
+        Devuelve `plot_function(*args, **kwargs)`, usando la copia serializada si ya existe.
+        """
+        with span("figure", function=plot_function.__name__) as attributes:
+            key = self.key(plot_function, *args, **kwargs)
+            payload = self.get(key)
+            attributes['cached'] = payload is not None
+            if payload is None:
+                payload = plot_function(*args, **kwargs).to_json()
+                self.put(key, payload)
+            attributes['bytes'] = len(payload)
+            return pio.from_json(payload)
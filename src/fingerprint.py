@@ -0,0 +1,58 @@
+import hashlib
+import weakref
+
+import pandas as pd
+
+_computed = {}
+_snapshots = {}
+
+
+def _remember(df, fingerprint, registry=_computed):
+    key = id(df)
+    registry[key] = (weakref.ref(df, lambda _, key=key: registry.pop(key, None)), fingerprint)
+
+
+def _lookup(df, registry):
+    entry = registry.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return None
+
+
+def register_snapshot(df, sha):
+    """
+    Registra `df`, tal como lo devuelve `SnapshotStore.load`, con una huella basada en el SHA
+    del CSV de origen (más columnas, forma y tipos). Solo ese objeto exacto usa el SHA: los
+    DataFrames derivados (`sort_values`, `fillna`...) heredan `attrs['snapshot']`, pero su
+    contenido puede ser otro, así que se resumen por contenido.
+    """
+    schema = f"{sha}|{df.shape}|{list(df.columns)}|{[str(dtype) for dtype in df.dtypes]}"
+    _remember(df, hashlib.sha1(schema.encode('utf-8')).hexdigest())
+    _remember(df, sha, _snapshots)
+
+
+def snapshot_sha(df):
+    """
+    SHA de la instantánea de `df` si es exactamente un objeto registrado con `register_snapshot`;
+    None para cualquier otro, aunque haya heredado `attrs['snapshot']`.
+    """
+    return _lookup(df, _snapshots)
+
+
+def dataset_fingerprint(df):
+    """
+    Huella estable del contenido de un DataFrame, para usar como clave de caché.
+
+    Los DataFrames registrados con `register_snapshot` usan la huella de su instantánea. El
+    resto se resume con un hash de su contenido, que se calcula una sola vez por objeto.
+    """
+    fingerprint = _lookup(df, _computed)
+    if fingerprint is not None:
+        return fingerprint
+
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, list(df.columns))).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    _remember(df, fingerprint)
+    return fingerprint
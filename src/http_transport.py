@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (5, 60)  # (conexión, lectura) en segundos
+MAX_RETRIES = 4
+BACKOFF = 0.5
+MAX_RETRY_WAIT = 60
+POOL_SIZE = 16
+CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class HttpTransport:
+    """
+    Transporte HTTP compartido: una sesión con conexiones persistentes (un pool por host),
+    compresión gzip, timeouts, reintentos con espera exponencial que respetan `Retry-After` y
+    los límites de la API de GitHub, y descargas a disco que se reanudan con `Range` si la
+    conexión se corta a mitad.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, backoff=BACKOFF,
+                 pool_size=POOL_SIZE, headers=None, sleep=time.sleep):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.session.headers.update(headers or {})
+
+    def retry_delay(self, response, attempt):
+        """
+        Espera antes del siguiente intento: `Retry-After` o el reinicio del límite de GitHub
+        si el servidor los indica, y si no espera exponencial. Nunca más de `MAX_RETRY_WAIT`.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), MAX_RETRY_WAIT)
+            reset = response.headers.get('X-RateLimit-Reset')
+            if response.headers.get('X-RateLimit-Remaining') == '0' and reset and reset.isdigit():
+                return min(max(float(reset) - time.time(), 0.0), MAX_RETRY_WAIT)
+        return min(self.backoff * 2 ** attempt, MAX_RETRY_WAIT)
+
+    def _should_retry(self, response):
+        if response.status_code in RETRY_STATUSES:
+            return True
+        # GitHub responde 403 cuando se agota el límite de peticiones
+        return response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+
+    def request(self, method, url, headers=None, stream=False):
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout, stream=stream)
+            except NETWORK_ERRORS as e:
+                if last:
+                    raise
+                delay = self.retry_delay(None, attempt)
+                logger.warning(f"Error de red en {url} ({type(e).__name__}); reintento en {delay:.1f} s")
+                self.sleep(delay)
+                continue
+            if last or not self._should_retry(response):
+                return response
+            delay = self.retry_delay(response, attempt)
+            logger.warning(f"Respuesta {response.status_code} de {url}; reintento en {delay:.1f} s")
+            response.close()
+            self.sleep(delay)
+
+    def get(self, url, headers=None, stream=False):
+        return self.request('GET', url, headers=headers, stream=stream)
+
+    @contextmanager
+    def open(self, url, headers=None):
+        """
+        Abre `url` como archivo binario ya descomprimido, para pasarlo directamente a un parser
+        (p. ej. `pd.read_csv`) sin guardar el cuerpo entero en memoria.
+        """
+        response = self.get(url, headers=headers, stream=True)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.raw
+        finally:
+            response.close()
+
+    def download(self, url, path, headers=None):
+        """
+        Descarga `url` en `path` por bloques. Si la conexión se corta y el servidor admite rangos
+        (y el cuerpo no viene comprimido), se pide solo lo que falta con `Range`; si no, se vuelve
+        a empezar. Devuelve `(respuesta, bytes escritos)`; con 304 no se escribe nada.
+        """
+        written = 0
+        response = None
+        for attempt in range(self.max_retries + 1):
+            request_headers = dict(headers or {})
+            if written:
+                request_headers.pop('If-None-Match', None)
+                request_headers.pop('If-Modified-Since', None)
+                request_headers.update({'Range': f'bytes={written}-', 'Accept-Encoding': 'identity'})
+                if response.headers.get('ETag'):
+                    request_headers['If-Range'] = response.headers['ETag']
+            response = self.get(url, headers=request_headers, stream=True)
+            if response.status_code == 304:
+                response.close()
+                return response, 0
+            response.raise_for_status()
+            if response.status_code != 206:
+                written = 0
+            try:
+                with open(path, 'ab' if written else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        written += len(chunk)
+                return response, written
+            except NETWORK_ERRORS as e:
+                response.close()
+                if attempt == self.max_retries:
+                    raise
+                if not self._resumable(response):
+                    written = 0
+                logger.warning(f"Descarga de {url} interrumpida tras {written} bytes ({type(e).__name__}); "
+                               f"{'se reanuda' if written else 'se reinicia'}")
+                self.sleep(self.retry_delay(None, attempt))
+
+    def _resumable(self, response):
+        accepts_ranges = response.status_code == 206 or response.headers.get('Accept-Ranges') == 'bytes'
+        return accepts_ranges and response.headers.get('Content-Encoding', 'identity') == 'identity'
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """
+    Transporte compartido por todo el proceso.
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
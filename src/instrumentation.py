@@ -0,0 +1,118 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+import config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PERCENTILES = (50, 90, 99)
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return 0
+    # ru_maxrss está en KiB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SpanRecorder:
+    """
+    Registro de tramos (spans) por etapa en un búfer circular acotado: solo se conservan los
+    últimos `max_spans`. Cada tramo guarda su duración, el crecimiento del pico de memoria del
+    proceso durante el tramo y los atributos de la etapa (bytes, URL, año...).
+    """
+
+    def __init__(self, max_spans=config.DIAGNOSTICS_MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def record(self, name, duration, **attributes):
+        entry = {'name': name, 'start': time.time() - duration, 'duration': duration}
+        entry.update(attributes)
+        with self._lock:
+            self._spans.append(entry)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Mide el bloque como un tramo `name`. Devuelve el diccionario de atributos para que el
+        bloque pueda añadir datos que solo conoce al final (p. ej. los bytes descargados).
+        """
+        start = time.perf_counter()
+        peak_before = _peak_rss_bytes()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes['error'] = type(e).__name__
+            raise
+        finally:
+            attributes['peak_rss_growth'] = _peak_rss_bytes() - peak_before
+            self.record(name, time.perf_counter() - start, **attributes)
+
+    def spans(self, name=None):
+        with self._lock:
+            spans = list(self._spans)
+        return [span for span in spans if name is None or span['name'] == name]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self):
+        """
+        Agregado por etapa: número de tramos, tiempo total, percentiles y máximo de la duración,
+        y bytes totales cuando la etapa los registra.
+        """
+        by_stage = {}
+        for span in self.spans():
+            by_stage.setdefault(span['name'], []).append(span)
+        summary = {}
+        for name, spans in by_stage.items():
+            durations = np.array([span['duration'] for span in spans])
+            stage = {'count': len(spans), 'total': float(durations.sum()), 'max': float(durations.max())}
+            for p, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES)):
+                stage[f'p{p}'] = float(value)
+            sizes = [span['bytes'] for span in spans if span.get('bytes') is not None]
+            if sizes:
+                stage['bytes'] = int(sum(sizes))
+            summary[name] = stage
+        return summary
+
+    def export_json(self):
+        return json.dumps({'summary': self.summary(), 'spans': self.spans()}, ensure_ascii=False,
+                          indent=2, default=str)
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Handler de logging que conserva solo las últimas `capacity` líneas formateadas.
+    """
+
+    def __init__(self, capacity=config.DIAGNOSTICS_MAX_LOG_LINES):
+        super().__init__()
+        self._lines = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self._lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def lines(self):
+        return list(self._lines)
+
+
+recorder = SpanRecorder()
+
+
+def span(name, **attributes):
+    return recorder.span(name, **attributes)
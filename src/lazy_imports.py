@@ -0,0 +1,87 @@
+"""
+Importaciones diferidas para las dependencias pesadas y un informe del tiempo de importación.
+
+Uso del informe:
+    python -m src.lazy_imports [módulo ...] [--top 25]
+"""
+import argparse
+import importlib
+import re
+import subprocess
+import sys
+import threading
+
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class LazyModule:
+    """
+    Sustituto de un módulo que solo lo importa al acceder al primer atributo. Hasta entonces
+    el módulo no aparece en `sys.modules`.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "cargado" if self._module is not None else "sin cargar"
+        return f"<módulo diferido {self._name} ({state})>"
+
+
+def lazy_import(name):
+    """
+    Devuelve el módulo si ya está importado y, si no, un `LazyModule` que lo importará al usarse.
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def profile_imports(modules, python=sys.executable):
+    """
+    Importa `modules` en un intérprete nuevo con `-X importtime` y devuelve, por cada módulo
+    importado, (nombre, tiempo propio en µs, tiempo acumulado en µs, profundidad).
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run([python, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {', '.join(modules)}:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def format_profile(entries, top=25):
+    total = sum(self_us for _, self_us, _, _ in entries)
+    lines = [f"Tiempo total de importación: {total / 1000:.1f} ms en {len(entries)} módulos",
+             f"{'módulo':<50} {'propio (ms)':>12} {'acumulado (ms)':>15}"]
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda entry: -entry[2])[:top]:
+        lines.append(f"{name:<50} {self_us / 1000:>12.1f} {cumulative_us / 1000:>15.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informe del tiempo de importación de los módulos de la aplicación.")
+    parser.add_argument("modules", nargs="*", default=["main"])
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+    print(format_profile(profile_imports(args.modules), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
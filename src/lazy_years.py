@@ -0,0 +1,214 @@
+import logging
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from src.fingerprint import register_snapshot, snapshot_sha
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 2
+
+
+class YearHandle(dict):
+    """
+    Entrada de `list_csv_and_readme_files` (año, URLs y SHA del CSV y del README) que además
+    sabe cargar sus datos bajo demanda. Cada carga se hace una sola vez aunque la pidan varios
+    hilos a la vez (la sesión que la necesita y el precargador).
+    """
+
+    def __init__(self, agent, file_info):
+        super().__init__(file_info)
+        self.agent = agent
+        self._lock = threading.Lock()
+        self._frame = None
+        self._numeric = None
+        self._readme = None
+        self.failed = False
+
+    @property
+    def loaded(self):
+        return self._frame is not None
+
+    def load(self):
+        # Un año fallido no se reintenta (descarga, reintentos y parseo) en cada ejecución de la
+        # página, solo tras `retry`
+        if self._frame is None and not self.failed:
+            with self._lock:
+                if self._frame is None and not self.failed:
+                    self._frame = self.agent.load_csv(self['dataset'], self.get('dataset_sha'))
+                    # Un año que no se pudo descargar o parsear deja de ofrecerse (ver `available_years`)
+                    self.failed = self._frame is None
+        return self._frame
+
+    def load_numeric(self):
+        """
+        Solo las columnas numéricas. Si la instantánea ya existe se abren únicamente esas
+        columnas, sin materializar las de texto.
+        """
+        if self._numeric is None and not self.failed:
+            sha = self.get('dataset_sha')
+            if self._frame is None and sha and self.agent.snapshots.exists(sha):
+                columns = self.agent.snapshots.columns(sha, kinds=('numeric',))
+                numeric = self.agent.load_csv(self['dataset'], sha, columns)
+            else:
+                frame = self.load()
+                numeric = None if frame is None else frame.select_dtypes(include=['number', 'bool'])
+                # Son exactamente las columnas numéricas de la instantánea
+                if numeric is not None and sha and snapshot_sha(frame) == sha:
+                    register_snapshot(numeric, sha)
+            with self._lock:
+                if self._numeric is None:
+                    self._numeric = numeric
+                self.failed = self.failed or numeric is None
+        return self._numeric
+
+    def retry(self):
+        """
+        Permite volver a intentar la carga de un año que falló.
+        """
+        with self._lock:
+            self.failed = False
+
+    def readme(self):
+        if self._readme is None and self.get('readme'):
+            self._readme = self.agent.load_readme(self['readme'], self.get('readme_sha'))
+        return self._readme
+
+
+class LazyYearData(Mapping):
+    """
+    Diccionario año -> DataFrame sobre los `YearHandle` de un listado, que carga cada año la
+    primera vez que se pide. `prefetch` precarga en segundo plano el resto de años, del más
+    reciente al más antiguo. `on_load(year, df)` se invoca una vez por año cargado.
+    """
+
+    def __init__(self, handles, on_load=None, max_workers=PREFETCH_WORKERS):
+        self.handles = {handle['year']: handle for handle in handles}
+        self.on_load = on_load
+        self.max_workers = max_workers
+        self._notified = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._futures = []
+        self._animal_codes = None
+
+    def __getitem__(self, year):
+        df = self.handles[year].load()
+        if df is None:
+            raise KeyError(year)
+        self._notify(year, df)
+        return df
+
+    def __iter__(self):
+        return iter(self.handles)
+
+    def __len__(self):
+        return len(self.handles)
+
+    def _notify(self, year, df):
+        with self._lock:
+            if year in self._notified:
+                return
+            self._notified.add(year)
+        if self.on_load is not None:
+            self.on_load(year, df)
+
+    def loaded_years(self):
+        return [year for year, handle in self.handles.items() if handle.loaded]
+
+    def failed_years(self):
+        return [year for year, handle in self.handles.items() if handle.failed]
+
+    def retry_failed(self):
+        """
+        Vuelve a ofrecer los años que fallaron; se cargarán de nuevo al pedirlos.
+        """
+        failed = self.failed_years()
+        for year in failed:
+            self.handles[year].retry()
+        return failed
+
+    def available_years(self):
+        """
+        Años que se pueden ofrecer: todos menos los que ya fallaron al cargarse.
+        """
+        return [year for year, handle in self.handles.items() if not handle.failed]
+
+    def prefetch(self, first=None):
+        """
+        Encola en segundo plano la carga de todos los años, empezando por `first` (si se
+        indica) y siguiendo del más reciente al más antiguo. Devuelve los futuros.
+        """
+        order = sorted(self.handles, reverse=True)
+        if first in self.handles:
+            order.remove(first)
+            order.insert(0, first)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+        self._futures = [self._executor.submit(self._prefetch_year, year) for year in order]
+        return self._futures
+
+    def wait(self, timeout=None):
+        """
+        Espera a que termine la precarga. Devuelve los años cargados.
+        """
+        if self._futures:
+            wait(self._futures, timeout=timeout)
+        return self.loaded_years()
+
+    def _prefetch_year(self, year):
+        try:
+            return self[year]
+        except KeyError:
+            logger.warning(f"No se pudo precargar el año {year}")
+        except Exception as e:
+            logger.error(f"Error al precargar el año {year}: {str(e)}")
+
+    def schemas(self):
+        """
+        Esquemas de preprocesamiento de los años ya cargados o con instantánea, sin cargar ninguno.
+        """
+        schemas = {}
+        for year, handle in self.handles.items():
+            sha = handle.get('dataset_sha')
+            if handle.loaded:
+                schemas[year] = handle.load().attrs.get('schema')
+            elif not handle.failed and sha and handle.agent.snapshots.exists(sha):
+                schemas[year] = handle.agent.snapshots.schema(sha).get('metadata', {}).get('schema')
+        return schemas
+
+    def numeric_frames(self):
+        """
+        Solo las columnas numéricas de cada año (lo que necesitan las tendencias). Los años que
+        no se pueden cargar se omiten.
+        """
+        frames = {}
+        for year, handle in self.handles.items():
+            if handle.failed:
+                continue
+            numeric = handle.load_numeric()
+            if numeric is not None:
+                frames[year] = numeric
+        return frames
+
+    def animal_codes(self):
+        """
+        Códigos de animales de todos los README (archivos pequeños, en paralelo). Los años más
+        recientes tienen prioridad si un código se describe de forma distinta.
+        """
+        if self._animal_codes is None:
+            handles = [self.handles[year] for year in sorted(self.handles)]
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(handles)))) as pool:
+                readmes = list(pool.map(YearHandle.readme, handles))
+            animal_codes = {}
+            for handle, readme in zip(handles, readmes):
+                if readme is not None:
+                    animal_codes.update(handle.agent.extract_animal_codes(readme))
+            self._animal_codes = animal_codes
+        return self._animal_codes
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
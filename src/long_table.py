@@ -0,0 +1,153 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.trend_engine import _regression, common_numeric_columns
+
+YEAR_COLUMN = 'year'
+GROUP_KEYS = ('kommunenr', 'fylkesnr', 'orgnr')
+AGGREGATIONS = ('sum', 'mean')
+TREND_FIELDS = ('slope', 'intercept', 'r_squared', 'p_value', 'n_years')
+TREND_CHUNK_COLUMNS = 64
+
+
+class LongTable:
+    """
+    Todos los años en una sola tabla larga: las filas de cada año van contiguas (la tabla está
+    particionada por año), con una columna `year` y las claves de grupo (kommunenr, fylkesnr,
+    orgnr) que existan. Para cada clave se guarda, la primera vez que se usa, la celda (grupo,
+    año) de cada fila, de modo que las tendencias por grupo no vuelven a factorizar la clave.
+    """
+
+    def __init__(self, frame, years, columns, group_keys):
+        self.frame = frame
+        self.years = list(years)
+        self.columns = list(columns)
+        self.group_keys = list(group_keys)
+        self._bounds = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+        start = 0
+        for year, size in frame[YEAR_COLUMN].value_counts(sort=False).reindex(self.years).items():
+            self._bounds[year] = (start, start + int(size))
+            start += int(size)
+
+    @classmethod
+    def from_years(cls, all_data, columns=None, group_keys=GROUP_KEYS):
+        """
+        Construye la tabla a partir de un diccionario año -> DataFrame. Por defecto se toman las
+        columnas numéricas comunes a todos los años (sin las claves de grupo); las claves solo se
+        incluyen si están en todos los años.
+        """
+        years = sorted(all_data.keys())
+        if not years:
+            return cls(pd.DataFrame({YEAR_COLUMN: pd.Categorical([], categories=[])}), [], [], [])
+        keys = [key for key in group_keys if all(key in all_data[year].columns for year in years)]
+        if columns is None:
+            columns = [column for column in common_numeric_columns(all_data, years) if column not in keys]
+        parts = []
+        for year in years:
+            df = all_data[year]
+            # Un único bloque float por año: los valores se copian una vez, sin fragmentar el DataFrame
+            values = pd.DataFrame(df[columns].to_numpy(dtype=float, na_value=np.nan), columns=columns)
+            part = pd.concat([pd.DataFrame({key: np.asarray(df[key]) for key in keys}), values], axis=1)
+            part[YEAR_COLUMN] = year
+            parts.append(part)
+        frame = pd.concat(parts, ignore_index=True)
+        frame[YEAR_COLUMN] = pd.Categorical(frame[YEAR_COLUMN], categories=years, ordered=True)
+        return cls(frame, years, columns, keys)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def partition(self, year):
+        """
+        Filas de un año, como vista contigua de la tabla.
+        """
+        start, stop = self._bounds[year]
+        return self.frame.iloc[start:stop]
+
+    def _index(self, key):
+        """
+        (celda (grupo, año) de cada fila, grupos) para `key`. Las filas con la clave vacía van
+        a una celda extra, la última, que se descarta al agregar.
+        """
+        if key not in self.group_keys:
+            raise KeyError(key)
+        with self._lock:
+            if key not in self._indexes:
+                codes, groups = pd.factorize(self.frame[key], sort=True)
+                year_codes = self.frame[YEAR_COLUMN].cat.codes.to_numpy()
+                cells = np.where(codes >= 0, codes.astype(np.int64) * len(self.years) + year_codes,
+                                 len(groups) * len(self.years))
+                self._indexes[key] = (cells, groups)
+            return self._indexes[key]
+
+    def aggregate(self, key, columns=None, agg='sum'):
+        """
+        Agrega las filas por (grupo, año). Devuelve (valores columnas × grupos × años, grupos);
+        una celda sin ningún valor de una columna queda como NaN.
+        """
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Agregación no soportada: {agg}")
+        columns = self.columns if columns is None else list(columns)
+        cells, groups = self._index(key)
+        size = len(groups) * len(self.years)
+        # Columnas × filas: cada columna contigua en memoria
+        values = self.frame[columns].to_numpy(dtype=float).T
+        result = np.empty((len(columns), size))
+        # Una reducción por columna con bincount, sin ordenar ni reagrupar la tabla
+        for j in range(len(columns)):
+            column = values[j]
+            present = ~np.isnan(column)
+            sums = np.bincount(cells, weights=np.where(present, column, 0.0), minlength=size + 1)[:size]
+            counts = np.bincount(cells, weights=present, minlength=size + 1)[:size]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[j] = np.where(counts > 0, sums / counts if agg == 'mean' else sums, np.nan)
+        return result.reshape(len(columns), len(groups), len(self.years)), groups
+
+    def group_trends(self, key, columns=None, agg='sum'):
+        """
+        Regresión lineal del valor agregado (`sum` o `mean`) de cada columna frente a la
+        posición del año, para cada grupo de `key`, calculada para todos los pares (grupo,
+        columna) a la vez. Los años en los que un grupo no tiene datos simplemente no cuentan.
+        Devuelve un DataFrame indexado por (grupo, columna) con slope, intercept, r_squared,
+        p_value y n_years.
+        """
+        columns = self.columns if columns is None else list(columns)
+        groups = self._index(key)[1]
+        result = np.empty((len(groups), len(columns), len(TREND_FIELDS)))
+        # Por bloques de columnas, para acotar la memoria de los intermedios grupos × años
+        for start in range(0, len(columns), TREND_CHUNK_COLUMNS):
+            chunk = columns[start:start + TREND_CHUNK_COLUMNS]
+            y, _ = self.aggregate(key, chunk, agg)
+            result[:, start:start + len(chunk)] = np.moveaxis(_grouped_regression(y), 0, 1)
+        index = pd.MultiIndex.from_product([groups, columns], names=[key, 'column'])
+        return pd.DataFrame(result.reshape(-1, len(TREND_FIELDS)), index=index, columns=list(TREND_FIELDS))
+
+
+def _grouped_regression(y):
+    """
+    Regresión frente a x = 0..años-1 sobre el último eje de `y` (columnas × grupos × años),
+    ignorando los NaN. Devuelve columnas × grupos × TREND_FIELDS.
+    """
+    mask = ~np.isnan(y)
+    y = np.where(mask, y, 0.0)
+    x = np.where(mask, np.arange(y.shape[-1], dtype=float), 0.0)
+
+    # Dos pasadas: medias por grupo y luego sumas centradas, sin acumular Σx² - (Σx)²/n
+    n = mask.sum(axis=-1).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = x.sum(axis=-1) / n
+        y_mean = y.sum(axis=-1) / n
+    x_dev = np.where(mask, x - x_mean[..., None], 0.0)
+    y_dev = np.where(mask, y - y_mean[..., None], 0.0)
+    ssx = np.einsum('...i,...i->...', x_dev, x_dev)
+    ssy = np.einsum('...i,...i->...', y_dev, y_dev)
+    sxy = np.einsum('...i,...i->...', x_dev, y_dev)
+    # Series constantes: anular el error de redondeo de la media
+    constant = ssy <= 1e-24 * np.einsum('...i,...i->...', y, y)
+    ssy[constant] = 0.0
+    sxy[constant] = 0.0
+    return np.stack(_regression(n, ssx, ssy, sxy, x_mean, y_mean) + (n,), axis=-1)
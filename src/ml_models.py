@@ -1,26 +1,203 @@
-from sklearn.cluster import KMeans
-
-def analyze_emissions(df):
-    """
-    Realiza un análisis de clustering de las emisiones.
-    """
-    # Seleccionar características para el clustering
-    X = df[['co2', 'nox']]
-    
-    # Realizar clustering
-    kmeans = KMeans(n_clusters=3, random_state=42)
-    df['cluster'] = kmeans.fit_predict(X)
-    
-    # Calcular estadísticas por cluster
-    cluster_stats = df.groupby('cluster').agg({
-        'co2': 'mean',
-        'nox': 'mean',
-        'merke': lambda x: x.value_counts().index[0]  # marca más común en el cluster
-    }).reset_index()
-    
-    cluster_stats.columns = ['Cluster', 'CO2 Promedio', 'NOx Promedio', 'Marca más común']
-    
-    return cluster_stats
-
-# ... (mantener las funciones existentes)
+import logging
+import os
+import threading
+from collections import OrderedDict
 
+import numpy as np
+import pandas as pd
+
+import config
+from src.fingerprint import dataset_fingerprint
+from src.lazy_imports import lazy_import
+from src.process_pool import process_pool
+
+cluster = lazy_import('sklearn.cluster')
+
+logger = logging.getLogger(__name__)
+
+RANDOM_STATE = 42
+FEATURE_LABELS = {'co2': 'CO2', 'nox': 'NOx'}
+
+
+def _feature_matrix(df, features):
+    """
+    Matriz filas × características (solo se copian esas columnas) y la máscara de las filas
+    sin nulos, que son las que se pueden agrupar.
+    """
+    values = df[list(features)].to_numpy(dtype=float, na_value=np.nan)
+    return values, ~np.isnan(values).any(axis=1)
+
+
+def _fit_estimator(values, n_clusters, random_state=RANDOM_STATE):
+    """
+    Ajusta el modelo sobre las filas de `values`. Por encima de `CLUSTER_MINIBATCH_ROWS` filas
+    se usa `MiniBatchKMeans`, que ajusta por lotes sin recorrer todo el conjunto en cada
+    iteración. Es una función de módulo para poder ejecutarse en un pool de procesos.
+    """
+    if len(values) > config.CLUSTER_MINIBATCH_ROWS:
+        estimator = cluster.MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state,
+                                            batch_size=config.CLUSTER_BATCH_SIZE, n_init=3)
+    else:
+        estimator = cluster.KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    return estimator.fit(values)
+
+
+class ClusterModel:
+    """
+    Modelo de clustering ya ajustado sobre unas características. `predict` asigna clusters a
+    filas nuevas sin volver a ajustar; las filas con alguna característica nula quedan con -1.
+    """
+
+    def __init__(self, features, estimator):
+        self.features = list(features)
+        self.estimator = estimator
+        self.n_clusters = len(estimator.cluster_centers_)
+
+    @property
+    def centers(self):
+        return pd.DataFrame(self.estimator.cluster_centers_, columns=self.features)
+
+    def predict(self, df):
+        values, valid = _feature_matrix(df, self.features)
+        labels = np.full(len(values), -1, dtype=np.int64)
+        if valid.any():
+            labels[valid] = self.estimator.predict(values[valid])
+        return labels
+
+    def statistics(self, df, labels=None, label_column=None):
+        if labels is None:
+            labels = self.predict(df)
+        return cluster_statistics(df, labels, self.features, self.n_clusters, label_column)
+
+
+def cluster_statistics(df, labels, features, n_clusters, label_column=None):
+    """
+    Tamaño, media de cada característica y, si se indica `label_column`, su valor más frecuente
+    por cluster. Todo se calcula con `bincount` sobre las etiquetas, sin agrupar ni modificar
+    `df`. Los clusters vacíos se omiten.
+    """
+    labels = np.asarray(labels)
+    assigned = labels >= 0
+    sizes = np.bincount(labels[assigned], minlength=n_clusters)
+    result = {'cluster': np.arange(n_clusters), 'size': sizes}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for feature in features:
+            values = df[feature].to_numpy(dtype=float, na_value=np.nan)
+            present = assigned & ~np.isnan(values)
+            sums = np.bincount(labels[present], weights=values[present], minlength=n_clusters)
+            result[feature] = sums / np.bincount(labels[present], minlength=n_clusters)
+    if label_column is not None:
+        codes, uniques = pd.factorize(df[label_column])
+        present = assigned & (codes >= 0)
+        counts = np.bincount(labels[present] * len(uniques) + codes[present],
+                             minlength=n_clusters * len(uniques)).reshape(n_clusters, len(uniques))
+        modes = np.asarray(uniques, dtype=object)[counts.argmax(axis=1)] if len(uniques) else np.full(n_clusters, None)
+        result['mode'] = np.where(counts.sum(axis=1) > 0, modes, None)
+    stats = pd.DataFrame(result)
+    return stats[stats['size'] > 0].reset_index(drop=True)
+
+
+class ClusteringService:
+    """
+    Ajusta una vez el modelo de cada dataset (por huella de contenido, características y número
+    de clusters) y lo conserva para predecir filas nuevas. `fit_years` ajusta los modelos de
+    varios años en paralelo en un pool de procesos.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, data, features, n_clusters):
+        return dataset_fingerprint(data), tuple(features), n_clusters
+
+    def cached(self, data, features=None, n_clusters=None):
+        """
+        El modelo ya ajustado para `data`, o None si aún no existe.
+        """
+        features = list(features or config.CLUSTER_FEATURES)
+        key = self._key(data, features, n_clusters or config.N_CLUSTERS)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def _store(self, key, model):
+        with self._lock:
+            self._models[key] = model
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+    def model(self, data, features=None, n_clusters=None):
+        features = list(features or config.CLUSTER_FEATURES)
+        n_clusters = n_clusters or config.N_CLUSTERS
+        model = self.cached(data, features, n_clusters)
+        if model is None:
+            values, valid = _feature_matrix(data, features)
+            model = ClusterModel(features, _fit_estimator(values[valid], n_clusters))
+            self._store(self._key(data, features, n_clusters), model)
+        return model
+
+    def fit_years(self, all_data, features=None, n_clusters=None, max_workers=None):
+        """
+        Modelos año -> `ClusterModel` para todos los años de `all_data`. Los que no están en caché
+        se ajustan en paralelo; a cada proceso solo se envía la matriz de características.
+        Los años que no se pueden ajustar (p. ej. menos filas que clusters) se omiten.
+        """
+        features = list(features or config.CLUSTER_FEATURES)
+        n_clusters = n_clusters or config.N_CLUSTERS
+        models = {}
+        pending = {}
+        for year, data in all_data.items():
+            model = self.cached(data, features, n_clusters)
+            if model is not None:
+                models[year] = model
+            else:
+                pending[year] = data
+        if not pending:
+            return models
+
+        max_workers = max_workers or min(os.cpu_count() or 1, len(pending))
+        with process_pool(max_workers) as pool:
+            futures = {}
+            for year, data in pending.items():
+                values, valid = _feature_matrix(data, features)
+                futures[year] = pool.submit(_fit_estimator, values[valid], n_clusters)
+            for year, future in futures.items():
+                try:
+                    model = ClusterModel(features, future.result())
+                except Exception as e:
+                    logger.error(f"Error al ajustar el clustering del año {year}: {str(e)}")
+                    continue
+                self._store(self._key(pending[year], features, n_clusters), model)
+                models[year] = model
+        return {year: models[year] for year in all_data if year in models}
+
+    def predict(self, data, rows, features=None, n_clusters=None):
+        """
+        Clusters de `rows` con el modelo de `data` (ajustándolo solo si aún no existe).
+        """
+        return self.model(data, features, n_clusters).predict(rows)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+clustering_service = ClusteringService()
+
+
+def analyze_emissions(df, features=None, label_column=config.CLUSTER_LABEL_COLUMN, n_clusters=None):
+    """
+    Realiza un análisis de clustering de las emisiones. `df` no se modifica; el modelo queda
+    en caché para predecir filas nuevas con `clustering_service.predict`.
+    """
+    model = clustering_service.model(df, features, n_clusters)
+    stats = model.statistics(df, label_column=label_column)
+
+    columns = {'cluster': 'Cluster'}
+    columns.update({feature: f"{FEATURE_LABELS.get(feature, feature)} Promedio" for feature in model.features})
+    columns['mode'] = 'Marca más común'
+    return stats.drop(columns='size').rename(columns=columns)
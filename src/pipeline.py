@@ -0,0 +1,202 @@
+"""
+Precálculo por lotes sin Streamlit: lista, descarga, parsea, calcula tendencias y resúmenes,
+y escribe artefactos versionados que la aplicación solo tiene que leer.
+
+Uso:
+    python -m src.pipeline --repo owner/repo [--token TOKEN] [--api-url URL] [--output DIR]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+
+import config
+from src.column_stats import ColumnStatsIndex
+from src.data_agent import DataAgent
+from src.shared_store import SharedDatasetStore
+from src.snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = 3
+LATEST_FILE = "LATEST"
+
+
+def artifacts_root(root=None):
+    return root or os.path.join(config.DATA_DIR, "artifacts")
+
+
+def artifact_version(files):
+    """
+    Versión de los artefactos: hash de los SHA de los CSV y README de entrada, de modo que la
+    misma entrada produce siempre la misma versión.
+    """
+    digest = hashlib.sha1(f"format {ARTIFACT_FORMAT}\n".encode('utf-8'))
+    for file_info in sorted(files, key=lambda file_info: file_info['year']):
+        digest.update(f"{file_info['year']}|{file_info.get('dataset_sha')}|"
+                      f"{file_info.get('readme_sha')}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def latest_version(root=None):
+    try:
+        with open(os.path.join(artifacts_root(root), LATEST_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_pipeline(agent, root=None, force=False, max_workers=None, parse_workers=None):
+    """
+    Ejecuta la ingesta completa con `agent` y publica los artefactos en `root`/<versión>.
+    Si la versión de la entrada ya es la última publicada no se recalcula nada (salvo `force`).
+    Devuelve la versión publicada.
+    """
+    root = artifacts_root(root)
+    files = agent.list_csv_and_readme_files()
+    version = artifact_version(files)
+    target = os.path.join(root, version)
+    if not force and latest_version(root) == version and os.path.exists(os.path.join(target, "manifest.json")):
+        logger.info(f"Los artefactos {version} ya están al día")
+        return version
+
+    started = time.time()
+    loaded, animal_codes = agent.load_all(files, max_workers=max_workers, parse_workers=parse_workers)
+    years = []
+    for file_info in files:
+        year = file_info['year']
+        df = loaded.get(year)
+        if df is None:
+            continue
+        sha = df.attrs.get('snapshot')
+        if not sha:
+            logger.warning(f"El año {year} no tiene instantánea; se omite de los artefactos")
+            continue
+        years.append({'year': year, 'sha': sha, 'readme_sha': file_info.get('readme_sha'),
+                      'rows': len(df), 'columns': len(df.columns)})
+    all_data = {entry['year']: loaded[entry['year']] for entry in years}
+
+    trends = agent.find_significant_trends(all_data)
+    animal_trends = agent.calculate_animal_trends(all_data)
+    stats_index = ColumnStatsIndex.build(all_data)
+
+    tmp_dir = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    _write_json(os.path.join(tmp_dir, "animal_codes.json"), animal_codes)
+    _write_json(os.path.join(tmp_dir, "trends.json"), {'significant': trends, 'animal': animal_trends})
+    _write_json(os.path.join(tmp_dir, "column_stats.json"), stats_index.to_dict())
+    _write_json(os.path.join(tmp_dir, "manifest.json"), {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'repo': agent.repo_name,
+        'branch': agent.branch,
+        'data_directory': agent.data_directory,
+        'years': years,
+        'compaction': agent.compaction_report,
+        'duration_seconds': round(time.time() - started, 3),
+    })
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+
+    latest_path = os.path.join(root, LATEST_FILE)
+    tmp_path = f"{latest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, latest_path)
+    logger.info(f"Artefactos {version} publicados: {len(years)} años en {time.time() - started:.1f} s")
+    return version
+
+
+class PipelineArtifacts:
+    """
+    Artefactos de una versión publicada por `run_pipeline`. Los datos de cada año se abren
+    mapeados en memoria desde las instantáneas solo cuando se piden.
+    """
+
+    def __init__(self, directory, snapshots):
+        self.directory = directory
+        self.manifest = _read_json(os.path.join(directory, "manifest.json"))
+        self.version = self.manifest['version']
+        self.all_data = SharedDatasetStore.from_snapshots(
+            [(entry['year'], entry['sha']) for entry in self.manifest['years']], snapshots)
+        self.animal_codes = _read_json(os.path.join(directory, "animal_codes.json"))
+        trends = _read_json(os.path.join(directory, "trends.json"))
+        self.trends = trends['significant']
+        self.animal_trends = trends['animal']
+        self.stats_index = ColumnStatsIndex.from_dict(_read_json(os.path.join(directory, "column_stats.json")))
+
+
+def load_artifacts(root=None, snapshots=None):
+    """
+    Abre la última versión publicada, o devuelve None si no hay ninguna utilizable
+    (sin publicar, de otro formato o con instantáneas que faltan).
+    """
+    version = latest_version(root)
+    if version is None:
+        return None
+    snapshots = snapshots or SnapshotStore()
+    try:
+        artifacts = PipelineArtifacts(os.path.join(artifacts_root(root), version), snapshots)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"No se pudieron leer los artefactos {version}: {str(e)}")
+        return None
+    if artifacts.manifest.get('format') != ARTIFACT_FORMAT:
+        logger.warning(f"Formato de artefactos no soportado en {version}")
+        return None
+    missing = [entry['year'] for entry in artifacts.manifest['years'] if not snapshots.exists(entry['sha'])]
+    if missing:
+        logger.warning(f"Faltan las instantáneas de los años {missing} para los artefactos {version}")
+        return None
+    return artifacts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Precalcula los artefactos de datos sin Streamlit.")
+    parser.add_argument("--token", help="Token de GitHub (por defecto GITHUB_TOKEN)")
+    parser.add_argument("--repo", help="Repositorio owner/nombre (por defecto GITHUB_REPO)")
+    parser.add_argument("--api-url", help="URL de la API de GitHub (por defecto GITHUB_API_URL)")
+    parser.add_argument("--raw-base-url", help="URL base de los archivos en bruto")
+    parser.add_argument("--branch", default="main")
+    parser.add_argument("--data-directory", default="datasets/produksjon-og-avlosertilskudd")
+    parser.add_argument("--output", help="Directorio de artefactos (por defecto data/artifacts)")
+    parser.add_argument("--workers", type=int, help="Procesos de parseo (por defecto, todos los núcleos)")
+    parser.add_argument("--download-workers", type=int, help="Hilos de descarga")
+    parser.add_argument("--force", action="store_true", help="Recalcular aunque la entrada no haya cambiado")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        agent = DataAgent(token=args.token, repo=args.repo, api_url=args.api_url, branch=args.branch,
+                          raw_base_url=args.raw_base_url, data_directory=args.data_directory)
+        version = run_pipeline(agent, args.output, force=args.force,
+                               max_workers=args.download_workers, parse_workers=args.workers)
+    except Exception as e:
+        logger.error(f"Error en el precálculo: {str(e)}")
+        return 1
+    print(version)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
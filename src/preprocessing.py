@@ -0,0 +1,92 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FORMAT = 1
+SPARSE_ACTIONS = ('drop', 'flag')
+
+
+def preprocess_frame(df, max_missing_ratio=config.MAX_MISSING_RATIO,
+                     categorical_threshold=config.CATEGORICAL_THRESHOLD, sparse=config.SPARSE_COLUMNS):
+    """
+    Etapa de preprocesamiento entre el parseo y la compactación:
+    - calcula de una vez la proporción de nulos de todas las columnas,
+    - elimina (`sparse='drop'`) o solo marca (`sparse='flag'`) las que superan `max_missing_ratio`,
+    - clasifica cada columna como numérica, categórica (texto con <= `categorical_threshold`
+      valores distintos) o texto.
+
+    Devuelve el DataFrame resultante (el de entrada no se modifica) y el esquema,
+    que también queda en `attrs['schema']` para que la compactación y la instantánea lo usen.
+    """
+    if sparse not in SPARSE_ACTIONS:
+        raise ValueError(f"Acción no soportada para columnas dispersas: {sparse}")
+    rows = len(df)
+    missing = df.isna().to_numpy().sum(axis=0) / rows if rows else np.zeros(len(df.columns))
+    is_sparse = missing > max_missing_ratio
+    numeric = np.array([pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+                        for dtype in df.dtypes], dtype=bool)
+
+    # Solo hace falta contar valores distintos en las columnas de texto que se conservan
+    distinct = {}
+    for i in np.flatnonzero(~numeric & ~(is_sparse & (sparse == 'drop'))):
+        distinct[i] = int(df.iloc[:, i].nunique(dropna=True))
+
+    columns = []
+    dropped = []
+    for i, column in enumerate(df.columns):
+        if is_sparse[i] and sparse == 'drop':
+            dropped.append(str(column))
+            continue
+        if numeric[i]:
+            kind = 'numeric'
+        else:
+            kind = 'categorical' if distinct[i] <= categorical_threshold else 'text'
+        entry = {'name': str(column), 'kind': kind, 'missing_ratio': float(missing[i]), 'sparse': bool(is_sparse[i])}
+        if i in distinct:
+            entry['distinct'] = distinct[i]
+        columns.append(entry)
+
+    result = df.drop(columns=df.columns[is_sparse]) if dropped else df.copy(deep=False)
+    schema = {
+        'format': SCHEMA_FORMAT,
+        'rows': rows,
+        'max_missing_ratio': max_missing_ratio,
+        'categorical_threshold': categorical_threshold,
+        'columns': columns,
+        'dropped': dropped,
+    }
+    if dropped:
+        logger.info(f"Preprocesamiento: {len(dropped)} columnas con más de un {max_missing_ratio:.0%} de nulos eliminadas")
+    result.attrs['schema'] = schema
+    return result, schema
+
+
+def schema_columns(schema, kinds=None, include_sparse=True):
+    """
+    Nombres de las columnas del esquema, opcionalmente solo las de los tipos `kinds`
+    ('numeric', 'categorical', 'text') y sin las marcadas como dispersas.
+    """
+    return [entry['name'] for entry in schema['columns']
+            if (kinds is None or entry['kind'] in kinds) and (include_sparse or not entry['sparse'])]
+
+
+def sparse_columns(schemas):
+    """
+    Columnas dispersas en todos los años en los que aparecen, decidido una sola vez sobre los
+    esquemas de todos los años: una columna que solo es dispersa en alguno se conserva en todos.
+    Si algún año no tiene esquema no se puede decidir y no se descarta ninguna.
+    """
+    flagged = set()
+    dense = set()
+    for schema in schemas:
+        if schema is None:
+            return set()
+        dense.update(schema_columns(schema, include_sparse=False))
+        flagged.update(schema_columns(schema))
+        flagged.update(schema['dropped'])
+    return flagged - dense
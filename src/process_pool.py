@@ -0,0 +1,17 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def process_context():
+    """
+    Contexto para los pools de procesos. Con `fork` un proceso hijo puede heredar un cerrojo
+    tomado por otro hilo (p. ej. el de un handler de logging mientras el pool de descargas
+    escribe) y bloquearse; `forkserver` arranca los hijos desde un proceso limpio. Donde no
+    existe (Windows) se usa `spawn`.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def process_pool(max_workers=None):
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context())
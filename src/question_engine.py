@@ -0,0 +1,95 @@
+import re
+
+import numpy as np
+
+from src.column_matcher import get_matcher
+
+YEAR_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+PERCENTILE_PATTERN = re.compile(r'percentil\s+(\d{1,3})')
+ALL_YEARS_KEYWORDS = ("todos los años", "todos los anos", "histórico", "historico")
+
+# (palabras clave, estadístico, plantilla de respuesta)
+OPERATIONS = (
+    (("mediana",), 0.5, "La mediana aproximada de {column}{scope} es {value:.2f}"),
+    (("promedio", "media"), 'mean', "El promedio de {column}{scope} es {value:.2f}"),
+    (("máximo", "maximo"), 'max', "El valor máximo de {column}{scope} es {value:.2f}"),
+    (("mínimo", "minimo"), 'min', "El valor mínimo de {column}{scope} es {value:.2f}"),
+    (("total", "suma"), 'sum', "La suma total de {column}{scope} es {value:.2f}"),
+    (("nulos", "faltantes", "vacíos"), 'nulls', "La columna {column}{scope} tiene {value:.0f} valores nulos"),
+)
+
+
+class QuestionEngine:
+    """
+    Responde preguntas sencillas sobre los datos a partir de un `ColumnStatsIndex`,
+    sin recorrer los DataFrames: cada respuesta es una búsqueda en el índice.
+    """
+
+    def __init__(self, index, animal_codes=None):
+        self.index = index
+        self.animal_codes = animal_codes or {}
+
+    def _years(self, question, default_year):
+        if any(keyword in question for keyword in ALL_YEARS_KEYWORDS):
+            return self.index.years()
+        mentioned = [year for year in YEAR_PATTERN.findall(question) if year in self.index.stats]
+        if len(mentioned) == 2 and "entre" in question:
+            first, last = sorted(mentioned)
+            return [year for year in self.index.years() if first <= year <= last]
+        if mentioned:
+            return sorted(set(mentioned))
+        if default_year is not None and default_year in self.index.stats:
+            return [default_year]
+        years = self.index.years()
+        return years[-1:] if years else []
+
+    def _column(self, question, years):
+        columns = list(self.index.stats[years[0]].index)
+        if len(years) > 1:
+            seen = set(columns)
+            for year in years[1:]:
+                columns.extend(column for column in self.index.stats[year].index if column not in seen)
+                seen.update(self.index.stats[year].index)
+        return get_matcher(columns, self.animal_codes).find(question)
+
+    def _value(self, years, column, statistic):
+        if len(years) == 1:
+            if isinstance(statistic, float):
+                return self.index.quantile(years[0], column, statistic)
+            return self.index.lookup(years[0], column, statistic)
+        if isinstance(statistic, float):
+            return self.index.combined_quantile(years, column, statistic)
+        return self.index.combined(years, column, statistic)
+
+    def answer(self, question, year=None):
+        question = question.lower()
+        years = self._years(question, year)
+        if not years:
+            return "No hay datos cargados para responder a esa pregunta."
+        if len(years) > 1:
+            scope = f" entre {years[0]} y {years[-1]}"
+        else:
+            scope = f" en {years[0]}" if YEAR_PATTERN.fullmatch(str(years[0])) else ""
+
+        operations = OPERATIONS
+        percentile = PERCENTILE_PATTERN.search(question)
+        if percentile and 0 <= int(percentile.group(1)) <= 100:
+            p = int(percentile.group(1))
+            template = f"El percentil {p} aproximado de {{column}}{{scope}} es {{value:.2f}}"
+            operations = ((("percentil",), p / 100, template),)
+
+        for keywords, statistic, template in operations:
+            if any(keyword in question for keyword in keywords):
+                column = self._column(question, years)
+                if column is None:
+                    return "No encontré en la pregunta ninguna columna numérica de los datos."
+                value = self._value(years, column, statistic)
+                if value is None or np.isnan(value):
+                    return f"No hay valores para {column}{scope}."
+                return template.format(column=column, scope=scope, value=value)
+
+        if "cuántos" in question or "cantidad" in question:
+            return f"El dataset contiene {sum(self.index.rows[y] for y in years)} registros{scope}"
+        if "columnas" in question:
+            return f"Las columnas del dataset son: {', '.join(map(str, self.index.columns[years[-1]]))}"
+        return "Lo siento, no puedo responder a esa pregunta en este momento."
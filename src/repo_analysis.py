@@ -1,4 +1,6 @@
 import logging
+import posixpath
+from src.repo_catalog import RepoCatalog
 
 logger = logging.getLogger(__name__)
 
@@ -10,12 +12,15 @@ def analyze_repository(repo):
             "datasets": []
         }
         
-        contents = repo.get_contents("datasets")
-        for content_file in contents:
-            if content_file.name.endswith('.csv'):
+        # Una sola petición recursiva al árbol en lugar de recorrer los directorios
+        catalog = RepoCatalog.fetch(repo, repo.default_branch, "datasets")
+        for entry in catalog.files("datasets"):
+            if entry['path'].endswith('.csv'):
                 repo_info["datasets"].append({
-                    "name": content_file.name,
-                    "path": content_file.path
+                    "name": posixpath.basename(entry['path']),
+                    "path": entry['path'],
+                    "size": entry['size'],
+                    "sha": entry['sha']
                 })
         
         return repo_info
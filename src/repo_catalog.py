@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import posixpath
+
+logger = logging.getLogger(__name__)
+
+
+def _tree_entries(tree, prefix=''):
+    return [{
+        'path': prefix + element.path,
+        'type': element.type,
+        'size': element.size,
+        'sha': element.sha,
+    } for element in tree.tree]
+
+
+class RepoCatalog:
+    """
+    Catálogo de todos los archivos de un repositorio (ruta, tamaño y SHA de blob),
+    obtenido con una única petición recursiva al árbol de git.
+
+    Si GitHub trunca el árbol (repositorios muy grandes), el catálogo se limita a `directory`,
+    que se pide aparte por el SHA de su árbol; `directory` indica entonces qué parte del
+    repositorio cubre el catálogo.
+    """
+
+    def __init__(self, entries, ref=None, tree_sha=None, truncated=False, directory=None):
+        self.entries = {entry['path']: entry for entry in entries}
+        self.ref = ref
+        self.tree_sha = tree_sha
+        self.truncated = truncated
+        self.directory = directory
+
+    @classmethod
+    def fetch(cls, repo, ref, directory=None):
+        """
+        Catálogo de `ref`. Con el árbol truncado solo se puede listar completo `directory`; sin
+        directorio se lanza ValueError en lugar de devolver un catálogo incompleto.
+        """
+        tree = repo.get_git_tree(ref, recursive=True)
+        entries = _tree_entries(tree)
+        truncated = bool(tree.raw_data.get('truncated', False))
+        if truncated:
+            if directory is None:
+                raise ValueError(f"El árbol de {ref} está truncado y el catálogo quedaría incompleto")
+            logger.warning(f"El árbol de {ref} está truncado; se lista solo {directory}")
+            directory = directory.strip('/')
+            sha = next((entry['sha'] for entry in entries
+                        if entry['path'] == directory and entry['type'] == 'tree'), None)
+            subtree = repo.get_git_tree(sha or cls._directory_sha(repo, ref, directory), recursive=True)
+            if subtree.raw_data.get('truncated', False):
+                raise ValueError(f"El árbol de {directory} en {ref} también está truncado")
+            entries = _tree_entries(subtree, directory + '/')
+        else:
+            directory = None
+        logger.info(f"Catálogo obtenido para {ref}: {len(entries)} entradas")
+        return cls(entries, ref=ref, tree_sha=tree.sha, truncated=truncated, directory=directory)
+
+    @staticmethod
+    def _directory_sha(repo, ref, directory):
+        """
+        SHA del árbol de `directory`, bajando nivel a nivel con listados no recursivos (por si
+        el listado recursivo truncado no llegó a incluirlo).
+        """
+        sha = ref
+        for name in directory.split('/'):
+            tree = repo.get_git_tree(sha)
+            sha = next((element.sha for element in tree.tree
+                        if element.path == name and element.type == 'tree'), None)
+            if sha is None:
+                raise ValueError(f"No existe el directorio {directory} en {ref}")
+        return sha
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga un catálogo guardado con `save`, o devuelve None si no existe o está dañado.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(data['entries'], ref=data.get('ref'), tree_sha=data.get('tree_sha'),
+                   truncated=data.get('truncated', False), directory=data.get('directory'))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ref': self.ref,
+                'tree_sha': self.tree_sha,
+                'truncated': self.truncated,
+                'directory': self.directory,
+                'entries': sorted(self.entries.values(), key=lambda entry: entry['path']),
+            }, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def files(self, prefix=''):
+        prefix = prefix.rstrip('/') + '/' if prefix else ''
+        return [entry for path, entry in sorted(self.entries.items())
+                if entry['type'] == 'blob' and path.startswith(prefix)]
+
+    def directories(self, parent):
+        parent = parent.rstrip('/')
+        return [entry for path, entry in sorted(self.entries.items())
+                if entry['type'] == 'tree' and posixpath.dirname(path) == parent]
+
+    def diff(self, previous):
+        """
+        Compara con un catálogo anterior y devuelve las rutas añadidas, eliminadas y modificadas.
+        Si alguno de los dos cubre solo un directorio, se compara únicamente esa parte.
+        """
+        scopes = [catalog.directory + '/' for catalog in (self, previous) if catalog and catalog.directory]
+
+        def covered(entries):
+            return {path: entry for path, entry in entries.items()
+                    if all(path.startswith(scope) for scope in scopes)}
+
+        current = covered(self.entries)
+        old = covered(previous.entries) if previous else {}
+        return {
+            'added': sorted(path for path in current if path not in old),
+            'removed': sorted(path for path in old if path not in current),
+            'changed': sorted(path for path, entry in current.items()
+                              if path in old and old[path]['sha'] != entry['sha']),
+        }
+
+    def year_files(self, directory, raw_base_url):
+        """
+        Devuelve, para cada subdirectorio de año de `directory`, el CSV y el README con sus SHA,
+        en el mismo formato que `DataAgent.list_csv_and_readme_files`.
+        """
+        by_directory = {}
+        for entry in self.files(directory):
+            by_directory.setdefault(posixpath.dirname(entry['path']), []).append(entry)
+
+        files = []
+        for year_dir in self.directories(directory):
+            year = posixpath.basename(year_dir['path'])
+            year_contents = by_directory.get(year_dir['path'], [])
+            csv_file = next((f for f in year_contents if f['path'].endswith('.csv')), None)
+            readme_file = next((f for f in year_contents
+                                if posixpath.basename(f['path']).lower() == 'readme.md'), None)
+            if csv_file and readme_file:
+                files.append({
+                    'year': year,
+                    'dataset': raw_base_url + csv_file['path'],
+                    'dataset_sha': csv_file['sha'],
+                    'readme': raw_base_url + readme_file['path'],
+                    'readme_sha': readme_file['sha'],
+                })
+                logger.info(f"Archivos encontrados para el año {year}")
+            else:
+                logger.warning(f"No se encontraron archivos CSV o README para el año {year}")
+        return files
@@ -0,0 +1,56 @@
+import logging
+import threading
+from collections.abc import Mapping
+
+from src.snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+class SharedDatasetStore(Mapping):
+    """
+    Almacén de datasets de solo lectura compartido por todo el proceso, con la interfaz de un
+    diccionario año -> DataFrame (se puede usar directamente como `all_data`).
+
+    Cada año se abre desde su instantánea, mapeado en memoria, la primera vez que se pide, y
+    todas las sesiones reciben el mismo objeto, sin copias. Como las páginas vienen de los
+    mismos archivos, varios procesos del servidor que abran los mismos artefactos comparten la
+    caché de páginas del sistema operativo en lugar de tener cada uno su copia.
+    """
+
+    def __init__(self, snapshots=None):
+        self.snapshots = snapshots or SnapshotStore()
+        self._shas = {}
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_snapshots(cls, shas, snapshots=None):
+        """
+        Crea el almacén a partir de pares (año, SHA) de instantáneas ya escritas; cada año se
+        abre la primera vez que se pide.
+        """
+        store = cls(snapshots)
+        store._shas = dict(shas)
+        return store
+
+    def __getitem__(self, year):
+        frame = self._frames.get(year)
+        if frame is not None:
+            return frame
+        if year not in self._shas:
+            raise KeyError(year)
+        with self._lock:
+            if year not in self._frames:
+                self._frames[year] = self.snapshots.load(self._shas[year])
+                logger.info(f"Año {year} adjuntado desde la instantánea {self._shas[year]}")
+            return self._frames[year]
+
+    def __iter__(self):
+        return iter(self._shas)
+
+    def __len__(self):
+        return len(self._shas)
+
+    def sha(self, year):
+        return self._shas.get(year)
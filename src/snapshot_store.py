@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.fingerprint import register_snapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 3
+
+
+class SnapshotStore:
+    """
+    Instantáneas columnares de los datasets ya parseados: un `.npy` por columna más un
+    `schema.json`. Las columnas se abren con memory-mapping, de modo que cargar un año no
+    copia datos y cada columna solo se lee del disco cuando algo la utiliza.
+
+    Las instantáneas se identifican por el SHA de blob del CSV del que proceden.
+    """
+
+    def __init__(self, root=None):
+        # El directorio se crea con la primera instantánea que se escribe
+        self.root = os.path.join(root or config.DATA_DIR, "snapshots")
+
+    def path(self, sha):
+        return os.path.join(self.root, sha)
+
+    def exists(self, sha):
+        """
+        True si hay una instantánea de `sha` en el formato actual. Las de formatos anteriores
+        cuentan como inexistentes y se vuelven a generar.
+        """
+        try:
+            return self.schema(sha).get('format') == SNAPSHOT_FORMAT
+        except (OSError, ValueError):
+            return False
+
+    def schema(self, sha):
+        with open(os.path.join(self.path(sha), "schema.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def columns(self, sha, kinds=None):
+        """
+        Nombres de las columnas de la instantánea, opcionalmente solo las de los tipos `kinds`
+        ('numeric', 'string', 'category').
+        """
+        return [entry['name'] for entry in self.schema(sha)['columns'] if kinds is None or entry['kind'] in kinds]
+
+    def write(self, sha, df, year=None, metadata=None):
+        """
+        Escribe `df` como instantánea columnar. La escritura es atómica: se usa un directorio
+        temporal que se renombra al final. `metadata` se guarda tal cual en el esquema.
+        """
+        target = self.path(sha)
+        tmp_dir = f"{target}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns = []
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            entry = {'name': str(column), 'file': f"{i}.npy", 'dtype': str(series.dtype)}
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                entry['kind'] = 'category'
+                self._save_categories(tmp_dir, i, series.cat.categories, series.cat.codes.to_numpy())
+            elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                entry['kind'] = 'numeric'
+                np.save(os.path.join(tmp_dir, entry['file']), series.to_numpy())
+            else:
+                # Texto: códigos enteros + valores únicos de ancho fijo, ambos mapeables
+                entry['kind'] = 'string'
+                codes, uniques = pd.factorize(series.astype('string'))
+                self._save_categories(tmp_dir, i, pd.Index(uniques.astype(str)), codes)
+            columns.append(entry)
+
+        with open(os.path.join(tmp_dir, "schema.json"), 'w', encoding='utf-8') as f:
+            json.dump({'format': SNAPSHOT_FORMAT, 'sha': sha, 'year': year, 'rows': len(df),
+                       'columns': columns, 'metadata': metadata or {}}, f, indent=2, ensure_ascii=False)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp_dir, target)
+        logger.info(f"Instantánea escrita para {year or sha}: {len(columns)} columnas, {len(df)} filas")
+        return target
+
+    def _save_categories(self, directory, i, categories, codes):
+        np.save(os.path.join(directory, f"{i}.npy"), np.asarray(codes))
+        np.save(os.path.join(directory, f"{i}.categories.npy"), np.asarray(categories.astype(str), dtype=str))
+
+    def load(self, sha, columns=None):
+        """
+        Abre la instantánea `sha` como DataFrame. Las columnas numéricas son vistas de solo lectura
+        sobre los archivos mapeados en memoria; `columns` limita las columnas que se abren.
+        """
+        directory = self.path(sha)
+        schema = self.schema(sha)
+        if schema.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Formato de instantánea no soportado: {schema.get('format')}")
+
+        wanted = None if columns is None else set(columns)
+        data = {}
+        for entry in schema['columns']:
+            if wanted is not None and entry['name'] not in wanted:
+                continue
+            values = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+            if entry['kind'] == 'numeric':
+                data[entry['name']] = values
+                continue
+            categories = np.load(os.path.join(directory, entry['file'].replace('.npy', '.categories.npy')))
+            categorical = pd.Categorical.from_codes(values, categories=pd.Index(categories.astype(object)))
+            if entry['kind'] == 'category':
+                data[entry['name']] = categorical
+            else:
+                data[entry['name']] = np.asarray(categorical, dtype=object)
+
+        df = pd.DataFrame(data, copy=False)
+        df.attrs['snapshot'] = sha
+        if schema.get('year') is not None:
+            df.attrs['year'] = schema['year']
+        if 'schema' in schema.get('metadata', {}):
+            df.attrs['schema'] = schema['metadata']['schema']
+        register_snapshot(df, sha)
+        return df
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+UI_STRING_PATTERN = re.compile(r'translate_text\(\s*"((?:[^"\\]|\\.)*)"\s*\)')
+RETRY_INTERVAL = 300
+BATCH_SIZE = 50
+
+
+def find_ui_strings(paths):
+    """
+    Busca en los archivos fuente todos los literales pasados a `translate_text(...)`.
+    """
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for text in UI_STRING_PATTERN.findall(f.read()):
+                if text not in texts:
+                    texts.append(text)
+    return texts
+
+
+def _default_translator():
+    from googletrans import Translator
+    return Translator()
+
+
+class TranslationCatalog:
+    """
+    Catálogo de traducciones persistido en disco, indexado por (texto, idioma destino).
+
+    `translate` nunca bloquea: devuelve la traducción guardada o, si no existe, el texto original
+    y encola la traducción para un hilo en segundo plano. Sin red funciona igual, solo con lo
+    que ya haya en el catálogo.
+    """
+
+    def __init__(self, path=None, dest='es', predefined=None, translator_factory=_default_translator):
+        self.path = path or os.path.join(config.DATA_DIR, "translations.json")
+        self.dest = dest
+        self.predefined = dict(predefined or {})
+        self.translator_factory = translator_factory
+        self._translator = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._failed = {}
+        self._worker = None
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False, indent=2, sort_keys=True)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, text, dest=None):
+        dest = dest or self.dest
+        if dest == self.dest and text in self.predefined:
+            return self.predefined[text]
+        return self.entries.get(dest, {}).get(text)
+
+    def translate(self, text, dest=None):
+        dest = dest or self.dest
+        translation = self.lookup(text, dest)
+        if translation is not None:
+            return translation
+        self.request([text], dest)
+        return text
+
+    def request(self, texts, dest=None):
+        """
+        Encola para traducción en segundo plano los textos que aún no están en el catálogo.
+        Los que fallaron hace menos de `RETRY_INTERVAL` segundos no se vuelven a pedir.
+        """
+        dest = dest or self.dest
+        now = time.monotonic()
+        missing = []
+        with self._lock:
+            for text in texts:
+                key = (text, dest)
+                if key in self._pending or self.lookup(text, dest) is not None:
+                    continue
+                if now - self._failed.get(key, -RETRY_INTERVAL) < RETRY_INTERVAL:
+                    continue
+                self._pending.add(key)
+                missing.append(text)
+            if missing:
+                self._queue.put((dest, missing))
+                self._ensure_worker()
+        return missing
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="translation-catalog", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                dest, texts = self._queue.get(timeout=1)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            for start in range(0, len(texts), BATCH_SIZE):
+                self._translate_batch(texts[start:start + BATCH_SIZE], dest)
+            self._queue.task_done()
+
+    def _translate_batch(self, texts, dest):
+        try:
+            if self._translator is None:
+                self._translator = self.translator_factory()
+            results = self._translator.translate(texts, dest=dest)
+            translations = {text: result.text for text, result in zip(texts, results)}
+        except Exception as e:
+            logger.warning(f"No se pudieron traducir {len(texts)} textos: {str(e)}")
+            translations = {}
+
+        now = time.monotonic()
+        with self._lock:
+            self.entries.setdefault(dest, {}).update(translations)
+            for text in texts:
+                self._pending.discard((text, dest))
+                if text not in translations:
+                    self._failed[(text, dest)] = now
+        if translations:
+            self.save()
+
+    def wait(self):
+        """
+        Espera a que se procesen las traducciones encoladas (útil en scripts y pruebas).
+        """
+        self._queue.join()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from src.lazy_imports import lazy_import
+from src.preprocessing import sparse_columns
+
+stats = lazy_import('scipy.stats')
+
+
+class TrendResult:
+    """
+    Resultado del motor de tendencias: la matriz años × columnas de promedios y, para cada
+    columna, la regresión lineal de esos promedios frente al índice del año.
+    """
+
+    def __init__(self, years, columns, means, regression=None):
+        self.years = list(years)
+        self.columns = list(columns)
+        self.means = means
+        if regression is None:
+            regression = linear_trends(means)
+        self.slope, self.intercept, self.r_squared, self.p_value = regression
+
+
+def common_numeric_columns(all_data, years):
+    """
+    Columnas numéricas presentes en todos los años, en el orden del primer año, sin las que
+    están marcadas como dispersas en todos ellos.
+    """
+    common = None
+    for year in years:
+        df = all_data[year]
+        numeric = {column for column, dtype in df.dtypes.items()
+                   if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)}
+        common = numeric if common is None else common & numeric
+    if not years:
+        return []
+    common -= sparse_columns(all_data[year].attrs.get('schema') for year in years)
+    first = all_data[years[0]].columns
+    return [column for column in first if column in common]
+
+
+def yearly_means(all_data, years, columns):
+    """
+    Matriz años × columnas con el promedio de cada columna. Cada año se reduce de una vez
+    por bloques de pandas, sin copiar las columnas seleccionadas.
+    """
+    means = np.empty((len(years), len(columns)))
+    for i, year in enumerate(years):
+        means[i] = all_data[year].mean(numeric_only=True).reindex(columns).to_numpy(dtype=float)
+    return means
+
+
+def _regression(n, ssx, ssy, sxy, x_mean, y_mean):
+    """
+    Pendiente, intercepto, r² y p-valor a partir de las sumas centradas. `n` puede ser un
+    escalar o un array (un número de observaciones distinto por regresión); con menos de dos
+    observaciones el resultado es NaN.
+    """
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / ssx
+        intercept = y_mean - slope * x_mean
+        r = np.where(ssy == 0, 0.0, sxy / np.sqrt(ssx * ssy))
+        r = np.where(np.isnan(ssy), np.nan, np.clip(r, -1.0, 1.0))
+        dof = n - 2
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1)), np.nan)
+        p_value = np.where(n == 2, np.where(ssy == 0, 1.0, 0.0), p_value)
+    invalid = np.isnan(ssy) | (n < 2)
+    if np.any(invalid):
+        slope, intercept, r, p_value = (np.where(invalid, np.nan, value) for value in (slope, intercept, r, p_value))
+    return slope, intercept, r ** 2, p_value
+
+
+def _empty_regression(size):
+    empty = np.full(size, np.nan)
+    return empty, empty.copy(), empty.copy(), empty.copy()
+
+
+def linear_trends(values):
+    """
+    Regresión lineal de cada columna de `values` (n × columnas) frente a x = 0..n-1, calculada
+    para todas las columnas a la vez. Reproduce los resultados de `scipy.stats.linregress`.
+    Devuelve (slope, intercept, r_squared, p_value); las columnas con NaN dan NaN.
+    """
+    n = values.shape[0]
+    if n < 2:
+        return _empty_regression(values.shape[1])
+
+    x = np.arange(n, dtype=float)
+    x_dev = x - x.mean()
+    y_mean = values.mean(axis=0)
+    y_dev = values - y_mean
+    ssy = np.einsum('ij,ij->j', y_dev, y_dev)
+    return _regression(n, np.dot(x_dev, x_dev), ssy, x_dev @ y_dev, x.mean(), y_mean)
+
+
+def compute_trends(all_data):
+    years = sorted(all_data.keys())
+    columns = common_numeric_columns(all_data, years)
+    return TrendResult(years, columns, yearly_means(all_data, years, columns))
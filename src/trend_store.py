@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+
+import numpy as np
+
+import config
+from src.preprocessing import sparse_columns
+from src.trend_engine import TrendResult
+
+logger = logging.getLogger(__name__)
+
+TREND_STORE_FORMAT = 5
+
+
+def _sparse_schema(schema):
+    if schema is None:
+        return None
+    return {'columns': [{'name': entry['name'], 'sparse': entry['sparse']} for entry in schema['columns']],
+            'dropped': list(schema['dropped'])}
+
+
+class TrendStatsStore:
+    """
+    Estadísticos suficientes de las tendencias, persistidos en disco.
+
+    Para cada año se guardan el número de valores y la suma de cada columna numérica, de donde
+    sale su promedio. Añadir o cambiar un año solo recorre ese año; la regresión se calcula sobre
+    la matriz años × columnas de promedios, en O(años × columnas), sin volver a leer ningún
+    dataset. No se acumulan momentos brutos (Σy², Σxy): con medias grandes y pendientes
+    pequeñas la resta Σy² - (Σy)²/n pierde toda la precisión.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config.DATA_DIR, "trend_stats.json")
+        self.years = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('format') != TREND_STORE_FORMAT:
+            logger.warning("Formato de estadísticos de tendencias no soportado; se recalcularán")
+            return
+        self.years = data['years']
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': TREND_STORE_FORMAT, 'years': self.years}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def sorted_years(self):
+        return sorted(self.years)
+
+    def has_year(self, year, sha=None):
+        return year in self.years and (sha is None or self.years[year].get('sha') == sha)
+
+    def add_year(self, year, df, sha=None):
+        """
+        Incorpora (o reemplaza) un año. Devuelve True si los estadísticos cambiaron.
+        """
+        if sha is not None and self.has_year(year, sha):
+            return False
+        numeric = df.select_dtypes(include=['number', 'bool'])
+        entry = {
+            'sha': sha,
+            'columns': [str(column) for column in numeric.columns],
+            'count': numeric.count().astype(float).tolist(),
+            'sum': numeric.sum().astype(float).tolist(),
+            # Lo justo del esquema de preprocesamiento para decidir las columnas dispersas
+            'schema': _sparse_schema(df.attrs.get('schema')),
+        }
+        previous = self.years.get(year)
+        if previous is not None and {k: previous[k] for k in ('columns', 'count', 'sum', 'schema')} == \
+                {k: entry[k] for k in ('columns', 'count', 'sum', 'schema')}:
+            previous['sha'] = sha
+            return False
+
+        self.years[year] = entry
+        logger.info(f"Año {year} incorporado a los estadísticos de tendencias")
+        return True
+
+    def retain(self, years):
+        """
+        Elimina los años que ya no existen. Devuelve True si hubo cambios.
+        """
+        removed = [year for year in self.years if year not in years]
+        for year in removed:
+            del self.years[year]
+        return bool(removed)
+
+    def _means(self, entry):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return dict(zip(entry['columns'], np.divide(entry['sum'], entry['count'])))
+
+    def result(self):
+        """
+        `TrendResult` equivalente a `compute_trends` sobre los años almacenados.
+        """
+        years = self.sorted_years()
+        if not years:
+            return TrendResult([], [], np.empty((0, 0)))
+        year_means = [self._means(self.years[year]) for year in years]
+        # Igual que `common_numeric_columns`: fuera las columnas dispersas en todos los años
+        sparse = sparse_columns(self.years[year]['schema'] for year in years)
+        columns = [column for column in self.years[years[0]]['columns']
+                   if column not in sparse and all(column in means for means in year_means)]
+        means = np.array([[means[column] for column in columns] for means in year_means], dtype=float)
+        return TrendResult(years, columns, means.reshape(len(years), len(columns)))
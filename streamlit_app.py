@@ -1,22 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from github import Github
-import io
-import base64
+from src.correlation import correlation_service
+from src.http_transport import default_transport
 
 # Configuración de la página
 st.set_page_config(page_title="Análisis de Datos Agrícolas de Noruega", page_icon="🇳🇴", layout="wide")
 
 # Función para cargar datos desde GitHub
 @st.cache_data
-def load_data_from_github(repo_name, file_path, token):
-    g = Github(token)
-    repo = g.get_repo(repo_name)
-    file_content = repo.get_contents(file_path)
-    decoded_content = base64.b64decode(file_content.content)
-    df = pd.read_csv(io.StringIO(decoded_content.decode('utf-8')), sep=';', decimal=',')
-    return df
+def load_data_from_github(repo_name, file_path, token, branch="main"):
+    # Se lee el archivo en bruto con el transporte compartido (conexiones persistentes, gzip y
+    # reintentos) y el cuerpo va directamente al parser, sin base64 ni copia en memoria
+    url = f"https://raw.githubusercontent.com/{repo_name}/{branch}/{file_path}"
+    with default_transport().open(url, headers={'Authorization': f"token {token}"}) as stream:
+        return pd.read_csv(stream, sep=';', decimal=',', encoding='utf-8')
 
 # Título de la aplicación
 st.title("Análisis de Datos de Producción y Subsidios Agrícolas de Noruega")
@@ -58,7 +56,7 @@ if selected_year in data:
     
     # Mapa de calor de correlaciones
     st.subheader("Mapa de Calor de Correlaciones")
-    corr = df[numeric_columns].corr()
+    corr = correlation_service.matrix(df, numeric_columns, pairwise=True)
     fig_heatmap = px.imshow(corr, text_auto=True, aspect="auto")
     st.plotly_chart(fig_heatmap)
 
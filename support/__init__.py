@@ -0,0 +1,4 @@
+"""
+Servidores locales y fábricas de agentes compartidos por las pruebas y los benchmarks, para que
+ninguno de los dos dependa del otro.
+"""
@@ -0,0 +1,11 @@
+from src.data_agent import DataAgent
+
+DIRECTORY = "datasets/produksjon-og-avlosertilskudd"
+
+
+def make_headless_agent(server, root, repo="owner/repo", token="token"):
+    """
+    Agente que lee del servidor local `server` (un `FakeGitHub`) y guarda todo bajo `root`.
+    """
+    return DataAgent(token=token, repo=repo, api_url=server.api_url, raw_base_url=server.raw_base_url,
+                     data_root=root)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import posixpath
+
+from support.http_standin import HttpStandIn
+
+
+def blob_sha(content):
+    return hashlib.sha1(f"blob {len(content)}\0".encode() + content).hexdigest()
+
+
+class FakeGitHub(HttpStandIn):
+    """
+    Servidor local que imita la API de árboles de GitHub y raw.githubusercontent.com
+    para un único repositorio, a partir de un diccionario ruta -> contenido. Los árboles se
+    piden por rama o por SHA, con o sin `recursive`; los listados de más de `truncate_after`
+    entradas se devuelven truncados, como hace GitHub con los árboles muy grandes.
+    """
+
+    def __init__(self, repo_name, tree, ref="main", truncate_after=None):
+        super().__init__()
+        self.repo_name = repo_name
+        self.ref = ref
+        self.tree = dict(tree)
+        self.truncate_after = truncate_after
+
+    @property
+    def api_url(self):
+        return self.base_url
+
+    @property
+    def root_sha(self):
+        return hashlib.sha1(repr(sorted(self.tree.items())).encode()).hexdigest()
+
+    @property
+    def raw_base_url(self):
+        return f"{self.base_url}/raw/{self.repo_name}/{self.ref}/"
+
+    def tree_entries(self, directory='', recursive=True):
+        """
+        Entradas bajo `directory` (la raíz por defecto), con rutas relativas a él.
+        """
+        prefix = directory + '/' if directory else ''
+        entries = []
+        for entry in self._all_entries():
+            if not entry['path'].startswith(prefix):
+                continue
+            path = entry['path'][len(prefix):]
+            if recursive or '/' not in path:
+                entries.append(dict(entry, path=path))
+        return entries
+
+    def _all_entries(self):
+        directories = set()
+        entries = []
+        for path, content in sorted(self.tree.items()):
+            parent = posixpath.dirname(path)
+            while parent and parent not in directories:
+                directories.add(parent)
+                parent = posixpath.dirname(parent)
+            entries.append({'path': path, 'mode': '100644', 'type': 'blob',
+                            'size': len(content), 'sha': blob_sha(content)})
+        for directory in directories:
+            entries.append({'path': directory, 'mode': '040000', 'type': 'tree',
+                            'sha': hashlib.sha1(directory.encode()).hexdigest()})
+        return sorted(entries, key=lambda entry: entry['path'])
+
+    def handle(self, request):
+        path, _, query = request.path.partition('?')
+        trees = {self.ref: '', self.root_sha: ''}
+        trees.update({entry['sha']: entry['path'] for entry in self._all_entries() if entry['type'] == 'tree'})
+        tree_prefix = f"/repos/{self.repo_name}/git/trees/"
+        requested = path[len(tree_prefix):] if path.startswith(tree_prefix) else None
+        if requested in trees:
+            entries = self.tree_entries(trees[requested], recursive='recursive=' in query)
+            truncated = self.truncate_after is not None and len(entries) > self.truncate_after
+            body = json.dumps({
+                'sha': self.root_sha if requested == self.ref else requested,
+                'url': self.url(path),
+                'tree': entries[:self.truncate_after] if truncated else entries,
+                'truncated': truncated,
+            }).encode()
+            request.send_response(200)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+            return
+        raw_prefix = f"/raw/{self.repo_name}/{self.ref}/"
+        self.files = {raw_prefix.lstrip('/') + p: content for p, content in self.tree.items()}
+        super().handle(request)
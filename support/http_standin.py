@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class HttpStandIn:
+    """
+    Servidor HTTP local que sirve archivos en memoria, con soporte de ETag / 304 y de rangos.
+    Registra cada petición recibida para poder comprobar el tráfico de red en las pruebas.
+    """
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.requests = []
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin.requests.append((self.path, dict(self.headers)))
+                standin.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def handle(self, request):
+        path = request.path.split('?')[0].lstrip('/')
+        if path not in self.files:
+            request.send_response(404)
+            request.end_headers()
+            return
+        body = self.files[path]
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+        status = 200
+        content_range = None
+        requested = request.headers.get('Range', '')
+        if requested.startswith('bytes=') and request.headers.get('If-Range', etag) == etag:
+            start = int(requested[len('bytes='):].split('-')[0])
+            content_range = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            body = body[start:]
+            status = 206
+        request.send_response(status)
+        request.send_header('ETag', etag)
+        request.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            request.send_header('Content-Range', content_range)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+
+from benchmarks.run import compare, run_suite
+from benchmarks.synthetic import DIRECTORY, generate_csv, generate_tree
+from src.data_agent import DataAgent, parse_csv_file
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    def test_csv_has_the_dataset_format(self):
+        content = generate_csv('2020', rows=50, n_codes=8)
+        header = content.decode('utf-8').splitlines()[0]
+        self.assertEqual(header.split(';')[:5], ['søknadsår', 'orgnr', 'kommunenr', 'kommunenavn', 'fylkesnr'])
+        self.assertIn(b',', content.split(b'\n', 1)[1])
+
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(content)
+            f.flush()
+            df = parse_csv_file(f.name)
+        self.assertEqual(df.shape, (50, 13))
+        self.assertEqual(df['103'].dtype, float)
+        self.assertGreater(df['103'].mean(), 10)
+
+    def test_readme_code_table(self):
+        tree = generate_tree(['2019', '2020'], rows=5, n_codes=3)
+        readme = tree[f"{DIRECTORY}/2020/README.md"].decode('utf-8')
+        codes = DataAgent.extract_animal_codes(None, readme)
+        self.assertEqual(codes, {'100': 'Melkekyr 1', '101': 'Ammekyr 1', '102': 'Sauer 1'})
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_small_run_measures_every_benchmark(self):
+        current = run_suite(years=2, rows=30, codes=4, repeats=1, only=['load_csv', 'trends', 'plot_box'])
+        self.assertEqual(set(current['results']), {'load_csv.cold', 'load_csv.warm', 'find_significant_trends',
+                                                   'calculate_animal_trends', 'group_trends.kommunenr',
+                                                   'plot.plot_animal_trends', 'plot.plot_box_chart'})
+        for result in current['results'].values():
+            self.assertGreater(result['seconds'], 0)
+            self.assertGreaterEqual(result['peak_bytes'], 0)
+
+    def test_compare_flags_regressions(self):
+        params = {'years': 1, 'rows': 10, 'codes': 2, 'seed': 0}
+        baseline = {'params': params, 'results': {
+            'a': {'seconds': 0.1, 'peak_bytes': 10 * 2 ** 20},
+            'b': {'seconds': 0.1, 'peak_bytes': 10 * 2 ** 20},
+        }}
+        current = {'params': params, 'results': {
+            'a': {'seconds': 0.2, 'peak_bytes': 10 * 2 ** 20},
+            'b': {'seconds': 0.105, 'peak_bytes': 20 * 2 ** 20},
+        }}
+        self.assertEqual(compare(current, baseline), [
+            ('a', 'seconds', 0.1, 0.2),
+            ('b', 'peak_bytes', 10 * 2 ** 20, 20 * 2 ** 20),
+        ])
+        other = dict(baseline, params=dict(params, rows=20))
+        self.assertEqual(compare(current, other), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
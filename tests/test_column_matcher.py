@@ -0,0 +1,31 @@
+import unittest
+
+from src.column_matcher import ColumnMatcher, get_matcher
+
+
+class TestColumnMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = ColumnMatcher(
+            ['121', '1210', 'areal', 'areal_dyrket', 'kommunenr'],
+            {'121': 'Melkekyr', '1210': 'Melkekyr i økologisk drift'})
+
+    def test_longest_match_wins(self):
+        self.assertEqual(self.matcher.find("promedio de areal_dyrket"), 'areal_dyrket')
+        self.assertEqual(self.matcher.find("total de melkekyr i økologisk drift"), '1210')
+
+    def test_find_all(self):
+        self.assertEqual(self.matcher.find_all("Compara 121, Areal y kommunenr con melkekyr"),
+                         ['121', 'areal', 'kommunenr'])
+
+    def test_word_boundaries(self):
+        self.assertIsNone(self.matcher.find("datos de 2021"))
+        self.assertEqual(self.matcher.find("datos del código 121 en 2021"), '121')
+
+    def test_matcher_is_built_once_per_schema(self):
+        self.assertIs(get_matcher(['a', 'b']), get_matcher(('a', 'b')))
+        self.assertIsNot(get_matcher(['a', 'b']), get_matcher(['a', 'c']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.compaction import compact_frame
+
+
+class TestCompaction(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'orgnr': [971203420.0, 985399077.0, 912345678.0, 998877665.0],
+            'kommunenr': [301, 1101, 301, 5001],
+            '121': [1.0, np.nan, 3.0, 40.0],
+            'areal': [0.1, 0.2, 0.3, 0.4],
+            'fylke': ['Oslo', 'Rogaland', 'Oslo', 'Trøndelag'],
+            'navn': ['A', 'B', 'C', 'D'],
+        })
+
+    def test_dtypes(self):
+        compacted, _ = compact_frame(self.df, categorical_threshold=3)
+        self.assertEqual(compacted['orgnr'].dtype, np.int32)
+        self.assertEqual(compacted['kommunenr'].dtype, np.int16)
+        self.assertEqual(compacted['121'].dtype, np.float32)
+        self.assertEqual(compacted['areal'].dtype, np.float64)
+        self.assertEqual(compacted['fylke'].dtype, 'category')
+        self.assertEqual(compacted['navn'].dtype, object)
+
+    def test_values_are_preserved(self):
+        compacted, report = compact_frame(self.df, categorical_threshold=3)
+        pd.testing.assert_frame_equal(compacted.astype({'fylke': object}), self.df, check_dtype=False)
+        self.assertGreater(report['bytes_saved'], 0)
+        self.assertEqual(report['bytes_before'] - report['bytes_after'], report['bytes_saved'])
+
+
+if __name__ == '__main__':
+    unittest.main()
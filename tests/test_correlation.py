@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import CorrelationService
+
+
+class TestCorrelationService(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=500)
+        self.df = pd.DataFrame({
+            '121': base,
+            '122': base * 2 + rng.normal(scale=0.1, size=500),
+            '123': rng.normal(size=500),
+            '124': -base + rng.normal(scale=0.5, size=500),
+            'konstant': np.ones(500),
+            'navn': ['x'] * 500,
+        })
+        self.df.loc[rng.choice(500, 100, replace=False), '123'] = np.nan
+        self.df.loc[rng.choice(500, 50, replace=False), '121'] = np.nan
+        self.service = CorrelationService()
+
+    def test_pairwise_matches_pandas(self):
+        expected = self.df.drop(columns='navn').corr()
+        result = self.service.matrix(self.df, pairwise=True)
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, atol=1e-10)
+
+    def test_fast_mode_without_nulls_matches_pandas(self):
+        complete = self.df[['122', '124', 'konstant']]
+        pd.testing.assert_frame_equal(self.service.matrix(complete), complete.corr(),
+                                      check_exact=False, atol=1e-10)
+
+    def test_subsets_are_slices_of_the_cached_matrix(self):
+        full = self.service.full_matrix(self.df, pairwise=True)
+        self.assertIs(self.service.full_matrix(self.df, pairwise=True), full)
+        subset = self.service.matrix(self.df, ['124', '121'], pairwise=True)
+        self.assertEqual(list(subset.index), ['124', '121'])
+        self.assertEqual(subset.loc['124', '121'], full.loc['124', '121'])
+
+    def test_top_pairs(self):
+        pairs = self.service.top_pairs(self.df, k=5, threshold=0.7, pairwise=True)
+        self.assertEqual(pairs[0][:2], ('121', '122'))
+        self.assertEqual({(a, b) for a, b, _ in pairs}, {('121', '122'), ('121', '124'), ('122', '124')})
+        self.assertTrue(all(abs(r) >= 0.7 for _, _, r in pairs))
+        self.assertEqual(len(self.service.top_pairs(self.df, k=1, pairwise=True)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.data_agent import DataAgent, parse_csv_file
+from support.fake_github import FakeGitHub, blob_sha
+from support.http_standin import HttpStandIn
+
+SECRETS = {"github": {"token": "token", "repo": "owner/repo"}}
+
+
+def make_agent(cache_root):
+    with mock.patch('streamlit.secrets', SECRETS):
+        return DataAgent(data_root=cache_root)
+
+
+class TestParseCsvFile(unittest.TestCase):
+
+    def test_only_text_columns_that_are_numbers_are_coerced(self):
+        content = ("kommunenr;kommunenavn;121;122\n"
+                   "301;Oslo;1,5;1 200\n"
+                   "1101;Eigersund;;3 400,5\n").encode('utf-8')
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(content)
+            f.flush()
+            df = parse_csv_file(f.name)
+
+        self.assertEqual(df['kommunenr'].tolist(), [301, 1101])
+        self.assertEqual(df['kommunenavn'].tolist(), ['Oslo', 'Eigersund'])
+        self.assertEqual(df['121'].dtype, float)
+        self.assertEqual(df['122'].tolist(), [1200.0, 3400.5])
+
+
+class TestDataAgentListing(unittest.TestCase):
+
+    def test_list_csv_and_readme_files_from_catalog(self):
+        tree = {
+            "datasets/produksjon-og-avlosertilskudd/2020/dataset.csv": b"kommunenr;121\n301;1\n",
+            "datasets/produksjon-og-avlosertilskudd/2020/README.md": b"121 = Melkekyr\n",
+        }
+        with tempfile.TemporaryDirectory() as tmp, FakeGitHub("owner/repo", tree) as server:
+            agent = make_agent(tmp)
+            agent.api_url = server.api_url
+            agent.base_url = server.raw_base_url
+            files = agent.list_csv_and_readme_files()
+            self.assertEqual(len(server.requests), 1)
+            self.assertEqual(len(agent.catalog_diff['added']), 5)
+
+            data = agent.load_csv(files[0]['dataset'], files[0]['dataset_sha'])
+            self.assertEqual(data['121'].tolist(), [1])
+
+            agent.list_csv_and_readme_files()
+            self.assertFalse(any(agent.catalog_diff.values()))
+
+
+class TestDataAgentLoadAll(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.files = {}
+        for i, year in enumerate(['2018', '2019', '2020']):
+            self.files[f'{year}/dataset.csv'] = f"kommunenr;121\n301;{i},5\n1101;{i + 1}\n".encode('utf-8')
+            self.files[f'{year}/README.md'] = f"121 = Melkekyr {year}\n".encode('utf-8')
+
+    def file_list(self, server, years):
+        return [{
+            'year': year,
+            'dataset': server.url(f'{year}/dataset.csv'),
+            'readme': server.url(f'{year}/README.md'),
+        } for year in years]
+
+    def test_load_all_keeps_order_and_reports_progress(self):
+        with HttpStandIn(self.files) as server:
+            agent = make_agent(self.tmp.name)
+            progress = []
+            all_data, animal_codes = agent.load_all(
+                self.file_list(server, ['2018', '2019', '2020']),
+                progress_callback=lambda done, total: progress.append((done, total)),
+                parse_workers=2)
+
+        self.assertEqual(list(all_data), ['2018', '2019', '2020'])
+        self.assertEqual(all_data['2019']['121'].tolist(), [1.5, 2.0])
+        self.assertEqual(animal_codes, {'121': 'Melkekyr 2020'})
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    def test_load_all_reuses_snapshots(self):
+        with HttpStandIn(self.files) as server:
+            files = self.file_list(server, ['2018', '2019'])
+            for file_info in files:
+                file_info['dataset_sha'] = blob_sha(self.files[f"{file_info['year']}/dataset.csv"])
+            agent = make_agent(self.tmp.name)
+            first, _ = agent.load_all(files, parse_workers=2)
+            requests_after_first_load = len(server.requests)
+
+            second, _ = make_agent(self.tmp.name).load_all(files, parse_workers=2)
+            # Solo se vuelven a pedir los README; los CSV salen de las instantáneas
+            self.assertEqual(len(server.requests) - requests_after_first_load, 2)
+
+        self.assertEqual(second['2019'].attrs['snapshot'], blob_sha(self.files['2019/dataset.csv']))
+        pd.testing.assert_frame_equal(first['2019'], second['2019'])
+
+    def test_load_all_skips_failed_years(self):
+        del self.files['2019/dataset.csv']
+        with HttpStandIn(self.files) as server:
+            agent = make_agent(self.tmp.name)
+            all_data, _ = agent.load_all(self.file_list(server, ['2018', '2019', '2020']), parse_workers=1)
+        self.assertEqual(list(all_data), ['2018', '2020'])
+
+
+class TestDataAgentTrends(unittest.TestCase):
+
+    def test_trends_share_one_result(self):
+        all_data = {
+            str(year): pd.DataFrame({'121': [i, i + 1.0], '122': [5.0, 5.0], 'navn': ['a', 'b']})
+            for i, year in enumerate(range(2017, 2022))
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = make_agent(tmp)
+            trends = agent.find_significant_trends(all_data)
+            animal_trends = agent.calculate_animal_trends(all_data)
+
+        self.assertEqual(list(trends), ['121'])
+        self.assertEqual(trends['121']['direction'], 'creciente')
+        self.assertAlmostEqual(trends['121']['slope'], 1.0)
+        self.assertEqual(animal_trends['121']['values'], [0.5, 1.5, 2.5, 3.5, 4.5])
+        self.assertEqual(set(animal_trends), {'121', '122'})
+
+    def test_derived_frames_do_not_reuse_snapshot_statistics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = make_agent(tmp)
+            all_data = {}
+            for i, year in enumerate(['2019', '2020', '2021']):
+                agent.snapshots.write(f'sha{year}', pd.DataFrame({'k': [1, 1, 2, 2], '121': [1.0 + i, 3.0 + i, 2.0, 4.0]}))
+                all_data[year] = agent.snapshots.load(f'sha{year}')
+            self.assertEqual(agent.calculate_animal_trends(all_data)['121']['values'], [2.5, 3.0, 3.5])
+
+            # Los subconjuntos heredan attrs['snapshot'], pero no son la instantánea
+            subsets = {year: df[df['k'] == 1] for year, df in all_data.items()}
+            self.assertEqual(agent.calculate_animal_trends(subsets)['121']['values'], [2.0, 3.0, 4.0])
+            self.assertEqual(agent.trend_store.years['2019']['sha'], 'sha2019')
+            self.assertEqual(agent.calculate_animal_trends(all_data)['121']['values'], [2.5, 3.0, 3.5])
+
+    def test_update_trend_statistics_only_loads_new_years(self):
+        files = {}
+        for i, year in enumerate(['2019', '2020', '2021']):
+            files[f'{year}/dataset.csv'] = f"121;122\n{i};5\n{i + 1};5\n".encode('utf-8')
+        with tempfile.TemporaryDirectory() as tmp, HttpStandIn(files) as server:
+            file_list = [{'year': year, 'dataset': server.url(f'{year}/dataset.csv'),
+                          'dataset_sha': blob_sha(files[f'{year}/dataset.csv'])}
+                         for year in ['2019', '2020', '2021']]
+            agent = make_agent(tmp)
+            self.assertEqual(agent.update_trend_statistics(file_list[:2]), ['2019', '2020'])
+
+            agent = make_agent(tmp)
+            self.assertEqual(agent.update_trend_statistics(file_list), ['2021'])
+            self.assertEqual(len(server.requests), 3)
+            self.assertAlmostEqual(agent.trend_store.result().slope[0], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
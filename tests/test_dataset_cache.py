@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+
+from src.dataset_cache import DatasetCache, git_blob_sha
+from support.fake_github import blob_sha
+from support.http_standin import HttpStandIn
+
+CSV = "kommunenr;121;122\n301;1,5;2\n1101;3;4,25\n".encode('utf-8')
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_hit_by_sha_without_network(self):
+        with HttpStandIn({'2020/dataset.csv': CSV}) as server:
+            url = server.url('2020/dataset.csv')
+            cache = DatasetCache(self.tmp.name)
+            path = cache.fetch(url)
+            sha = git_blob_sha(path)
+            self.assertEqual(len(server.requests), 1)
+
+            # Un proceso nuevo con el mismo SHA no debe tocar la red
+            path = DatasetCache(self.tmp.name).fetch(url, sha)
+            self.assertEqual(len(server.requests), 1)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), CSV)
+
+    def test_revalidation_with_etag(self):
+        with HttpStandIn({'2020/dataset.csv': CSV}) as server:
+            url = server.url('2020/dataset.csv')
+            cache = DatasetCache(self.tmp.name)
+            first = cache.fetch(url)
+
+            # Sin SHA conocido se revalida con If-None-Match y el servidor responde 304
+            second = DatasetCache(self.tmp.name).fetch(url)
+            self.assertEqual(first, second)
+            self.assertEqual(len(server.requests), 2)
+            self.assertIn('If-None-Match', server.requests[1][1])
+
+    def test_new_sha_downloads_again(self):
+        with HttpStandIn({'2020/dataset.csv': CSV}) as server:
+            url = server.url('2020/dataset.csv')
+            cache = DatasetCache(self.tmp.name)
+            cache.fetch(url)
+            server.files['2020/dataset.csv'] = CSV + b"5001;1;1\n"
+            sha = blob_sha(server.files['2020/dataset.csv'])
+            path = cache.fetch(url, sha)
+            self.assertEqual(len(server.requests), 2)
+            self.assertNotIn('If-None-Match', server.requests[1][1])
+            self.assertTrue(path.endswith(sha))
+
+    def test_content_must_match_sha(self):
+        with HttpStandIn({'2020/dataset.csv': CSV}) as server:
+            url = server.url('2020/dataset.csv')
+            cache = DatasetCache(self.tmp.name)
+            old = cache.fetch(url)
+
+            # El árbol ya anuncia el SHA nuevo pero el CDN sigue sirviendo el archivo anterior
+            new_sha = blob_sha(CSV + b"5001;1;1\n")
+            with self.assertRaises(ValueError):
+                cache.fetch(url, new_sha)
+            self.assertNotIn('If-None-Match', server.requests[1][1])
+            self.assertIsNone(cache.lookup(url, new_sha))
+            self.assertEqual(cache.lookup(url), old)
+
+
+if __name__ == '__main__':
+    unittest.main()
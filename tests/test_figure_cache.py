@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from src.data_visualization import plot_bar_chart, plot_radar_chart
+from src.figure_cache import FigureCache
+
+
+class TestFigureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'121': [1.0, 2.0, 3.0], '122': [4.0, 5.0, 6.0]})
+        self.calls = 0
+
+    def counting_plot(self, data, variable):
+        self.calls += 1
+        return plot_bar_chart(data, variable)
+
+    def test_hit_returns_equal_figure_without_recomputing(self):
+        cache = FigureCache(max_bytes=10 ** 6)
+        first = cache.figure(self.counting_plot, self.df, '121')
+        second = cache.figure(self.counting_plot, self.df.copy(), '121')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.to_json(), second.to_json())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_depends_on_data_and_parameters(self):
+        cache = FigureCache(max_bytes=10 ** 6)
+        cache.figure(self.counting_plot, self.df, '121')
+        cache.figure(self.counting_plot, self.df, '122')
+        cache.figure(self.counting_plot, self.df * 2, '121')
+        self.assertEqual(self.calls, 3)
+
+    def test_dataframe_keyword_arguments_use_the_fingerprint(self):
+        cache = FigureCache(max_bytes=10 ** 6)
+        # Mismas primeras y últimas filas: su `repr` truncado coincide, su contenido no
+        first = pd.DataFrame({'121': range(100)}, dtype=float)
+        second = first.copy()
+        second.loc[50, '121'] = -1.0
+        self.assertEqual(repr(first), repr(second))
+        cache.figure(self.counting_plot, data=first, variable='121')
+        cache.figure(self.counting_plot, data=second, variable='121')
+        self.assertEqual(self.calls, 2)
+        self.assertNotEqual(cache.key(self.counting_plot, data=first), cache.key(self.counting_plot, first))
+
+    def test_eviction_by_size(self):
+        size = len(plot_radar_chart(self.df, ['121']).to_json().encode('utf-8'))
+        cache = FigureCache(max_bytes=int(size * 2.5))
+        for variables in (['121'], ['122'], ['121', '122']):
+            cache.figure(plot_radar_chart, self.df, variables)
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(cache.key(plot_radar_chart, self.df, ['121'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
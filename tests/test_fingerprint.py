@@ -0,0 +1,33 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.fingerprint import dataset_fingerprint
+from src.snapshot_store import SnapshotStore
+
+
+class TestDatasetFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = SnapshotStore(self.tmp.name)
+        self.store.write('abc', pd.DataFrame({'121': [3.0, np.nan, 1.0], '122': [1, 2, 3]}))
+
+    def test_snapshot_frames_share_fingerprint(self):
+        self.assertEqual(dataset_fingerprint(self.store.load('abc')), dataset_fingerprint(self.store.load('abc')))
+
+    def test_derived_frames_are_hashed_by_content(self):
+        original = self.store.load('abc')
+        derived = [original.sort_values('121'), original.fillna(0), original.clip(upper=2)]
+        fingerprints = {dataset_fingerprint(df) for df in [original] + derived}
+        self.assertEqual(len(fingerprints), 4)
+        for df in derived:
+            self.assertEqual(df.attrs['snapshot'], 'abc')
+            self.assertEqual(dataset_fingerprint(df), dataset_fingerprint(df.copy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
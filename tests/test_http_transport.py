@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from src.dataset_cache import DatasetCache
+from src.http_transport import HttpTransport
+from support.http_standin import HttpStandIn
+
+BODY = b"kommunenr;121\n" + b"".join(f"{i};{i},5\n".encode() for i in range(100000))
+
+
+class InterruptedStandIn(HttpStandIn):
+    """
+    Corta la primera respuesta completa de cada archivo a mitad del cuerpo.
+    """
+
+    def __init__(self, files):
+        super().__init__(files)
+        self.pending_cuts = set(self.files)
+
+    def handle(self, request):
+        path = request.path.lstrip('/')
+        if path in self.pending_cuts and 'Range' not in request.headers:
+            self.pending_cuts.discard(path)
+            body = self.files[path]
+            request.send_response(200)
+            request.send_header('ETag', f'"{hashlib.md5(body).hexdigest()}"')
+            request.send_header('Accept-Ranges', 'bytes')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body[:len(body) // 2])
+            request.close_connection = True
+            return
+        super().handle(request)
+
+
+class ScriptedStandIn(HttpStandIn):
+    """
+    Responde primero con las respuestas de `script` (estado, cabeceras) y después normalmente.
+    """
+
+    def __init__(self, files, script):
+        super().__init__(files)
+        self.script = list(script)
+
+    def handle(self, request):
+        if self.script:
+            status, headers = self.script.pop(0)
+            request.send_response(status)
+            for name, value in headers.items():
+                request.send_header(name, value)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+        super().handle(request)
+
+
+class GzipStandIn(HttpStandIn):
+
+    def handle(self, request):
+        body = gzip.compress(self.files[request.path.lstrip('/')])
+        request.send_response(200)
+        request.send_header('Content-Encoding', 'gzip')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+class TestHttpTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.waits = []
+        self.transport = HttpTransport(sleep=self.waits.append, backoff=0.25)
+
+    def test_interrupted_download_resumes_with_range(self):
+        path = os.path.join(self.tmp.name, 'out.csv')
+        with InterruptedStandIn({'a.csv': BODY}) as server:
+            response, written = self.transport.download(server.url('a.csv'), path)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(written, len(BODY))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), BODY)
+        resumed = server.requests[1][1]
+        # Se reanuda desde el último bloque completo recibido
+        offset = int(resumed['Range'][len('bytes='):-1])
+        self.assertTrue(0 < offset <= len(BODY) // 2)
+        self.assertEqual(resumed['If-Range'], f'"{hashlib.md5(BODY).hexdigest()}"')
+
+    def test_retries_honour_retry_after_and_backoff(self):
+        script = [(429, {'Retry-After': '3'}), (503, {})]
+        with ScriptedStandIn({'a.csv': BODY}, script) as server:
+            response = self.transport.get(server.url('a.csv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.waits, [3.0, 0.5])
+
+    def test_github_rate_limit_waits_until_reset(self):
+        reset = str(int(time.time()) + 10)
+        script = [(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset})]
+        with ScriptedStandIn({'a.csv': BODY}, script) as server:
+            response = self.transport.get(server.url('a.csv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(8 <= self.waits[0] <= 10)
+
+    def test_gives_up_after_max_retries(self):
+        transport = HttpTransport(sleep=self.waits.append, max_retries=2)
+        with ScriptedStandIn({}, [(500, {})] * 5) as server:
+            response = transport.get(server.url('a.csv'))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_open_streams_gzip_to_the_parser(self):
+        with GzipStandIn({'a.csv': BODY}) as server:
+            with self.transport.open(server.url('a.csv')) as stream:
+                df = pd.read_csv(stream, sep=';', decimal=',')
+        self.assertIn('gzip', server.requests[0][1]['Accept-Encoding'])
+        self.assertEqual(len(df), 100000)
+        self.assertEqual(df['121'].iloc[3], 3.5)
+
+    def test_dataset_cache_uses_the_transport(self):
+        cache = DatasetCache(self.tmp.name, transport=self.transport)
+        with InterruptedStandIn({'a.csv': BODY}) as server:
+            path = cache.fetch(server.url('a.csv'))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), BODY)
+        self.assertEqual([name for name in os.listdir(cache.blob_dir) if name.endswith('.tmp')], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import logging
+import tempfile
+import unittest
+
+from src.dataset_cache import DatasetCache
+from src.instrumentation import RingBufferHandler, SpanRecorder, recorder
+from support.http_standin import HttpStandIn
+
+
+class TestSpanRecorder(unittest.TestCase):
+
+    def test_buffer_is_bounded(self):
+        spans = SpanRecorder(max_spans=3)
+        for i in range(5):
+            spans.record("parse", float(i))
+        self.assertEqual([span['duration'] for span in spans.spans()], [2.0, 3.0, 4.0])
+
+    def test_summary_percentiles_and_bytes(self):
+        spans = SpanRecorder()
+        for i in range(1, 101):
+            spans.record("download", i / 100, bytes=10)
+        spans.record("trends", 0.5)
+        summary = spans.summary()
+        self.assertEqual(summary['download']['count'], 100)
+        self.assertAlmostEqual(summary['download']['p50'], 0.505)
+        self.assertAlmostEqual(summary['download']['max'], 1.0)
+        self.assertEqual(summary['download']['bytes'], 1000)
+        self.assertNotIn('bytes', summary['trends'])
+
+    def test_span_records_attributes_and_errors(self):
+        spans = SpanRecorder()
+        with spans.span("listing", repo="owner/repo") as attributes:
+            attributes['entries'] = 7
+        with self.assertRaises(KeyError):
+            with spans.span("figure"):
+                raise KeyError("x")
+        listing, figure = spans.spans()
+        self.assertEqual((listing['repo'], listing['entries']), ("owner/repo", 7))
+        self.assertGreaterEqual(listing['duration'], 0)
+        self.assertEqual(figure['error'], 'KeyError')
+
+        exported = json.loads(spans.export_json())
+        self.assertEqual(set(exported['summary']), {'listing', 'figure'})
+        self.assertEqual(len(exported['spans']), 2)
+
+    def test_download_span(self):
+        recorder.clear()
+        with tempfile.TemporaryDirectory() as tmp, HttpStandIn({'a.csv': b'x' * 100}) as server:
+            DatasetCache(tmp).fetch(server.url('a.csv'))
+        download, = recorder.spans('download')
+        self.assertEqual((download['bytes'], download['status']), (100, 200))
+        self.assertGreaterEqual(download['latency'], 0)
+
+
+class TestRingBufferHandler(unittest.TestCase):
+
+    def test_keeps_only_the_last_lines(self):
+        handler = RingBufferHandler(capacity=2)
+        logger = logging.getLogger('test_ring_buffer')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        for i in range(4):
+            logger.warning(f"línea {i}")
+        self.assertEqual(handler.lines(), ["línea 2", "línea 3"])
+
+
+if __name__ == '__main__':
+    unittest.main()
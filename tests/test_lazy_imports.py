@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import unittest
+
+from src.lazy_imports import LazyModule, format_profile, lazy_import, profile_imports
+
+HEAVY = ('plotly', 'scipy', 'github', 'matplotlib', 'seaborn', 'sklearn', 'googletrans', 'streamlit')
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_app_modules_do_not_import_heavy_dependencies(self):
+        code = ("import sys; import src, src.data_agent, src.data_visualization, src.figure_cache, "
+                "src.data_analyst_visualizer, src.ml_models, src.translation_catalog, src.pipeline; "
+                f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_lazy_module_imports_on_first_use(self):
+        module = LazyModule('json')
+        self.assertIsNone(module._module)
+        self.assertEqual(module.dumps([1]), '[1]')
+        self.assertIs(module._module, sys.modules['json'])
+        self.assertIs(lazy_import('json'), sys.modules['json'])
+
+    def test_profile_imports(self):
+        entries = profile_imports(['json'])
+        names = [entry[0] for entry in entries]
+        self.assertIn('json', names)
+        self.assertIn('json.decoder', names)
+        self.assertIn('json', format_profile(entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
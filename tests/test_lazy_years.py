@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.lazy_years import LazyYearData, YearHandle
+from support.agents import DIRECTORY, make_headless_agent
+from support.fake_github import FakeGitHub, blob_sha
+
+YEARS = ['2019', '2020', '2021']
+
+
+class TestLazyYearData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tree = {}
+        for i, year in enumerate(YEARS):
+            self.tree[f"{DIRECTORY}/{year}/dataset.csv"] = \
+                f"kommunenr;kommunenavn;121\n301;Oslo;{i},5\n1101;Eigersund;{i + 1}\n".encode()
+            self.tree[f"{DIRECTORY}/{year}/README.md"] = f"121 = Melkekyr {year}\n".encode()
+        self.server = FakeGitHub("owner/repo", self.tree)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.agent = make_headless_agent(self.server, self.tmp.name)
+
+    def csv_requests(self):
+        return [path for path, _ in self.server.requests if path.endswith('dataset.csv')]
+
+    def test_listing_returns_handles_and_loads_only_the_requested_year(self):
+        files = self.agent.list_csv_and_readme_files()
+        self.assertTrue(all(isinstance(handle, YearHandle) for handle in files))
+        self.assertEqual(files[0]['year'], '2019')
+
+        loaded = []
+        data = LazyYearData(files, on_load=lambda year, df: loaded.append(year))
+        self.assertEqual(list(data), YEARS)
+        self.assertEqual(self.csv_requests(), [])
+
+        self.assertEqual(data['2020']['121'].tolist(), [1.5, 2.0])
+        self.assertIs(data['2020'], data['2020'])
+        self.assertEqual(len(self.csv_requests()), 1)
+        self.assertEqual(data.loaded_years(), ['2020'])
+        self.assertEqual(loaded, ['2020'])
+
+    def test_prefetch_loads_every_year_newest_first(self):
+        loaded = []
+        data = LazyYearData(self.agent.list_csv_and_readme_files(), max_workers=1,
+                            on_load=lambda year, df: loaded.append(year))
+        for future in data.prefetch(first='2020'):
+            future.result()
+        data.close()
+        self.assertEqual(loaded, ['2020', '2021', '2019'])
+        self.assertEqual(sorted(data.loaded_years()), YEARS)
+
+    def test_failed_year_is_not_offered_and_wait_covers_every_year(self):
+        load_csv = self.agent.load_csv
+
+        def failing(path, sha=None):
+            return None if '2021' in path else load_csv(path, sha)
+
+        indexed = []
+        data = LazyYearData(self.agent.list_csv_and_readme_files(), on_load=lambda year, df: indexed.append(year))
+        with patch.object(self.agent, 'load_csv', side_effect=failing):
+            self.assertEqual(data.available_years(), YEARS)
+            data.prefetch()
+            self.assertEqual(sorted(data.wait()), ['2019', '2020'])
+            data.close()
+            self.assertEqual(sorted(indexed), ['2019', '2020'])
+            self.assertEqual(data.available_years(), ['2019', '2020'])
+            with self.assertRaises(KeyError):
+                data['2021']
+
+    def test_failed_year_is_retried_only_on_request(self):
+        load_csv = self.agent.load_csv
+        attempts = []
+
+        def failing(path, sha=None, columns=None):
+            if '2021' in path:
+                attempts.append(path)
+                return None
+            return load_csv(path, sha, columns)
+
+        data = LazyYearData(self.agent.list_csv_and_readme_files())
+        with patch.object(self.agent, 'load_csv', side_effect=failing):
+            with self.assertRaises(KeyError):
+                data['2021']
+            self.assertEqual(data.failed_years(), ['2021'])
+
+            # Ni las recargas de la página ni las tendencias vuelven a intentarlo
+            with self.assertRaises(KeyError):
+                data['2021']
+            self.assertIsNone(data.handles['2021'].load_numeric())
+            self.assertEqual(sorted(data.numeric_frames()), ['2019', '2020'])
+            self.assertEqual(len(attempts), 1)
+
+        self.assertEqual(data.retry_failed(), ['2021'])
+        self.assertEqual(data['2021']['121'].tolist(), [2.5, 3.0])
+        self.assertEqual(data.failed_years(), [])
+
+    def test_numeric_frames_open_only_numeric_snapshot_columns(self):
+        first = LazyYearData(self.agent.list_csv_and_readme_files())
+        for year in YEARS:
+            first[year]
+
+        data = LazyYearData(make_headless_agent(self.server, self.tmp.name).list_csv_and_readme_files())
+        frames = data.numeric_frames()
+        self.assertEqual(list(frames), YEARS)
+        self.assertEqual(list(frames['2021'].columns), ['kommunenr', '121'])
+        self.assertEqual(data.loaded_years(), [])
+        self.assertEqual(len(self.csv_requests()), 3)
+
+        trends = self.agent.find_significant_trends(frames)
+        self.assertAlmostEqual(trends['121']['slope'], 1.0)
+
+    def test_animal_codes_prefer_the_latest_readme(self):
+        data = LazyYearData(self.agent.list_csv_and_readme_files())
+        self.assertEqual(data.animal_codes(), {'121': 'Melkekyr 2021'})
+        self.assertEqual(self.csv_requests(), [])
+
+
+class TestLoadCsvColumns(unittest.TestCase):
+
+    def test_columns_are_limited_with_and_without_snapshot(self):
+        tree = {f"{DIRECTORY}/2020/dataset.csv": b"a;b;c\n1;2;3\n", f"{DIRECTORY}/2020/README.md": b""}
+        with tempfile.TemporaryDirectory() as tmp, FakeGitHub("owner/repo", tree) as server:
+            agent = make_headless_agent(server, tmp)
+            url = server.raw_base_url + f"{DIRECTORY}/2020/dataset.csv"
+            sha = blob_sha(tree[f"{DIRECTORY}/2020/dataset.csv"])
+            self.assertEqual(list(agent.load_csv(url, columns=['c', 'a']).columns), ['a', 'c'])
+            self.assertEqual(list(agent.load_csv(url, sha, columns=['b']).columns), ['b'])
+            self.assertTrue(os.path.exists(agent.snapshots.path(sha)))
+            self.assertEqual(list(agent.load_csv(url, sha, columns=['a']).columns), ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
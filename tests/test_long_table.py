@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.long_table import LongTable
+
+
+class TestLongTable(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.all_data = {}
+        for i, year in enumerate(['2018', '2016', '2017', '2019', '2020']):
+            kommuner = rng.choice([301, 1103, 4601, 5001], size=12)
+            self.all_data[year] = pd.DataFrame({
+                'orgnr': rng.integers(1, 6, 12),
+                'kommunenr': kommuner,
+                'kommunenavn': [f'K{k}' for k in kommuner],
+                '121': rng.normal(10 + 3 * int(year), 2, 12),
+                '122': rng.poisson(4, 12).astype('int32'),
+                '123': np.ones(12),
+            })
+        # 5001 solo aparece en 2020: un único año, sin tendencia
+        for year in ['2016', '2017', '2018', '2019']:
+            df = self.all_data[year]
+            df.loc[df['kommunenr'] == 5001, 'kommunenr'] = 301
+        self.all_data['2020'].loc[0, 'kommunenr'] = 5001
+        self.all_data['2017'].loc[1, '121'] = np.nan
+        self.table = LongTable.from_years(self.all_data)
+
+    def test_partitions_by_year(self):
+        self.assertEqual(self.table.years, ['2016', '2017', '2018', '2019', '2020'])
+        self.assertEqual(self.table.columns, ['121', '122', '123'])
+        self.assertEqual(self.table.group_keys, ['kommunenr', 'orgnr'])
+        self.assertEqual(len(self.table), 60)
+        partition = self.table.partition('2018')
+        np.testing.assert_array_equal(partition['121'].to_numpy(), self.all_data['2018']['121'].to_numpy())
+        self.assertEqual(set(partition['year']), {'2018'})
+
+    def _expected(self, key, column, agg):
+        frames = []
+        for position, year in enumerate(sorted(self.all_data)):
+            df = self.all_data[year]
+            grouped = df.groupby(key)[column].agg(agg)
+            frames.append(pd.DataFrame({'group': grouped.index, 'x': position, 'y': grouped.to_numpy(dtype=float),
+                                        'count': df.groupby(key)[column].count().to_numpy()}))
+        return pd.concat(frames)
+
+    def test_matches_linregress_per_group(self):
+        for agg in ('sum', 'mean'):
+            trends = self.table.group_trends('kommunenr', agg=agg)
+            for column in ('121', '122'):
+                expected = self._expected('kommunenr', column, agg)
+                for group, cells in expected[expected['count'] > 0].groupby('group'):
+                    row = trends.loc[(group, column)]
+                    self.assertEqual(row['n_years'], len(cells))
+                    if len(cells) < 2:
+                        self.assertTrue(np.isnan(row['slope']))
+                        continue
+                    fit = stats.linregress(cells['x'], cells['y'])
+                    self.assertAlmostEqual(row['slope'], fit.slope)
+                    self.assertAlmostEqual(row['intercept'], fit.intercept)
+                    self.assertAlmostEqual(row['r_squared'], fit.rvalue ** 2)
+                    self.assertAlmostEqual(row['p_value'], fit.pvalue)
+
+    def test_constant_mean_has_no_trend(self):
+        trends = self.table.group_trends('kommunenr', ['123'], agg='mean')
+        row = trends.loc[(301, '123')]
+        self.assertEqual((row['slope'], row['p_value']), (0.0, 1.0))
+
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            self.table.group_trends('fylkesnr')
+        with self.assertRaises(ValueError):
+            self.table.group_trends('kommunenr', agg='median')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,71 @@
-# Este archivo se puede dejar vacío por ahora, ya que aún no hemos implementado modelos de ML
-# Puedes añadir pruebas aquí cuando implementes funcionalidades de aprendizaje automático
+import unittest
+from unittest.mock import patch
 
+import numpy as np
+import pandas as pd
+
+from src.ml_models import ClusteringService, analyze_emissions, cluster_statistics, clustering_service
+
+
+def emissions(seed=0, rows=60):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[100.0, 0.1], [200.0, 0.5], [300.0, 0.9]])
+    group = np.arange(rows) % 3
+    values = centers[group] + rng.normal(0, [5.0, 0.02], (rows, 2))
+    brands = np.array(['Volvo', 'Tesla', 'Scania'])[group]
+    df = pd.DataFrame({'co2': values[:, 0], 'nox': values[:, 1], 'merke': brands})
+    df.loc[0, 'merke'] = 'Toyota'
+    return df
+
+
+class TestClustering(unittest.TestCase):
+
+    def setUp(self):
+        clustering_service.clear()
+        self.df = emissions()
+
+    def test_analyze_emissions_does_not_mutate(self):
+        columns = list(self.df.columns)
+        stats = analyze_emissions(self.df)
+        self.assertEqual(list(self.df.columns), columns)
+        self.assertEqual(list(stats.columns), ['Cluster', 'CO2 Promedio', 'NOx Promedio', 'Marca más común'])
+        self.assertEqual(sorted(stats['Marca más común']), ['Scania', 'Tesla', 'Volvo'])
+        by_brand = stats.set_index('Marca más común')
+        self.assertAlmostEqual(by_brand.loc['Tesla', 'CO2 Promedio'], 200, delta=5)
+
+    def test_statistics_match_groupby(self):
+        labels = np.array([0, 1, 1, -1, 0, 1])
+        df = pd.DataFrame({'co2': [1.0, 2.0, 4.0, 9.0, np.nan, 6.0], 'merke': ['a', 'b', 'c', 'a', 'a', 'c']})
+        stats = cluster_statistics(df, labels, ['co2'], 3, 'merke')
+        self.assertEqual(stats['cluster'].tolist(), [0, 1])
+        self.assertEqual(stats['size'].tolist(), [2, 3])
+        self.assertEqual(stats['co2'].tolist(), [1.0, 4.0])
+        self.assertEqual(stats['mode'].tolist(), ['a', 'c'])
+
+    def test_cached_model_predicts_without_refitting(self):
+        model = clustering_service.model(self.df)
+        rows = pd.DataFrame({'co2': [101.0, 299.0, np.nan], 'nox': [0.1, 0.9, 0.5]})
+        with patch('src.ml_models._fit_estimator') as fit:
+            labels = clustering_service.predict(self.df, rows)
+            fit.assert_not_called()
+        self.assertEqual(labels[2], -1)
+        self.assertEqual(labels[0], model.predict(self.df.iloc[[3]])[0])
+        self.assertNotEqual(labels[0], labels[1])
+
+    def test_minibatch_for_large_frames(self):
+        with patch('config.CLUSTER_MINIBATCH_ROWS', 10):
+            model = ClusteringService().model(self.df)
+        self.assertEqual(type(model.estimator).__name__, 'MiniBatchKMeans')
+        self.assertEqual(model.n_clusters, 3)
+
+    def test_fit_years_in_parallel(self):
+        service = ClusteringService()
+        all_data = {'2020': emissions(1), '2021': emissions(2), '2022': emissions(3, rows=2)}
+        models = service.fit_years(all_data, max_workers=2)
+        self.assertEqual(sorted(models), ['2020', '2021'])
+        self.assertIs(service.cached(all_data['2020']), models['2020'])
+        self.assertEqual(service.fit_years({'2020': all_data['2020']})['2020'], models['2020'])
+
+
+if __name__ == '__main__':
+    unittest.main()
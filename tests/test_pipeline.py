@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from src.column_stats import ColumnStatsIndex
+from src.pipeline import load_artifacts, latest_version, run_pipeline
+from src.snapshot_store import SnapshotStore
+from support.agents import DIRECTORY, make_headless_agent
+from support.fake_github import FakeGitHub
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = os.path.join(self.tmp.name, "artifacts")
+        self.tree = {}
+        for i, year in enumerate(['2019', '2020', '2021']):
+            self.tree[f"{DIRECTORY}/{year}/dataset.csv"] = f"kommunenr;121;122\n301;{i},5;5\n1101;{i + 1};5\n".encode()
+            self.tree[f"{DIRECTORY}/{year}/README.md"] = b"121 = Melkekyr\n122 = Ammekyr\n"
+
+    def test_publishes_artifacts_the_app_can_read(self):
+        with FakeGitHub("owner/repo", self.tree) as server:
+            agent = make_headless_agent(server, self.tmp.name)
+            version = run_pipeline(agent, self.output, parse_workers=2)
+
+        self.assertEqual(latest_version(self.output), version)
+        artifacts = load_artifacts(self.output, agent.snapshots)
+        self.assertEqual(artifacts.version, version)
+        self.assertEqual(list(artifacts.all_data), ['2019', '2020', '2021'])
+        self.assertEqual(artifacts.all_data['2020']['121'].tolist(), [1.5, 2.0])
+        self.assertEqual(artifacts.animal_codes, {'121': 'Melkekyr', '122': 'Ammekyr'})
+        self.assertEqual(list(artifacts.trends), ['121'])
+        self.assertAlmostEqual(artifacts.trends['121']['slope'], 1.0)
+        self.assertEqual(artifacts.animal_trends['122']['values'], [5.0, 5.0, 5.0])
+
+        expected = ColumnStatsIndex.build({'2021': artifacts.all_data['2021']})
+        self.assertEqual(artifacts.stats_index.lookup('2021', '121', 'mean'), expected.lookup('2021', '121', 'mean'))
+        self.assertEqual(artifacts.stats_index.quantile('2021', '121', 0.5), expected.quantile('2021', '121', 0.5))
+
+    def test_unchanged_input_is_not_recomputed(self):
+        with FakeGitHub("owner/repo", self.tree) as server:
+            first = run_pipeline(make_headless_agent(server, self.tmp.name), self.output, parse_workers=1)
+            requests_after_first_run = len(server.requests)
+            second = run_pipeline(make_headless_agent(server, self.tmp.name), self.output, parse_workers=1)
+            # Solo se vuelve a pedir el árbol del repositorio
+            self.assertEqual(len(server.requests) - requests_after_first_run, 1)
+
+            self.tree[f"{DIRECTORY}/2021/dataset.csv"] = b"kommunenr;121;122\n301;9;5\n"
+            server.tree = dict(self.tree)
+            third = run_pipeline(make_headless_agent(server, self.tmp.name), self.output, parse_workers=1)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertEqual(latest_version(self.output), third)
+
+    def test_missing_artifacts(self):
+        self.assertIsNone(load_artifacts(self.output, SnapshotStore(self.tmp.name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
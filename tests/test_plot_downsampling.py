@@ -0,0 +1,71 @@
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+from src.data_visualization import (bin_frame, lttb_indices, numeric_columns, plot_bar_chart,
+                                    plot_scatter_chart, plot_stacked_bar_chart)
+
+
+class TestDownsampling(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'121': rng.random(20000), '122': rng.random(20000)})
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        values = np.zeros(1000)
+        values[500] = 10.0
+        selected = lttb_indices(values, 50)
+        self.assertEqual(len(selected), 50)
+        self.assertEqual((selected[0], selected[-1]), (0, 999))
+        self.assertIn(500, selected)
+        self.assertTrue(np.all(np.diff(selected) > 0))
+
+    def test_bin_frame(self):
+        binned = bin_frame(pd.DataFrame({'a': np.arange(10.0)}, index=range(100, 110)), 5)
+        self.assertEqual(binned.index.tolist(), [100, 102, 104, 106, 108])
+        self.assertEqual(binned['a'].tolist(), [0.5, 2.5, 4.5, 6.5, 8.5])
+
+    def test_payload_is_bounded(self):
+        bar = plot_bar_chart(self.df, '121', max_points=500)
+        self.assertEqual(len(bar.data[0].x), 500)
+
+        scatter = plot_scatter_chart(self.df, '121', '122', max_points=500)
+        self.assertIsInstance(scatter.data[0], go.Scattergl)
+        self.assertEqual(len(scatter.data[0].x), 500)
+
+        stacked = plot_stacked_bar_chart(self.df, ['121', '122'], max_points=500)
+        self.assertEqual([len(trace.x) for trace in stacked.data], [500, 500])
+
+    def test_text_columns(self):
+        df = self.df.assign(kommunenavn=np.where(self.df['121'] > 0.5, 'Oslo', 'Bergen'),
+                            fylke=pd.Categorical(np.where(self.df['122'] > 0.5, 'Oslo', 'Viken')))
+        bar = plot_bar_chart(df, 'kommunenavn', max_points=500)
+        self.assertEqual(sorted(bar.data[0].x), ['Bergen', 'Oslo'])
+        self.assertEqual(sum(bar.data[0].y), len(df))
+        self.assertEqual(len(plot_bar_chart(df, 'fylke').data[0].x), 2)
+
+        names = df.assign(orgnavn=[f'gård {i}' for i in range(len(df))])
+        bar = plot_bar_chart(names, 'orgnavn', max_points=500)
+        self.assertEqual(len(bar.data[0].x), 500)
+        self.assertEqual(bar.data[0].x[-1], 'otros')
+        self.assertEqual(bar.data[0].y[-1], len(df) - 499)
+        self.assertEqual(sum(bar.data[0].y), len(df))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', FutureWarning)
+            stacked = plot_stacked_bar_chart(df, ['121', 'kommunenavn', 'fylke'], max_points=500)
+        self.assertEqual([trace.name for trace in stacked.data], ['121'])
+        self.assertEqual(numeric_columns(df), ['121', '122'])
+
+    def test_small_data_is_not_sampled(self):
+        small = self.df.head(100)
+        self.assertEqual(len(plot_bar_chart(small, '121').data[0].x), 100)
+        self.assertNotIsInstance(plot_scatter_chart(small, '121', '122').data[0], go.Scattergl)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_visualization import (column_statistics, compute_box_statistics, compute_density, plot_box_chart,
+                                    plot_distribution_chart, plot_violin_chart)
+
+
+class TestPlotStatistics(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(100, 10, 200000)
+        values[:10] = np.nan
+        self.df = pd.DataFrame({'121': values, 'navn': ['x'] * len(values)})
+
+    def test_box_statistics(self):
+        stats = compute_box_statistics([1, 2, 3, 4, 5, 6, 7, 8, 100, -50])
+        self.assertEqual((stats['q1'], stats['median'], stats['q3']), (2.25, 4.5, 6.75))
+        self.assertEqual((stats['lowerfence'], stats['upperfence']), (1.0, 8.0))
+        self.assertEqual(stats['outliers'], [-50.0, 100.0])
+
+    def test_outliers_are_capped(self):
+        stats = column_statistics(self.df, '121', 'box')
+        self.assertEqual(stats['count'], len(self.df) - 10)
+        self.assertLessEqual(len(stats['outliers']), 200)
+        self.assertEqual(stats['outliers'][0], stats['min'])
+        self.assertEqual(stats['outliers'][-1], stats['max'])
+
+    def test_statistics_are_memoized(self):
+        self.assertIs(column_statistics(self.df, '121', 'box'), column_statistics(self.df, '121', 'box'))
+
+    def test_payloads_are_small(self):
+        for plot in (plot_box_chart, plot_violin_chart, plot_distribution_chart):
+            self.assertLess(len(plot(self.df, '121').to_json()), 20000, plot.__name__)
+
+    def test_density_matches_grid_on_small_columns(self):
+        # Con pocos valores o dos modas el núcleo es más largo que la rejilla
+        for values in ([0, 0, 0, 0, 1], [0.0] * 50 + [1.0] * 50):
+            density = compute_density(values, grid_size=128)
+            self.assertEqual(len(density['grid']), 128)
+            self.assertEqual(len(density['density']), 128)
+        # Bimodal simétrica: la densidad también lo es (no queda desplazada)
+        np.testing.assert_allclose(density['density'], density['density'][::-1])
+        violin = plot_violin_chart(pd.DataFrame({'121': [0, 0, 0, 0, 1]}), '121')
+        self.assertEqual(len(violin.data[0].x), len(violin.data[0].y))
+
+    def test_text_column_gives_empty_box(self):
+        self.assertEqual(len(plot_box_chart(self.df, 'navn').data), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
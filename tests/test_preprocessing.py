@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.compaction import compact_frame
+from src.data_agent import prepare_csv_file
+from src.preprocessing import preprocess_frame, schema_columns, sparse_columns
+from src.snapshot_store import SnapshotStore
+from src.trend_engine import compute_trends
+from src.trend_store import TrendStatsStore
+
+
+class TestPreprocessing(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'kommunenavn': ['Oslo', 'Bergen', 'Oslo', 'Tromsø'],
+            'orgnavn': ['a', 'b', 'c', 'd'],
+            '121': [1.0, 2.0, np.nan, 4.0],
+            '122': [np.nan, np.nan, np.nan, 5.0],
+            '123': [1, 2, 3, 4],
+        })
+
+    def test_drops_sparse_and_classifies(self):
+        result, schema = preprocess_frame(self.df, max_missing_ratio=0.5, categorical_threshold=3, sparse='drop')
+        self.assertEqual(list(result.columns), ['kommunenavn', 'orgnavn', '121', '123'])
+        self.assertEqual(schema['dropped'], ['122'])
+        self.assertEqual(schema_columns(schema, ['numeric']), ['121', '123'])
+        self.assertEqual(schema_columns(schema, ['categorical']), ['kommunenavn'])
+        self.assertEqual(schema_columns(schema, ['text']), ['orgnavn'])
+        self.assertAlmostEqual(schema['columns'][2]['missing_ratio'], 0.25)
+        self.assertIs(result.attrs['schema'], schema)
+        self.assertNotIn('schema', self.df.attrs)
+
+    def test_flag_keeps_sparse_columns(self):
+        result, schema = preprocess_frame(self.df, max_missing_ratio=0.5, sparse='flag')
+        self.assertEqual(list(result.columns), list(self.df.columns))
+        self.assertTrue(schema['columns'][3]['sparse'])
+        self.assertEqual(schema['dropped'], [])
+        self.assertEqual(schema_columns(schema, ['numeric'], include_sparse=False), ['121', '123'])
+        with self.assertRaises(ValueError):
+            preprocess_frame(self.df, sparse='ignore')
+
+    def test_compaction_uses_schema(self):
+        result, _ = preprocess_frame(self.df.copy(), max_missing_ratio=0.5, categorical_threshold=3)
+        compacted, _ = compact_frame(result, categorical_threshold=100)
+        self.assertIsInstance(compacted['kommunenavn'].dtype, pd.CategoricalDtype)
+        self.assertEqual(compacted['orgnavn'].dtype, object)
+
+    def test_schema_persisted_with_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'data.csv')
+            self.df.to_csv(path, sep=';', decimal=',', index=False)
+            df, _, timings = prepare_csv_file(path)
+            # Por defecto las columnas dispersas se conservan y solo se marcan en el esquema
+            self.assertIn('122', df.columns)
+            self.assertIn('preprocess', timings)
+
+            snapshots = SnapshotStore(tmp)
+            snapshots.write('sha', df, year='2020', metadata={'schema': df.attrs['schema']})
+            loaded = snapshots.load('sha')
+            self.assertEqual(loaded.attrs['schema']['dropped'], [])
+            self.assertIn('122', schema_columns(loaded.attrs['schema'], ['numeric']))
+            self.assertNotIn('122', schema_columns(loaded.attrs['schema'], ['numeric'], include_sparse=False))
+            self.assertEqual(loaded.attrs['year'], '2020')
+
+    def test_sparse_columns_are_decided_across_years(self):
+        # '121' solo es dispersa en 2021; '122' lo es en todos los años
+        all_data = {}
+        for i, year in enumerate(['2019', '2020', '2021']):
+            df = pd.DataFrame({
+                '121': [1.0 + i, np.nan if year == '2021' else 2.0, np.nan, 4.0],
+                '122': [np.nan, np.nan, np.nan, 5.0 + i],
+                '123': [1, 2, 3, 4 + i],
+            })
+            all_data[year], _ = preprocess_frame(df, max_missing_ratio=0.5)
+        schemas = [df.attrs['schema'] for df in all_data.values()]
+        self.assertEqual(sparse_columns(schemas), {'122'})
+        self.assertEqual(sparse_columns(schemas + [None]), set())
+
+        self.assertEqual(compute_trends(all_data).columns, ['121', '123'])
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TrendStatsStore(os.path.join(tmp, 'trend_stats.json'))
+            for year, df in all_data.items():
+                store.add_year(year, df)
+            store.save()
+            self.assertEqual(TrendStatsStore(store.path).result().columns, ['121', '123'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,15 @@
+import unittest
+
+from src.process_pool import process_context, process_pool
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def test_children_are_not_forked(self):
+        self.assertIn(process_context().get_start_method(), ('forkserver', 'spawn'))
+        with process_pool(1) as pool:
+            self.assertEqual(pool.submit(abs, -3).result(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.column_stats import ColumnStatsIndex
+from src.question_engine import QuestionEngine
+
+
+class TestQuestionEngine(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.all_data = {
+            '2019': pd.DataFrame({'121': [1.0, 2.0, np.nan, 5.0], 'navn': list('abcd')}),
+            '2020': pd.DataFrame({'121': [10.0, 20.0, 30.0, 40.0], 'navn': list('abcd')}),
+            '2021': pd.DataFrame({'121': rng.normal(0, 1, 50000), 'navn': ['x'] * 50000}),
+        }
+        self.index = ColumnStatsIndex.build(self.all_data)
+        self.engine = QuestionEngine(self.index, {'121': 'Melkekyr'})
+
+    def test_single_year(self):
+        self.assertEqual(self.engine.answer("¿Cuál es el promedio de 121?", '2019'),
+                         "El promedio de 121 en 2019 es 2.67")
+        self.assertEqual(self.engine.answer("Máximo de melkekyr en 2020"),
+                         "El valor máximo de 121 en 2020 es 40.00")
+        self.assertEqual(self.engine.answer("¿Cuántos valores nulos tiene 121?", '2019'),
+                         "La columna 121 en 2019 tiene 1 valores nulos")
+
+    def test_cross_year(self):
+        self.assertEqual(self.engine.answer("Suma de 121 entre 2019 y 2020"),
+                         "La suma total de 121 entre 2019 y 2020 es 108.00")
+        self.assertEqual(self.engine.answer("Mínimo de 121 en 2019 y 2020"),
+                         "El valor mínimo de 121 entre 2019 y 2020 es 1.00")
+
+    def test_approximate_quantiles(self):
+        self.assertAlmostEqual(self.index.quantile('2021', '121', 0.5),
+                               np.median(self.all_data['2021']['121']), places=1)
+        self.assertAlmostEqual(self.index.quantile('2020', '121', 0.5), 25.0)
+        self.assertIn("mediana", self.engine.answer("mediana de 121", '2020'))
+
+    def test_unknown_column(self):
+        self.assertEqual(self.engine.answer("promedio de 999", '2020'),
+                         "No encontré en la pregunta ninguna columna numérica de los datos.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from github import Github
+
+from src.repo_catalog import RepoCatalog
+from support.fake_github import FakeGitHub, blob_sha
+
+DATA_DIRECTORY = "datasets/produksjon-og-avlosertilskudd"
+
+TREE = {
+    f"{DATA_DIRECTORY}/2019/dataset.csv": b"kommunenr;121\n301;1\n",
+    f"{DATA_DIRECTORY}/2019/README.md": b"121 = Melkekyr\n",
+    f"{DATA_DIRECTORY}/2020/dataset.csv": b"kommunenr;121\n301;2\n",
+    f"{DATA_DIRECTORY}/2020/README.md": b"121 = Melkekyr\n",
+    f"{DATA_DIRECTORY}/2021/README.md": b"121 = Melkekyr\n",
+    "datasets/foretak/dataset.csv": b"orgnr\n1\n",
+}
+
+
+class TestRepoCatalog(unittest.TestCase):
+
+    def fetch(self, server, directory=None):
+        repo = Github("token", base_url=server.api_url).get_repo("owner/repo", lazy=True)
+        return RepoCatalog.fetch(repo, "main", directory)
+
+    def test_fetch_uses_a_single_request(self):
+        with FakeGitHub("owner/repo", TREE) as server:
+            catalog = self.fetch(server)
+            self.assertEqual(len(server.requests), 1)
+
+        entry = catalog.entries[f"{DATA_DIRECTORY}/2019/dataset.csv"]
+        self.assertEqual(entry['size'], len(TREE[f"{DATA_DIRECTORY}/2019/dataset.csv"]))
+        self.assertEqual(entry['sha'], blob_sha(TREE[f"{DATA_DIRECTORY}/2019/dataset.csv"]))
+
+    def test_year_files(self):
+        with FakeGitHub("owner/repo", TREE) as server:
+            files = self.fetch(server).year_files(DATA_DIRECTORY, server.raw_base_url)
+
+        self.assertEqual([f['year'] for f in files], ['2019', '2020'])
+        self.assertTrue(files[0]['dataset'].endswith(f"{DATA_DIRECTORY}/2019/dataset.csv"))
+        self.assertEqual(files[1]['readme_sha'], blob_sha(TREE[f"{DATA_DIRECTORY}/2020/README.md"]))
+
+    def test_save_load_and_diff(self):
+        with FakeGitHub("owner/repo", TREE) as server:
+            previous = self.fetch(server)
+            server.tree[f"{DATA_DIRECTORY}/2021/dataset.csv"] = b"kommunenr;121\n301;3\n"
+            server.tree[f"{DATA_DIRECTORY}/2020/dataset.csv"] = b"kommunenr;121\n301;4\n"
+            del server.tree["datasets/foretak/dataset.csv"]
+            current = self.fetch(server)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "catalog.json")
+            previous.save(path)
+            diff = current.diff(RepoCatalog.load(path))
+
+        self.assertEqual(diff['added'], [f"{DATA_DIRECTORY}/2021/dataset.csv"])
+        self.assertEqual(diff['removed'], ["datasets/foretak", "datasets/foretak/dataset.csv"])
+        self.assertEqual(diff['changed'], [f"{DATA_DIRECTORY}/2020/dataset.csv"])
+
+    def test_truncated_tree_lists_the_directory_by_sha(self):
+        with FakeGitHub("owner/repo", TREE) as server:
+            previous = self.fetch(server)
+
+        # Con el árbol truncado el listado recursivo ni siquiera llega a `datasets`
+        tree = dict(TREE, **{f"a/{i}.txt": b"" for i in range(10)})
+        with FakeGitHub("owner/repo", tree, truncate_after=9) as server:
+            with self.assertRaises(ValueError):
+                self.fetch(server)
+            catalog = self.fetch(server, DATA_DIRECTORY)
+            # Intento sin directorio, árbol recursivo, raíz y `datasets` sin recursión y el directorio
+            self.assertEqual(len(server.requests), 5)
+            files = catalog.year_files(DATA_DIRECTORY, server.raw_base_url)
+
+        self.assertTrue(catalog.truncated)
+        self.assertEqual([f['year'] for f in files], ['2019', '2020'])
+        self.assertEqual(files[1]['dataset_sha'], blob_sha(TREE[f"{DATA_DIRECTORY}/2020/dataset.csv"]))
+        # Lo que queda fuera del directorio no se da por eliminado
+        self.assertEqual(catalog.diff(previous), {'added': [], 'removed': [], 'changed': []})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "catalog.json")
+            catalog.save(path)
+            self.assertEqual(RepoCatalog.load(path).directory, DATA_DIRECTORY)
+            self.assertEqual(previous.diff(RepoCatalog.load(path))['removed'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
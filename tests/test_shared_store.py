@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.shared_store import SharedDatasetStore
+from src.snapshot_store import SnapshotStore
+
+
+class TestSharedDatasetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.snapshots = SnapshotStore(os.path.join(self.tmp.name, 'snapshots'))
+        self.df = pd.DataFrame({'121': [1.0, 2.0, 3.0]})
+        self.snapshots.write('sha2020', self.df, year='2020')
+        self.store = SharedDatasetStore.from_snapshots([('2020', 'sha2020')], self.snapshots)
+
+    def test_behaves_like_all_data(self):
+        self.assertEqual(list(self.store.keys()), ['2020'])
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.sha('2020'), 'sha2020')
+        self.assertIsNone(self.store.sha('2021'))
+        with self.assertRaises(KeyError):
+            self.store['2021']
+
+    def test_loads_lazily_and_returns_the_same_read_only_frame(self):
+        self.assertEqual(self.store._frames, {})
+        pd.testing.assert_frame_equal(self.store['2020'], self.df)
+        self.assertIs(self.store['2020'], self.store['2020'])
+        self.assertIsInstance(self.store['2020']['121'].to_numpy().base, np.memmap)
+        self.assertFalse(self.store['2020']['121'].to_numpy().flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.snapshot_store import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = SnapshotStore(self.tmp.name)
+        self.df = pd.DataFrame({
+            'kommunenr': [301, 1101, 5001],
+            '121': [1.5, np.nan, 3.0],
+            'kommunenavn': ['Oslo', None, 'Trondheim'],
+            'fylke': pd.Categorical(['Oslo', 'Rogaland', 'Oslo']),
+        })
+
+    def test_directory_created_on_first_write(self):
+        self.assertFalse(os.path.exists(self.store.root))
+        self.assertFalse(self.store.exists('abc'))
+        self.store.write('abc', self.df)
+        self.assertTrue(self.store.exists('abc'))
+
+    def test_round_trip(self):
+        self.store.write('abc', self.df, year='2020')
+        loaded = self.store.load('abc')
+        pd.testing.assert_frame_equal(loaded, self.df)
+        self.assertEqual(loaded.attrs['year'], '2020')
+
+    def test_numeric_columns_are_memory_mapped(self):
+        self.store.write('abc', self.df)
+        loaded = self.store.load('abc', columns=['121'])
+        self.assertEqual(list(loaded.columns), ['121'])
+        values = loaded['121'].to_numpy()
+        self.assertIsInstance(values.base, np.memmap)
+        self.assertFalse(values.flags.writeable)
+
+    def test_exists(self):
+        self.assertFalse(self.store.exists('abc'))
+        self.store.write('abc', self.df)
+        self.assertTrue(self.store.exists('abc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from src.translation_catalog import TranslationCatalog, find_ui_strings
+
+
+class FakeResult:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeTranslator:
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def translate(self, texts, dest):
+        self.release.wait()
+        self.calls.append(list(texts))
+        if self.fail:
+            raise ConnectionError("sin red")
+        return [FakeResult(f"{dest}:{text}") for text in texts]
+
+
+class TestTranslationCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "translations.json")
+
+    def test_translate_never_blocks_and_persists(self):
+        translator = FakeTranslator()
+        translator.release.clear()
+        catalog = TranslationCatalog(self.path, predefined={'Hola': 'Hola'},
+                                     translator_factory=lambda: translator)
+        self.assertEqual(catalog.translate('Hola'), 'Hola')
+        self.assertEqual(catalog.translate('Seleccione variables'), 'Seleccione variables')
+        translator.release.set()
+        catalog.wait()
+        self.assertEqual(catalog.translate('Seleccione variables'), 'es:Seleccione variables')
+
+        # Otro proceso usa el catálogo guardado sin llamar al traductor
+        offline = TranslationCatalog(self.path, translator_factory=lambda: FakeTranslator(fail=True))
+        self.assertEqual(offline.translate('Seleccione variables'), 'es:Seleccione variables')
+
+    def test_batch_request_and_failure_backoff(self):
+        translator = FakeTranslator(fail=True)
+        catalog = TranslationCatalog(self.path, translator_factory=lambda: translator)
+        self.assertEqual(catalog.request(['a', 'b', 'c']), ['a', 'b', 'c'])
+        catalog.wait()
+        self.assertEqual(translator.calls, [['a', 'b', 'c']])
+        # Los textos que fallaron no se reintentan en cada rerun
+        self.assertEqual(catalog.request(['a', 'b']), [])
+        self.assertEqual(catalog.translate('a'), 'a')
+
+    def test_find_ui_strings(self):
+        path = os.path.join(self.tmp.name, "app.py")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('st.header(translate_text("Visualizaciones"))\n'
+                    'x = translate_text( "Seleccione un año" )\n'
+                    'y = translate_text(variable)\n')
+        self.assertEqual(find_ui_strings([path]), ["Visualizaciones", "Seleccione un año"])
+
+
+if __name__ == '__main__':
+    unittest.main()
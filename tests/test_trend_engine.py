@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.trend_engine import compute_trends, linear_trends
+
+
+class TestTrendEngine(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.all_data = {}
+        for i, year in enumerate(['2019', '2017', '2018', '2020', '2021']):
+            self.all_data[year] = pd.DataFrame({
+                'kommunenavn': ['Oslo', 'Bergen', 'Tromsø'],
+                '121': rng.normal(10 + 2 * int(year), 1, 3),
+                '122': rng.normal(5, 1, 3),
+                '123': [1, 1, 1],
+            })
+        self.all_data['2021']['extra'] = 1.0
+
+    def test_matches_linregress(self):
+        result = compute_trends(self.all_data)
+        self.assertEqual(result.years, ['2017', '2018', '2019', '2020', '2021'])
+        self.assertEqual(result.columns, ['121', '122', '123'])
+        for i, column in enumerate(result.columns[:2]):
+            values = [self.all_data[year][column].mean() for year in result.years]
+            expected = stats.linregress(range(len(values)), values)
+            self.assertAlmostEqual(result.slope[i], expected.slope)
+            self.assertAlmostEqual(result.intercept[i], expected.intercept)
+            self.assertAlmostEqual(result.r_squared[i], expected.rvalue ** 2)
+            self.assertAlmostEqual(result.p_value[i], expected.pvalue)
+        # Columna constante: sin tendencia
+        self.assertEqual((result.slope[2], result.p_value[2]), (0.0, 1.0))
+
+    def test_nan_columns_have_no_p_value(self):
+        values = np.array([[1.0, 1.0], [2.0, np.nan], [3.5, 3.0]])
+        _, _, _, p_value = linear_trends(values)
+        self.assertFalse(np.isnan(p_value[0]))
+        self.assertTrue(np.isnan(p_value[1]))
+
+    def test_two_years(self):
+        _, _, r_squared, p_value = linear_trends(np.array([[1.0, 2.0], [3.0, 2.0]]))
+        self.assertEqual(p_value.tolist(), [0.0, 1.0])
+        self.assertEqual(r_squared.tolist(), [1.0, 0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.trend_engine import compute_trends
+from src.trend_store import TrendStatsStore
+
+
+class TestTrendStatsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "trend_stats.json")
+        rng = np.random.default_rng(1)
+        self.all_data = {
+            str(year): pd.DataFrame({
+                '121': rng.normal(year - 2000, 1, 50),
+                '122': rng.normal(3, 1, 50),
+                '123': np.where(rng.random(50) < 0.2, np.nan, 7.0),
+                'navn': ['x'] * 50,
+            })
+            for year in range(2017, 2024)
+        }
+
+    def assert_matches_engine(self, result, all_data):
+        expected = compute_trends(all_data)
+        self.assertEqual(result.years, expected.years)
+        self.assertEqual(result.columns, expected.columns)
+        np.testing.assert_allclose(result.means, expected.means)
+        np.testing.assert_allclose(result.slope, expected.slope)
+        np.testing.assert_allclose(result.intercept, expected.intercept)
+        np.testing.assert_allclose(result.r_squared, expected.r_squared, atol=1e-9)
+        np.testing.assert_allclose(result.p_value, expected.p_value, atol=1e-9)
+
+    def test_incremental_matches_full_computation(self):
+        store = TrendStatsStore(self.path)
+        for year in sorted(self.all_data)[:-1]:
+            store.add_year(year, self.all_data[year], sha=f"sha-{year}")
+        store.save()
+
+        # Un proceso nuevo solo incorpora el año nuevo
+        store = TrendStatsStore(self.path)
+        self.assertTrue(store.add_year('2023', self.all_data['2023'], sha="sha-2023"))
+        self.assertFalse(store.add_year('2022', self.all_data['2022'], sha="sha-2022"))
+        self.assert_matches_engine(store.result(), self.all_data)
+
+    def test_out_of_order_and_removed_years(self):
+        store = TrendStatsStore(self.path)
+        for year in ['2020', '2018', '2023', '2017']:
+            store.add_year(year, self.all_data[year])
+        subset = {year: self.all_data[year] for year in ['2017', '2018', '2020', '2023']}
+        self.assert_matches_engine(store.result(), subset)
+
+        store.retain({'2017', '2020', '2023'})
+        del subset['2018']
+        self.assert_matches_engine(store.result(), subset)
+
+    def test_changed_year_is_replaced(self):
+        store = TrendStatsStore(self.path)
+        for year, df in self.all_data.items():
+            store.add_year(year, df, sha=f"sha-{year}")
+        changed = dict(self.all_data)
+        changed['2019'] = self.all_data['2019'] * 1
+        changed['2019']['121'] += 100
+        self.assertTrue(store.add_year('2019', changed['2019'], sha="sha-2019-b"))
+        self.assert_matches_engine(store.result(), changed)
+
+    def test_small_slope_on_large_mean(self):
+        # Media ~1e6 y pendiente 0.05 por año: con momentos brutos (Σy² - (Σy)²/n) se perdía
+        rng = np.random.default_rng(2)
+        all_data = {str(2015 + i): pd.DataFrame({'121': 1e6 + 0.05 * i + rng.normal(0, 0.002, 1)})
+                    for i in range(9)}
+        store = TrendStatsStore(self.path)
+        for year, df in all_data.items():
+            store.add_year(year, df)
+        result = store.result()
+        self.assert_matches_engine(result, all_data)
+        self.assertGreater(result.r_squared[0], 0.99)
+        self.assertLess(result.p_value[0], 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()